@@ -1 +1 @@
-import matplotlib.pyplot as plt
+# Análisis de ventas: matplotlib se importará aquí cuando se añadan los gráficos
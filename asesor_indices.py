@@ -0,0 +1,378 @@
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+
+# -----------------------------
+# CARGA DE TRABAJO
+# -----------------------------
+def leer_carga(ruta):
+    """Consultas SELECT/WITH de un archivo .sql (DDL y DML se ignoran: no se replican)"""
+    with open(ruta, encoding='utf-8') as f:
+        lineas = [re.sub(r'--.*$', '', linea) for linea in f]
+    consultas, actual = [], ''
+    for linea in lineas:
+        actual += linea
+        if sqlite3.complete_statement(actual):
+            sentencia = actual.strip().rstrip(';').strip()
+            if re.match(r'(SELECT|WITH)\b', sentencia, re.IGNORECASE):
+                consultas.append(sentencia)
+            actual = ''
+    return consultas
+
+
+def copia_trabajo(ruta_db, destino=None):
+    """Copia la base con la API de backup; el original nunca se modifica"""
+    if destino is None:
+        descriptor, destino = tempfile.mkstemp(suffix='.db', prefix='asesor_')
+        os.close(descriptor)
+    with sqlite3.connect(ruta_db) as origen, sqlite3.connect(destino) as copia:
+        origen.backup(copia)
+    return destino
+
+
+def ampliar_tablas(conn, filas_objetivo):
+    """Duplica las filas de cada tabla hasta `filas_objetivo` para que los tiempos sean
+    medibles (con 5 filas todo plan cuesta lo mismo). Las columnas UNIQUE reciben un
+    sufijo, la clave entera se autogenera y las claves foráneas se reparten al azar
+    sobre la tabla padre (si no, todas las filas apuntarían a los mismos 3 padres)."""
+    tablas = [f[0] for f in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    foraneas = {t: {fk[3]: fk[2] for fk in conn.execute(f'PRAGMA foreign_key_list("{t}")')}
+                for t in tablas}
+    # Padres antes que hijos, para conocer el rango final de sus claves
+    tablas.sort(key=lambda t: len(foraneas[t]))
+    for tabla in tablas:
+        info = list(conn.execute(f'PRAGMA table_info("{tabla}")'))
+        unicas = set()
+        for indice in conn.execute(f'PRAGMA index_list("{tabla}")'):
+            if indice[2]:
+                unicas.update(c[2] for c in conn.execute(f'PRAGMA index_info("{indice[1]}")'))
+        pk_entera = [c[1] for c in info if c[5] and c[2].upper() == 'INTEGER']
+        columnas = [c[1] for c in info if c[1] not in pk_entera]
+        if not columnas:
+            continue
+        while True:
+            filas, maximo = conn.execute(f'SELECT COUNT(*), MAX(rowid) FROM "{tabla}"').fetchone()
+            if filas == 0 or filas >= filas_objetivo:
+                break
+            expresiones = []
+            for c in columnas:
+                padre = foraneas[tabla].get(c)
+                if c in unicas:
+                    expresiones.append(f'"{c}" || \'_\' || (rowid + {maximo})')
+                elif padre in tablas:
+                    n_padre = conn.execute(f'SELECT MAX(rowid) FROM "{padre}"').fetchone()[0] or 1
+                    expresiones.append(f'abs(random()) % {n_padre} + 1')
+                else:
+                    expresiones.append(f'"{c}"')
+            lista = ", ".join(f'"{c}"' for c in columnas)
+            conn.execute(
+                f'INSERT INTO "{tabla}" ({lista}) SELECT {", ".join(expresiones)} FROM "{tabla}" '
+                f'LIMIT {filas_objetivo - filas}'
+            )
+    conn.commit()
+
+
+# -----------------------------
+# MEDICIÓN
+# -----------------------------
+def plan_consulta(conn, sql):
+    return [fila[3] for fila in conn.execute(f'EXPLAIN QUERY PLAN {sql}')]
+
+
+def _problemas(plan):
+    """Pasos costosos del plan: recorridos completos y ordenaciones temporales"""
+    return sum(1 for paso in plan
+               if paso.startswith('SCAN ') and 'USING' not in paso or 'TEMP B-TREE' in paso)
+
+
+def medir(conn, sql, repeticiones=5, limite_s=30):
+    """Mejor tiempo (ms) de `repeticiones` ejecuciones completas, tras un calentamiento.
+    Una ejecución que supera `limite_s` se interrumpe y cuenta como infinita; si el
+    calentamiento ya tarda más de un segundo, no se repite."""
+    def ejecutar():
+        fin = time.perf_counter() + limite_s
+        conn.set_progress_handler(lambda: time.perf_counter() > fin, 10_000)
+        inicio = time.perf_counter()
+        try:
+            conn.execute(sql).fetchall()
+        except sqlite3.OperationalError as e:
+            if 'interrupted' not in str(e):
+                raise
+            return float('inf')
+        finally:
+            conn.set_progress_handler(None, 0)
+        return (time.perf_counter() - inicio) * 1000
+
+    primera = ejecutar()
+    if primera > 1000:
+        return primera
+    return min(ejecutar() for _ in range(repeticiones))
+
+
+# -----------------------------
+# CANDIDATOS
+# -----------------------------
+_RESERVADAS = {'where', 'join', 'left', 'right', 'inner', 'outer', 'cross', 'on', 'group',
+               'order', 'having', 'limit', 'natural', 'union', 'using', 'as', 'full'}
+
+
+def _tablas_consulta(conn, sql):
+    """{alias: tabla} para las tablas reales de FROM/JOIN"""
+    existentes = {f[0].lower(): f[0] for f in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'")}
+    alias = {}
+    for tabla, nombre in re.findall(r'(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', sql, re.IGNORECASE):
+        if tabla.lower() not in existentes:
+            continue
+        tabla = existentes[tabla.lower()]
+        alias[tabla.lower()] = tabla
+        if nombre and nombre.lower() not in _RESERVADAS:
+            alias[nombre.lower()] = tabla
+    return alias
+
+
+def _resolver(conn, alias, referencia, columnas_tabla):
+    """'p.cliente_id' o 'cliente_id' -> (tabla, columna) si es inequívoco"""
+    if '.' in referencia:
+        prefijo, columna = referencia.split('.', 1)
+        tabla = alias.get(prefijo.lower())
+        if tabla and columna.lower() in columnas_tabla[tabla]:
+            return tabla, columnas_tabla[tabla][columna.lower()]
+        return None
+    duenos = {t for t in alias.values() if referencia.lower() in columnas_tabla[t]}
+    if len(duenos) == 1:
+        tabla = duenos.pop()
+        return tabla, columnas_tabla[tabla][referencia.lower()]
+    return None
+
+
+def _clave_rowid(conn, tabla):
+    """Columna INTEGER PRIMARY KEY (alias del rowid): ya es la clave del B-tree de la
+    tabla, un índice que empiece por ella no aporta nada"""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ? "
+                    "AND sql LIKE '%WITHOUT ROWID%'", (tabla,)).fetchone():
+        return None
+    pk = [c for c in conn.execute(f'PRAGMA table_info("{tabla}")') if c[5]]
+    if len(pk) == 1 and pk[0][2].upper() == 'INTEGER':
+        return pk[0][1].lower()
+    return None
+
+
+def _indices_existentes(conn, tabla):
+    """Columnas (en minúsculas) de cada índice completo de la tabla. Los parciales no
+    cuentan y una expresión queda como '' para que no coincida con ninguna columna"""
+    return [tuple((c[2] or '').lower() for c in conn.execute(f'PRAGMA index_info("{indice[1]}")'))
+            for indice in conn.execute(f'PRAGMA index_list("{tabla}")') if not indice[4]]
+
+
+def candidatos(conn, sql):
+    """Índices candidatos por tabla a partir de los predicados, joins y ordenaciones.
+
+    Igualdades primero, luego la columna de rango y al final las de ORDER/GROUP BY
+    (regla clásica para índices compuestos); además la variante cubriente con las
+    columnas leídas de esa tabla. Los LIKE '%x%' no son indexables y se omiten, igual
+    que los candidatos que empiezan por la clave rowid o son prefijo de un índice
+    existente."""
+    alias = _tablas_consulta(conn, sql)
+    if not alias:
+        return []
+    columnas_tabla = {t: {c[1].lower(): c[1] for c in conn.execute(f'PRAGMA table_info("{t}")')}
+                      for t in set(alias.values())}
+    ref = r'(\w+(?:\.\w+)?)'
+    igualdad, rango, orden, usadas = {}, {}, {}, {}
+
+    def anotar(destino, referencia):
+        resuelto = _resolver(conn, alias, referencia, columnas_tabla)
+        if resuelto:
+            destino.setdefault(resuelto[0], [])
+            if resuelto[1] not in destino[resuelto[0]]:
+                destino[resuelto[0]].append(resuelto[1])
+
+    for izquierda, derecha in re.findall(ref + r'\s*=\s*' + ref, sql):
+        anotar(igualdad, izquierda)
+        anotar(igualdad, derecha)
+    for referencia in re.findall(ref + r'\s+IN\s*\(', sql, re.IGNORECASE):
+        anotar(igualdad, referencia)
+    for referencia in re.findall(ref + r"\s*(?:<=|>=|<|>|\s+BETWEEN\s|\s+LIKE\s+'[^%_])", sql, re.IGNORECASE):
+        anotar(rango, referencia)
+    for clausula in re.findall(r'(?:ORDER|GROUP)\s+BY\s+(.+?)(?=\bHAVING\b|\bLIMIT\b|\bORDER\b|\)|$)',
+                               sql, re.IGNORECASE | re.DOTALL):
+        for referencia in re.findall(ref + r'(?:\s+(?:ASC|DESC))?\s*(?:,|$)', clausula.strip(), re.IGNORECASE):
+            anotar(orden, referencia)
+    for referencia in re.findall(ref, sql):
+        anotar(usadas, referencia)
+
+    propuestas = []
+    for tabla in set(alias.values()):
+        rowid = _clave_rowid(conn, tabla)
+        existentes = _indices_existentes(conn, tabla)
+
+        def util(base):
+            claves = tuple(c.lower() for c in base)
+            return claves[0] != rowid and not any(e[:len(claves)] == claves for e in existentes)
+
+        eq = igualdad.get(tabla, [])
+        rg = [c for c in rango.get(tabla, []) if c not in eq][:1]
+        od = [c for c in orden.get(tabla, []) if c not in eq + rg]
+        bases = [eq + rg, eq + od, od] + [[c] for c in eq]
+        for base in bases:
+            if not base or not util(base):
+                continue
+            propuestas.append((tabla, tuple(base)))
+            extra = [c for c in usadas.get(tabla, []) if c not in base]
+            if extra and len(base) + len(extra) <= 5 and util(base + extra):
+                propuestas.append((tabla, tuple(base + extra)))
+    return list(dict.fromkeys(propuestas))
+
+
+def _nombre_indice(tabla, columnas):
+    nombre = f"idx_asesor_{tabla}_{'_'.join(columnas)}"
+    if len(nombre) > 60:
+        nombre = nombre[:53] + '_' + hashlib.md5(nombre.encode()).hexdigest()[:6]
+    return nombre
+
+
+def _usa_indice(plan, tabla, columnas):
+    """El plan recorre de verdad el índice candidato (USING [COVERING] INDEX nombre)"""
+    nombre = re.escape(_nombre_indice(tabla, columnas))
+    return any(re.search(rf'USING (?:COVERING )?INDEX {nombre}\b', paso) for paso in plan)
+
+
+def sentencia_indice(tabla, columnas):
+    lista = ", ".join(f'"{c}"' for c in columnas)
+    return f'CREATE INDEX IF NOT EXISTS "{_nombre_indice(tabla, columnas)}" ON "{tabla}" ({lista})'
+
+
+# -----------------------------
+# ASESOR
+# -----------------------------
+def _coste(tiempos, limite_s):
+    """Suma de la carga en ms contando cada timeout como el límite"""
+    return sum(min(ms, limite_s * 1000) for ms in tiempos.values())
+
+
+def asesorar(ruta_db, consultas, ampliar=0, repeticiones=5, mejora_minima=0.10, limite_s=30):
+    """Reproduce la carga en una copia, prueba cada candidato midiendo plan y tiempo,
+    aplica los elegidos juntos y devuelve (reporte, sentencias CREATE INDEX)"""
+    ruta_copia = copia_trabajo(ruta_db)
+    conn = sqlite3.connect(ruta_copia)
+    try:
+        if ampliar:
+            ampliar_tablas(conn, ampliar)
+        conn.execute('ANALYZE')
+
+        antes = {}
+        for i, sql in enumerate(consultas):
+            try:
+                antes[i] = (plan_consulta(conn, sql), medir(conn, sql, repeticiones, limite_s))
+            except sqlite3.Error as e:
+                print(f"Consulta {i} omitida ({e}): {' '.join(sql.split())[:60]}")
+
+        elegidos = {}
+        for i, (plan, ms) in antes.items():
+            if not _problemas(plan):
+                continue
+            mejor = None
+            for tabla, columnas in candidatos(conn, consultas[i]):
+                ddl = sentencia_indice(tabla, columnas)
+                conn.execute(ddl)
+                conn.execute('ANALYZE')
+                nuevo_plan = plan_consulta(conn, consultas[i])
+                nuevo_ms = medir(conn, consultas[i], repeticiones, limite_s)
+                conn.execute(f'DROP INDEX "{_nombre_indice(tabla, columnas)}"')
+                # Sin el índice en el plan, una mejora de tiempo es solo ruido de medición
+                if (_usa_indice(nuevo_plan, tabla, columnas) and nuevo_ms <= ms * (1 - mejora_minima)
+                        and _problemas(nuevo_plan) <= _problemas(plan)):
+                    if mejor is None or nuevo_ms < mejor[0]:
+                        mejor = (nuevo_ms, tabla, columnas)
+            if mejor:
+                elegidos[(mejor[1], mejor[2])] = sentencia_indice(mejor[1], mejor[2])
+
+        # Un índice que es prefijo de otro elegido sobra
+        claves = list(elegidos)
+        for tabla, columnas in claves:
+            if any(t == tabla and len(c) > len(columnas) and c[:len(columnas)] == columnas
+                   for t, c in claves):
+                del elegidos[(tabla, columnas)]
+
+        for ddl in elegidos.values():
+            conn.execute(ddl)
+        conn.execute('ANALYZE')
+        despues = {i: medir(conn, consultas[i], repeticiones, limite_s) for i in antes}
+
+        # Juntos, los índices pueden cambiar el plan de otra consulta a peor: si alguna
+        # empeora, se retira cada índice cuya ausencia no encarece la carga completa
+        if any(despues[i] > ms * (1 + mejora_minima) for i, (_, ms) in antes.items()):
+            for tabla, columnas in list(elegidos):
+                conn.execute(f'DROP INDEX "{_nombre_indice(tabla, columnas)}"')
+                conn.execute('ANALYZE')
+                sin = {i: medir(conn, consultas[i], repeticiones, limite_s) for i in antes}
+                if _coste(sin, limite_s) <= _coste(despues, limite_s):
+                    del elegidos[(tabla, columnas)]
+                    despues = sin
+                else:
+                    conn.execute(elegidos[(tabla, columnas)])
+                    conn.execute('ANALYZE')
+
+        filas = []
+        for i, (plan, ms) in antes.items():
+            nuevo_plan = plan_consulta(conn, consultas[i])
+            nuevo_ms = despues[i]
+            filas.append({
+                'consulta': ' '.join(consultas[i].split())[:70],
+                'ms_antes': round(ms, 3),
+                'ms_despues': round(nuevo_ms, 3),
+                'mejora_x': round(ms / nuevo_ms, 2) if nuevo_ms else None,
+                'plan_antes': ' | '.join(plan),
+                'plan_despues': ' | '.join(nuevo_plan),
+            })
+        return pd.DataFrame(filas), list(elegidos.values())
+    finally:
+        conn.close()
+        os.remove(ruta_copia)
+
+
+# -----------------------------
+# EJECUCIÓN
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Asesor de índices para SQLite guiado por la carga')
+    parser.add_argument('base', help='Base SQLite (no se modifica; se trabaja sobre una copia)')
+    parser.add_argument('carga', nargs='+', help='Archivos .sql con las consultas a reproducir')
+    parser.add_argument('--ampliar', type=int, default=0,
+                        help='Filas por tabla en la copia para medir a escala (0 = tal cual)')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--limite', type=float, default=30,
+                        help='Segundos máximos por ejecución (más se cuenta como infinito)')
+    parser.add_argument('--salida', help='Archivo .sql donde escribir los CREATE INDEX propuestos')
+    args = parser.parse_args(argv)
+
+    consultas = [c for ruta in args.carga for c in leer_carga(ruta)]
+    print(f"Reproduciendo {len(consultas)} consultas sobre una copia de {args.base}")
+    reporte, indices = asesorar(args.base, consultas, args.ampliar, args.repeticiones,
+                                limite_s=args.limite)
+
+    with pd.option_context('display.max_colwidth', 70, 'display.width', 200):
+        print(reporte[['consulta', 'ms_antes', 'ms_despues', 'mejora_x']].to_string(index=False))
+    limite_ms = args.limite * 1000
+    total_antes = reporte['ms_antes'].clip(upper=limite_ms).sum()
+    total_despues = reporte['ms_despues'].clip(upper=limite_ms).sum()
+    print(f"\nTotal (timeouts = {args.limite:g} s): {total_antes:.2f} ms -> {total_despues:.2f} ms")
+    print("\nÍndices propuestos:" if indices else "\nNingún índice mejora la carga de forma medible")
+    for ddl in indices:
+        print(f"  {ddl};")
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write("\n".join(f"{ddl};" for ddl in indices) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+
+# -----------------------------
+# HUELLAS DE LAS ENTRADAS
+# -----------------------------
+def huella_archivo(ruta, con_hash=False):
+    """mtime y tamaño del archivo (y opcionalmente su sha1, más lento pero exacto)"""
+    info = os.stat(ruta)
+    huella = {'ruta': os.path.abspath(ruta), 'mtime': info.st_mtime_ns, 'bytes': info.st_size}
+    if con_hash:
+        sha = hashlib.sha1()
+        with open(ruta, 'rb') as f:
+            for bloque in iter(lambda: f.read(1 << 20), b''):
+                sha.update(bloque)
+        huella['sha1'] = sha.hexdigest()
+    return huella
+
+
+def huella_base(conn):
+    """Archivos de las bases de `conn` (principal y adjuntas) con su mtime y tamaño, y
+    los del -wal si existe: identifican la base y cambian con cualquier escritura
+    confirmada, también con un UPDATE que no altera filas ni ids. None si la base
+    principal está en memoria o es temporal (no tiene identidad estable entre sesiones)"""
+    archivos = {nombre: archivo for _, nombre, archivo in conn.execute('PRAGMA database_list')}
+    if not archivos.get('main'):
+        return None
+    huella = {}
+    for nombre, archivo in sorted(archivos.items()):
+        if not archivo:
+            continue
+        huella[nombre] = huella_archivo(archivo)
+        if os.path.exists(archivo + '-wal'):
+            wal = os.stat(archivo + '-wal')
+            huella[nombre]['wal'] = (wal.st_mtime_ns, wal.st_size)
+    return huella
+
+
+def huella_tabla(conn, tabla, columna_id='rowid'):
+    """Número de filas y máximo id de una tabla SQLite: cambia con inserciones y borrados.
+    No detecta UPDATE; para eso está huella_base"""
+    filas, maximo = conn.execute(
+        f'SELECT COUNT(*), MAX("{columna_id}") FROM "{tabla}"'
+    ).fetchone()
+    return {'tabla': tabla, 'filas': filas, 'max_id': maximo}
+
+
+def _clave(*partes):
+    texto = json.dumps(partes, sort_keys=True, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+# -----------------------------
+# CACHÉ PERSISTENTE DE RESULTADOS
+# -----------------------------
+class CacheResultados:
+    """Memoización en disco de resultados tabulares guardados como Parquet.
+
+    La clave combina el texto de la consulta (o el código de la función) con las
+    huellas de sus entradas, de modo que un cambio en los datos invalida el resultado.
+    Un índice SQLite guarda tamaño y último acceso para expulsar por LRU cuando se
+    supera `max_bytes`, y las entradas más viejas que `ttl` segundos se descartan."""
+
+    def __init__(self, directorio='.cache_consultas', max_bytes=512 * 1024 ** 2, ttl=None):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(directorio, exist_ok=True)
+        self.indice = sqlite3.connect(os.path.join(directorio, 'indice.db'))
+        self.indice.execute('''
+            CREATE TABLE IF NOT EXISTS entradas (
+                clave TEXT PRIMARY KEY,
+                descripcion TEXT,
+                bytes INTEGER,
+                creado REAL,
+                ultimo_acceso REAL
+            )
+        ''')
+        self.indice.commit()
+        self.estadisticas = []
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f'{clave}.parquet')
+
+    def _registrar(self, descripcion, resultado, inicio):
+        self.estadisticas.append({
+            'consulta': descripcion[:60],
+            'resultado': resultado,
+            'segundos': time.perf_counter() - inicio,
+        })
+
+    # --------------------------------------------------
+    # LECTURA / ESCRITURA
+    # --------------------------------------------------
+    def obtener(self, clave):
+        fila = self.indice.execute(
+            'SELECT creado FROM entradas WHERE clave = ?', (clave,)
+        ).fetchone()
+        if fila is None:
+            return None
+        if (self.ttl is not None and time.time() - fila[0] > self.ttl) \
+                or not os.path.exists(self._ruta(clave)):
+            self.invalidar(clave)
+            return None
+        self.indice.execute(
+            'UPDATE entradas SET ultimo_acceso = ? WHERE clave = ?', (time.time(), clave)
+        )
+        self.indice.commit()
+        return pd.read_parquet(self._ruta(clave))
+
+    def guardar(self, clave, df, descripcion=''):
+        ruta = self._ruta(clave)
+        df.to_parquet(ruta, engine='pyarrow', compression='zstd')
+        ahora = time.time()
+        self.indice.execute(
+            'INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?)',
+            (clave, descripcion, os.path.getsize(ruta), ahora, ahora)
+        )
+        self.indice.commit()
+        self._expulsar()
+
+    def invalidar(self, clave):
+        self.indice.execute('DELETE FROM entradas WHERE clave = ?', (clave,))
+        self.indice.commit()
+        if os.path.exists(self._ruta(clave)):
+            os.remove(self._ruta(clave))
+
+    def _expulsar(self):
+        """Elimina entradas caducadas y, si hace falta, las menos usadas recientemente"""
+        if self.ttl is not None:
+            for (clave,) in self.indice.execute(
+                'SELECT clave FROM entradas WHERE creado < ?', (time.time() - self.ttl,)
+            ).fetchall():
+                self.invalidar(clave)
+
+        total = self.indice.execute('SELECT COALESCE(SUM(bytes), 0) FROM entradas').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for clave, bytes_ in self.indice.execute(
+            'SELECT clave, bytes FROM entradas ORDER BY ultimo_acceso'
+        ).fetchall():
+            self.invalidar(clave)
+            total -= bytes_
+            if total <= self.max_bytes:
+                break
+
+    # --------------------------------------------------
+    # API DE MEMOIZACIÓN
+    # --------------------------------------------------
+    def obtener_o_calcular(self, descripcion, calcular, huellas=()):
+        """Devuelve el resultado cacheado para (descripcion, huellas) o lo calcula"""
+        inicio = time.perf_counter()
+        clave = _clave(descripcion, list(huellas))
+        df = self.obtener(clave)
+        if df is not None:
+            self._registrar(descripcion, 'hit', inicio)
+            return df
+        df = calcular()
+        self.guardar(clave, df, descripcion)
+        self._registrar(descripcion, 'miss', inicio)
+        return df
+
+    def consulta_sql(self, conn, sql, tablas, parametros=None):
+        """pd.read_sql cacheado. La clave incluye qué base es y su estado (huella_base),
+        así que cualquier escritura confirmada en ella invalida el resultado, además
+        de las filas y max id de `tablas`"""
+        base = huella_base(conn)
+        if base is None or conn.in_transaction:
+            # Base sin archivo o con cambios sin confirmar (no se reflejan en el
+            # archivo): no hay forma fiable de reconocer el resultado, no se cachea
+            return pd.read_sql(sql, conn, params=parametros)
+        huellas = [base] + [huella_tabla(conn, t) for t in tablas]
+        return self.obtener_o_calcular(
+            ' '.join(sql.split()) + json.dumps(parametros, default=str),
+            lambda: pd.read_sql(sql, conn, params=parametros),
+            huellas,
+        )
+
+    def memoizar(self, archivos=(), con_hash=False):
+        """Decorador para funciones que devuelven DataFrames a partir de archivos"""
+        def decorador(func):
+            try:
+                codigo = inspect.getsource(func)
+            except (OSError, TypeError):
+                codigo = func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                huellas = [huella_archivo(r, con_hash) for r in archivos]
+                descripcion = f"{func.__module__}.{func.__qualname__}"
+                return self.obtener_o_calcular(
+                    descripcion,
+                    lambda: func(*args, **kwargs),
+                    [codigo, repr(args), repr(sorted(kwargs.items()))] + huellas,
+                )
+            return wrapper
+        return decorador
+
+    # --------------------------------------------------
+    # REPORTE
+    # --------------------------------------------------
+    def reporte(self):
+        """Resumen de aciertos, fallos y latencias de esta sesión"""
+        if not self.estadisticas:
+            return pd.DataFrame(columns=['resultado', 'llamadas', 'segundos_medios'])
+        df = pd.DataFrame(self.estadisticas)
+        return df.groupby('resultado').agg(
+            llamadas=('segundos', 'count'),
+            segundos_medios=('segundos', 'mean'),
+            segundos_max=('segundos', 'max'),
+        )
+
+    def cerrar(self):
+        self.indice.close()
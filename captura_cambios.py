@@ -0,0 +1,324 @@
+import glob
+import json
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+
+
+TABLA_CAMBIOS = '_cdc_cambios'
+TABLA_OFFSETS = '_cdc_offsets'
+
+
+# -----------------------------
+# INSTALACIÓN DE TRIGGERS
+# -----------------------------
+def _tablas_usuario(conn):
+    return [fila[0] for fila in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' "
+        "AND name NOT LIKE 'sqlite_%' AND name NOT LIKE '_cdc_%' ORDER BY name"
+    )]
+
+
+def clave_tabla(conn, tabla):
+    """Columna de clave primaria simple; sin ella (p. ej. ventas.db) se usa el rowid"""
+    pk = [fila[1] for fila in conn.execute(f'PRAGMA table_info("{tabla}")') if fila[5]]
+    return pk[0] if len(pk) == 1 else 'rowid'
+
+
+def _json_fila(conn, tabla, prefijo):
+    columnas = [fila[1] for fila in conn.execute(f'PRAGMA table_info("{tabla}")')]
+    pares = ", ".join(f"'{c}', {prefijo}.\"{c}\"" for c in columnas)
+    return f"json_object({pares})"
+
+
+def instalar_captura(conn, tablas=None):
+    """Crea la tabla de cambios y triggers AFTER INSERT/UPDATE/DELETE en cada tabla.
+
+    Cada cambio es una fila (seq, tabla, operacion, clave, datos): `seq` es
+    AUTOINCREMENT, así nunca se reutiliza aunque se poden entradas, y `datos` es la
+    fila nueva en JSON (vacío en los borrados). Es idempotente."""
+    conn.executescript(f'''
+        CREATE TABLE IF NOT EXISTS {TABLA_CAMBIOS} (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabla TEXT NOT NULL,
+            operacion TEXT NOT NULL CHECK (operacion IN ('I', 'U', 'D')),
+            clave NOT NULL,  -- sin afinidad: los enteros se guardan como enteros
+            datos TEXT,
+            ts TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+        );
+        CREATE TABLE IF NOT EXISTS {TABLA_OFFSETS} (
+            consumidor TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL
+        );
+    ''')
+    tablas = tablas or _tablas_usuario(conn)
+    for tabla in tablas:
+        clave = clave_tabla(conn, tabla)
+        nuevo = _json_fila(conn, tabla, 'NEW')  # los borrados solo necesitan la clave
+        conn.executescript(f'''
+            DROP TRIGGER IF EXISTS "_cdc_{tabla}_i";
+            DROP TRIGGER IF EXISTS "_cdc_{tabla}_u";
+            DROP TRIGGER IF EXISTS "_cdc_{tabla}_d";
+            CREATE TRIGGER "_cdc_{tabla}_i" AFTER INSERT ON "{tabla}" BEGIN
+                INSERT INTO {TABLA_CAMBIOS} (tabla, operacion, clave, datos)
+                VALUES ('{tabla}', 'I', NEW.{clave}, {nuevo});
+            END;
+            CREATE TRIGGER "_cdc_{tabla}_u" AFTER UPDATE ON "{tabla}" BEGIN
+                -- Si cambia la clave, la fila vieja desaparece para el destino
+                INSERT INTO {TABLA_CAMBIOS} (tabla, operacion, clave)
+                SELECT '{tabla}', 'D', OLD.{clave} WHERE OLD.{clave} IS NOT NEW.{clave};
+                INSERT INTO {TABLA_CAMBIOS} (tabla, operacion, clave, datos)
+                VALUES ('{tabla}', 'U', NEW.{clave}, {nuevo});
+            END;
+            CREATE TRIGGER "_cdc_{tabla}_d" AFTER DELETE ON "{tabla}" BEGIN
+                INSERT INTO {TABLA_CAMBIOS} (tabla, operacion, clave)
+                VALUES ('{tabla}', 'D', OLD.{clave});
+            END;
+        ''')
+    conn.commit()
+    return tablas
+
+
+def desinstalar_captura(conn, borrar_log=False):
+    for (trigger,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '\\_cdc\\_%' ESCAPE '\\'"
+    ).fetchall():
+        conn.execute(f'DROP TRIGGER "{trigger}"')
+    if borrar_log:
+        conn.execute(f'DROP TABLE IF EXISTS {TABLA_CAMBIOS}')
+        conn.execute(f'DROP TABLE IF EXISTS {TABLA_OFFSETS}')
+    conn.commit()
+
+
+# -----------------------------
+# DESTINOS
+# -----------------------------
+class DestinoParquet:
+    """Copia de una tabla en Parquet con fusión al leer: cada lote de cambios se
+    escribe como un delta pequeño (coste proporcional a los cambios) y `compactar`
+    reescribe la base cuando conviene."""
+
+    def __init__(self, directorio, tabla, clave):
+        self.directorio = os.path.join(directorio, tabla)
+        self.tabla = tabla
+        self.clave = clave
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def _deltas(self, prefijo='delta'):
+        return sorted(glob.glob(os.path.join(self.directorio, f'{prefijo}_*.parquet')))
+
+    def aplicar(self, filas, borrados):
+        """filas: columnas de la tabla + _seq; borrados: clave + _seq. Los borrados van
+        en un archivo aparte, así los deltas de filas conservan los tipos."""
+        if filas.empty and borrados.empty:
+            return  # p. ej. snapshot de una tabla vacía: nada que escribir
+        sufijo = f"{int(pd.concat([filas['_seq'], borrados['_seq']]).max()):012d}.parquet"
+        if not filas.empty:
+            filas.to_parquet(os.path.join(self.directorio, f'delta_{sufijo}'),
+                             engine='pyarrow', index=False)
+        if not borrados.empty:
+            borrados.to_parquet(os.path.join(self.directorio, f'borrados_{sufijo}'),
+                                engine='pyarrow', index=False)
+
+    def leer(self):
+        """Estado actual: base + deltas, última versión de cada clave, sin borrados"""
+        partes = []
+        base = os.path.join(self.directorio, 'base.parquet')
+        if os.path.exists(base):
+            partes.append(pd.read_parquet(base).assign(_seq=0))
+        partes += [pd.read_parquet(r) for r in self._deltas()]
+        if not partes:
+            return pd.DataFrame()
+        todo = pd.concat(partes, ignore_index=True).sort_values('_seq', kind='stable')
+        ultimo = todo.drop_duplicates(self.clave, keep='last')
+        borrados = [pd.read_parquet(r) for r in self._deltas('borrados')]
+        if borrados:
+            # Una fila sigue viva si su última versión es posterior a su último borrado
+            ultimo_borrado = pd.concat(borrados).groupby(self.clave)['_seq'].max()
+            seq_borrado = ultimo[self.clave].map(ultimo_borrado).fillna(-1)
+            ultimo = ultimo[ultimo['_seq'] > seq_borrado]
+        return ultimo.drop(columns='_seq').sort_values(self.clave).reset_index(drop=True)
+
+    def compactar(self):
+        estado = self.leer()
+        ruta_tmp = os.path.join(self.directorio, 'base.parquet.tmp')
+        estado.to_parquet(ruta_tmp, engine='pyarrow', index=False)
+        deltas = self._deltas() + self._deltas('borrados')
+        os.replace(ruta_tmp, os.path.join(self.directorio, 'base.parquet'))
+        for ruta in deltas:
+            os.remove(ruta)
+        return len(estado)
+
+
+def _nativo(valor):
+    if valor is None or (isinstance(valor, float) and valor != valor) or valor is pd.NA:
+        return None
+    return valor.item() if hasattr(valor, 'item') else valor
+
+
+class DestinoSQL:
+    """Aplica los cambios a una tabla de un DW vía DB-API con upsert
+    (INSERT ... ON CONFLICT, válido en SQLite >= 3.24 y PostgreSQL).
+
+    `conn` es una conexión DB-API o la ruta de una base SQLite (se abre una conexión
+    propia). Nunca debe ser la conexión de origen: cada aplicar() hace commit y
+    cerraría la transacción de lectura del snapshot inicial."""
+
+    def __init__(self, conn, tabla, clave, marcador='?'):
+        if isinstance(conn, (str, os.PathLike)):
+            conn = sqlite3.connect(conn)
+        self.conn = conn
+        self.tabla = tabla
+        self.clave = clave
+        self.marcador = marcador
+
+    def aplicar(self, filas, borrados):
+        upserts = filas.drop(columns='_seq')
+        cursor = self.conn.cursor()
+        if not borrados.empty:
+            cursor.executemany(
+                f'DELETE FROM "{self.tabla}" WHERE "{self.clave}" = {self.marcador}',
+                [(_nativo(v),) for v in borrados[self.clave]],
+            )
+        if not upserts.empty:
+            columnas = list(upserts.columns)
+            lista = ", ".join(f'"{c}"' for c in columnas)
+            marcas = ", ".join([self.marcador] * len(columnas))
+            asignaciones = ", ".join(f'"{c}" = excluded."{c}"' for c in columnas if c != self.clave)
+            cursor.executemany(
+                f'INSERT INTO "{self.tabla}" ({lista}) VALUES ({marcas}) '
+                f'ON CONFLICT ("{self.clave}") DO UPDATE SET {asignaciones}',
+                [tuple(_nativo(v) for v in fila) for fila in upserts.itertuples(index=False, name=None)],
+            )
+        self.conn.commit()
+
+
+# -----------------------------
+# CONSUMIDOR
+# -----------------------------
+class ConsumidorCambios:
+    """Lee el log de cambios por lotes a partir de su offset guardado en la propia
+    base, los entrega por tabla a los destinos y avanza el offset tras aplicarlos
+    (entrega al menos una vez: los destinos son idempotentes por clave)."""
+
+    def __init__(self, conn, nombre, destinos, lote=10_000):
+        self.conn = conn
+        self.nombre = nombre
+        self.destinos = destinos  # {tabla: destino con .aplicar(filas, borrados) y .clave}
+        self.lote = lote
+        for tabla, destino in destinos.items():
+            if getattr(destino, 'conn', None) is conn:
+                raise ValueError(f"El destino de '{tabla}' usa la conexión de origen: "
+                                 "dale su propia conexión (sus commits romperían el snapshot)")
+        self.conn.execute(
+            # -1: aún sin snapshot inicial (y bloquea la poda hasta tenerlo)
+            f'INSERT OR IGNORE INTO {TABLA_OFFSETS} (consumidor, seq) VALUES (?, -1)', (nombre,)
+        )
+        self.conn.commit()
+
+    @property
+    def offset(self):
+        return self.conn.execute(
+            f'SELECT seq FROM {TABLA_OFFSETS} WHERE consumidor = ?', (self.nombre,)
+        ).fetchone()[0]
+
+    def _confirmar(self, seq):
+        self.conn.execute(
+            f'UPDATE {TABLA_OFFSETS} SET seq = ? WHERE consumidor = ?', (seq, self.nombre)
+        )
+        self.conn.commit()
+
+    def snapshot_inicial(self):
+        """Carga completa única: copia las tablas y fija el offset en el último cambio
+        visible en esa misma lectura (una transacción de lectura para ambas cosas)"""
+        self.conn.execute('BEGIN')
+        try:
+            seq = self.conn.execute(f'SELECT COALESCE(MAX(seq), 0) FROM {TABLA_CAMBIOS}').fetchone()[0]
+            for tabla, destino in self.destinos.items():
+                clave = destino.clave
+                select = f'SELECT rowid AS rowid, * FROM "{tabla}"' if clave == 'rowid' else f'SELECT * FROM "{tabla}"'
+                df = pd.read_sql(select, self.conn)
+                destino.aplicar(df.assign(_seq=seq), pd.DataFrame({clave: [], '_seq': []}))
+        finally:
+            self.conn.commit()
+        self._confirmar(seq)
+        return seq
+
+    def _separar(self, cambios, clave):
+        """Filas nuevas (JSON expandido en columnas) y claves borradas de un lote"""
+        es_borrado = (cambios['operacion'] == 'D').to_numpy()
+        vivos = cambios[~es_borrado]
+        filas = pd.DataFrame.from_records([json.loads(d) for d in vivos['datos']])
+        # La clave sale del log (para rowid no va en el JSON)
+        filas[clave] = vivos['clave'].to_numpy()
+        filas['_seq'] = vivos['seq'].to_numpy()
+        borrados = pd.DataFrame({clave: cambios['clave'].to_numpy()[es_borrado],
+                                 '_seq': cambios['seq'].to_numpy()[es_borrado]})
+        return filas, borrados
+
+    def consumir(self, max_lotes=None):
+        """Procesa lotes hasta vaciar el log (o `max_lotes`). Devuelve cambios leídos."""
+        total = 0
+        lotes = 0
+        while max_lotes is None or lotes < max_lotes:
+            cambios = pd.read_sql(
+                f'SELECT seq, tabla, operacion, clave, datos FROM {TABLA_CAMBIOS} '
+                f'WHERE seq > ? ORDER BY seq LIMIT ?',
+                self.conn, params=(self.offset, self.lote),
+            )
+            if cambios.empty:
+                break
+            for tabla, grupo in cambios.groupby('tabla', sort=False):
+                destino = self.destinos.get(tabla)
+                if destino is None:
+                    continue
+                # Dentro del lote basta la última operación por clave
+                grupo = grupo.drop_duplicates('clave', keep='last')
+                destino.aplicar(*self._separar(grupo, destino.clave))
+            self._confirmar(int(cambios['seq'].max()))
+            total += len(cambios)
+            lotes += 1
+        return total
+
+    def podar(self):
+        """Borra del log lo ya consumido por todos los consumidores registrados"""
+        minimo = self.conn.execute(f'SELECT MIN(seq) FROM {TABLA_OFFSETS}').fetchone()[0] or 0
+        borradas = self.conn.execute(f'DELETE FROM {TABLA_CAMBIOS} WHERE seq <= ?', (minimo,)).rowcount
+        self.conn.commit()
+        return borradas
+
+
+def destinos_parquet(conn, directorio, tablas=None):
+    """Un DestinoParquet por tabla capturada, con su clave detectada"""
+    tablas = tablas or _tablas_usuario(conn)
+    return {t: DestinoParquet(directorio, t, clave_tabla(conn, t)) for t in tablas}
+
+
+# -----------------------------
+# EJECUCIÓN
+# -----------------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ('instalar', 'sincronizar', 'estado'):
+        print("Uso: python captura_cambios.py instalar|sincronizar|estado BASE.db [DIRECTORIO_PARQUET]")
+        sys.exit(1)
+    accion, ruta_db = sys.argv[1], sys.argv[2]
+    conn = sqlite3.connect(ruta_db)
+
+    if accion == 'instalar':
+        print(f"Captura instalada en: {', '.join(instalar_captura(conn))}")
+    elif accion == 'estado':
+        pendientes = conn.execute(f'SELECT COUNT(*), MIN(seq), MAX(seq) FROM {TABLA_CAMBIOS}').fetchone()
+        print(f"Cambios en el log: {pendientes[0]} (seq {pendientes[1]}..{pendientes[2]})")
+        for consumidor, seq in conn.execute(f'SELECT consumidor, seq FROM {TABLA_OFFSETS}'):
+            print(f"  {consumidor}: offset {seq}")
+    else:
+        directorio = sys.argv[3] if len(sys.argv) > 3 else 'cdc_parquet'
+        consumidor = ConsumidorCambios(conn, f'parquet:{os.path.abspath(directorio)}',
+                                       destinos_parquet(conn, directorio))
+        if consumidor.offset < 0:
+            print(f"Snapshot inicial hasta seq {consumidor.snapshot_inicial()}")
+        print(f"Cambios aplicados: {consumidor.consumir()}")
+        print(f"Entradas podadas: {consumidor.podar()}")
+    conn.close()
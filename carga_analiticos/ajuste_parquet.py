@@ -0,0 +1,244 @@
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# -----------------------------
+# CANDIDATOS
+# -----------------------------
+CODECS = [('snappy', None), ('lz4', None), ('zstd', 1), ('zstd', 3), ('zstd', 9),
+          ('gzip', 6), ('none', None)]
+TAMANOS_GRUPO = [65_536, 131_072, 262_144, 524_288, 1_048_576]
+
+# Coste de un escaneo = decodificar + transferir el archivo. El ancho de banda
+# (MB/s) convierte el tamaño en tiempo: con almacenamiento lento o remoto pesa más
+# el tamaño, leyendo de caché pesa más la CPU. La escritura pesa `escritura` veces
+# un escaneo (se escribe una vez, se lee muchas)
+OBJETIVOS = {
+    'equilibrado': {'mb_s': 200, 'escritura': 0.25},
+    'almacenamiento': {'mb_s': 50, 'escritura': 0.1},
+    'lectura': {'mb_s': 1000, 'escritura': 0.1},
+}
+TOLERANCIA_GRUPOS = 0.05  # row group más pequeño cuyo coste no supere al mejor en un 5%
+
+
+def _codificaciones(tipo):
+    """Codificaciones a probar según el tipo Arrow ('dictionary' = diccionario + RLE)"""
+    if pa.types.is_integer(tipo) or pa.types.is_temporal(tipo):
+        return ['dictionary', 'PLAIN', 'DELTA_BINARY_PACKED']
+    if pa.types.is_floating(tipo):
+        return ['dictionary', 'PLAIN', 'BYTE_STREAM_SPLIT']
+    if pa.types.is_string(tipo) or pa.types.is_large_string(tipo) or pa.types.is_binary(tipo):
+        return ['dictionary', 'PLAIN', 'DELTA_LENGTH_BYTE_ARRAY', 'DELTA_BYTE_ARRAY']
+    return ['dictionary', 'PLAIN']
+
+
+def _opciones(columna, codec, nivel, codificacion):
+    opciones = {'compression': {columna: codec}, 'use_dictionary': codificacion == 'dictionary'}
+    if nivel is not None:
+        opciones['compression_level'] = {columna: nivel}
+    if codificacion != 'dictionary':
+        opciones['column_encoding'] = {columna: codificacion}
+    return opciones
+
+
+# -----------------------------
+# MEDICIÓN
+# -----------------------------
+def muestra_por_bloques(df, filas=200_000, bloques=8, semilla=42):
+    """Muestra de `filas` filas en bloques contiguos: conserva las rachas y el orden
+    que aprovechan RLE/delta, cosa que un muestreo fila a fila destruiría"""
+    if len(df) <= filas:
+        return df
+    largo = filas // bloques
+    rng = np.random.default_rng(semilla)
+    inicios = np.sort(rng.choice(len(df) - largo, size=bloques, replace=False))
+    return pd.concat([df.iloc[i:i + largo] for i in inicios])
+
+
+def medir(tabla, repeticiones=3, **opciones):
+    """Tamaño, tiempo de escritura y de lectura completa (el mejor de `repeticiones`).
+    Se escribe en memoria: sin ruido de disco; el coste de E/S lo representa el tamaño"""
+    escrituras, lecturas = [], []
+    for _ in range(repeticiones):
+        salida = pa.BufferOutputStream()
+        t0 = time.perf_counter()
+        pq.write_table(tabla, salida, **opciones)
+        escrituras.append(time.perf_counter() - t0)
+        datos = salida.getvalue()
+        t0 = time.perf_counter()
+        pq.read_table(pa.BufferReader(datos))
+        lecturas.append(time.perf_counter() - t0)
+    return {'bytes': datos.size, 'escritura_s': min(escrituras), 'lectura_s': min(lecturas)}
+
+
+def _coste(resultado, objetivo):
+    pesos = OBJETIVOS[objetivo]
+    escaneo = resultado['lectura_s'] + resultado['bytes'] / (pesos['mb_s'] * 1024 ** 2)
+    resultado['coste_s'] = escaneo + pesos['escritura'] * resultado['escritura_s']
+    return resultado['coste_s']
+
+
+def ajustar_columna(tabla, columna, objetivo='equilibrado', repeticiones=3):
+    """Prueba codec × nivel × codificación sobre una sola columna"""
+    sub = tabla.select([columna])
+    resultados = []
+    for codificacion in _codificaciones(sub.schema.field(0).type):
+        for codec, nivel in CODECS:
+            if codec != 'none' and not pa.Codec.is_available(codec):
+                continue
+            try:
+                r = medir(sub, repeticiones, **_opciones(columna, codec, nivel, codificacion))
+            except (OSError, pa.ArrowNotImplementedError, pa.ArrowInvalid):
+                break  # codificación no soportada para este tipo
+            r.update(codec=codec, nivel=nivel, codificacion=codificacion)
+            resultados.append(r)
+    return min(resultados, key=lambda r: _coste(r, objetivo)), resultados
+
+
+# -----------------------------
+# CONFIGURACIÓN DEL ESCRITOR
+# -----------------------------
+def configuracion_base(columnas):
+    """Lo que hacía cargar_a_parquet hasta ahora: snappy + diccionario en todo"""
+    return {'compression': {c: 'snappy' for c in columnas}, 'compression_level': {},
+            'use_dictionary': list(columnas), 'column_encoding': {}, 'row_group_size': None}
+
+
+def opciones_escritura(configuracion, columnas=None):
+    """kwargs para pq.write_table / DataFrame.to_parquet a partir de la configuración.
+    Columnas que la configuración no conoce van con snappy + diccionario (si no
+    aparecen en el dict de compresión, pyarrow las dejaría sin comprimir)"""
+    columnas = list(columnas if columnas is not None else configuracion['compression'])
+    compresion = {c: configuracion['compression'].get(c, 'snappy') for c in columnas}
+    codificacion = {c: e for c, e in configuracion['column_encoding'].items() if c in columnas}
+    opciones = {
+        'compression': compresion,
+        'use_dictionary': [c for c in columnas if c not in codificacion
+                           and (c in configuracion['use_dictionary']
+                                or c not in configuracion['compression'])],
+    }
+    niveles = {c: n for c, n in configuracion['compression_level'].items() if c in columnas}
+    if niveles:
+        opciones['compression_level'] = niveles
+    if codificacion:
+        opciones['column_encoding'] = codificacion
+    if configuracion.get('row_group_size'):
+        opciones['row_group_size'] = configuracion['row_group_size']
+    return opciones
+
+
+def ajustar(df, filas=200_000, filas_grupos=2_100_000, objetivo='equilibrado',
+            repeticiones=3, semilla=42):
+    """Mide sobre muestras del DataFrame y devuelve (configuración, informe).
+    Los row groups se comparan sobre una muestra mayor (`filas_grupos`): con menos
+    filas que el tamaño de grupo no hay nada que medir"""
+    tabla = pa.Table.from_pandas(muestra_por_bloques(df, filas, semilla=semilla),
+                                 preserve_index=False)
+    configuracion = {'compression': {}, 'compression_level': {}, 'use_dictionary': [],
+                     'column_encoding': {}, 'row_group_size': None}
+    informe = {'objetivo': objetivo, 'filas_muestra': tabla.num_rows, 'columnas': {}}
+
+    for columna in tabla.column_names:
+        mejor, resultados = ajustar_columna(tabla, columna, objetivo, repeticiones)
+        base = next(r for r in resultados if r['codec'] == 'snappy'
+                    and r['codificacion'] == 'dictionary')
+        configuracion['compression'][columna] = mejor['codec']
+        if mejor['nivel'] is not None:
+            configuracion['compression_level'][columna] = mejor['nivel']
+        if mejor['codificacion'] == 'dictionary':
+            configuracion['use_dictionary'].append(columna)
+        else:
+            configuracion['column_encoding'][columna] = mejor['codificacion']
+        informe['columnas'][columna] = {'elegido': mejor, 'snappy': base,
+                                        'candidatos': len(resultados)}
+
+    # Tamaño de row group con la codificación por columna ya fijada. Grupos pequeños
+    # permiten saltar más datos con filtros (estadísticas por grupo) y leen con menos
+    # memoria; grandes comprimen mejor. Se elige el más pequeño cercano al mejor coste
+    grande = pa.Table.from_pandas(muestra_por_bloques(df, filas_grupos, bloques=2, semilla=semilla),
+                                  preserve_index=False)
+    tamanos = [t for t in TAMANOS_GRUPO if t <= grande.num_rows // 2] or [grande.num_rows]
+    resultados = []
+    for tamano in tamanos:
+        configuracion['row_group_size'] = tamano
+        r = medir(grande, repeticiones, **opciones_escritura(configuracion))
+        r.update(row_group_size=tamano, filas=grande.num_rows)
+        _coste(r, objetivo)
+        resultados.append(r)
+    minimo = min(r['coste_s'] for r in resultados)
+    configuracion['row_group_size'] = min(r['row_group_size'] for r in resultados
+                                          if r['coste_s'] <= minimo * (1 + TOLERANCIA_GRUPOS))
+    informe['row_groups'] = resultados
+
+    informe['total'] = {
+        'snappy': medir(grande, repeticiones, **opciones_escritura(configuracion_base(grande.column_names))),
+        'ajustado': medir(grande, repeticiones, **opciones_escritura(configuracion)),
+    }
+    return configuracion, informe
+
+
+def guardar_configuracion(configuracion, ruta, informe=None):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump({'escritor': configuracion, 'informe': informe}, f, indent=2, default=str)
+
+
+def cargar_configuracion(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)['escritor']
+
+
+def imprimir_informe(informe):
+    print(f"\nAJUSTE PARQUET (objetivo: {informe['objetivo']}, "
+          f"muestra: {informe['filas_muestra']:,} filas)")
+    print(f"{'columna':20} {'elegido':28} {'KB':>9} {'vs snappy':>10} {'lectura ms':>11}")
+    for columna, datos in informe['columnas'].items():
+        e, s = datos['elegido'], datos['snappy']
+        nombre = f"{e['codec']}{'' if e['nivel'] is None else ':' + str(e['nivel'])}/{e['codificacion']}"
+        print(f"{columna:20} {nombre:28} {e['bytes'] / 1024:9.1f} "
+              f"{e['bytes'] / s['bytes'] - 1:+10.0%} {e['lectura_s'] * 1000:11.2f}")
+    print(f"\nRow groups (muestra de {informe['row_groups'][0]['filas']:,} filas):")
+    for r in informe['row_groups']:
+        print(f"  {r['row_group_size']:>9,} filas  {r['bytes'] / 1024:9.1f} KB  "
+              f"lectura {r['lectura_s'] * 1000:7.1f} ms  coste {r['coste_s'] * 1000:7.1f} ms")
+    s, a = informe['total']['snappy'], informe['total']['ajustado']
+    print(f"\nTotal snappy:   {s['bytes'] / 1024:9.1f} KB  escritura {s['escritura_s'] * 1000:7.1f} ms  "
+          f"lectura {s['lectura_s'] * 1000:7.1f} ms")
+    print(f"Total ajustado: {a['bytes'] / 1024:9.1f} KB  escritura {a['escritura_s'] * 1000:7.1f} ms  "
+          f"lectura {a['lectura_s'] * 1000:7.1f} ms")
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Mide codec/codificación por columna y tamaño de row group sobre datos reales')
+    parser.add_argument('origen', help='Archivo .parquet o .csv con datos representativos')
+    parser.add_argument('--salida', default='parquet_config.json')
+    parser.add_argument('--filas', type=int, default=200_000,
+                        help='Filas de la muestra para codec/codificación por columna')
+    parser.add_argument('--filas-grupos', type=int, default=2_100_000,
+                        help='Filas de la muestra para el tamaño de row group')
+    parser.add_argument('--objetivo', choices=sorted(OBJETIVOS), default='equilibrado')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.origen.endswith('.csv'):
+        df = pd.read_csv(args.origen)
+    else:
+        df = pd.read_parquet(args.origen)
+    configuracion, informe = ajustar(df, args.filas, args.filas_grupos, args.objetivo,
+                                   args.repeticiones)
+    imprimir_informe(informe)
+    guardar_configuracion(configuracion, args.salida, informe)
+    print(f"\nConfiguración guardada en {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
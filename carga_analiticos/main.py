@@ -1,7 +1,12 @@
+import os
+
 import pandas as pd
 import numpy as np
 from parquet_utils import cargar_a_parquet
 
+# Generado con: python ajuste_parquet.py <muestra representativa> --salida parquet_config.json
+CONFIG_PARQUET = "parquet_config.json"
+
 def main():
     # Simulación de dataset analítico
     df = pd.DataFrame({
@@ -13,7 +18,8 @@ def main():
     })
 
     ruta = "data/ventas.parquet"
-    cargar_a_parquet(df, ruta)
+    configuracion = CONFIG_PARQUET if os.path.exists(CONFIG_PARQUET) else None
+    cargar_a_parquet(df, ruta, configuracion)
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,22 @@
-def cargar_a_parquet(df, ruta_archivo):
+import os
+
+from ajuste_parquet import cargar_configuracion, opciones_escritura
+
+
+def cargar_a_parquet(df, ruta_archivo, configuracion=None):
+    """`configuracion`: dict o ruta al JSON que genera ajuste_parquet.py (codec,
+    codificación por columna y tamaño de row group medidos sobre nuestros datos).
+    Sin configuración se usa snappy en todas las columnas"""
     try:
+        if isinstance(configuracion, (str, os.PathLike)):
+            configuracion = cargar_configuracion(configuracion)
+        opciones = ({'compression': 'snappy'} if configuracion is None
+                    else opciones_escritura(configuracion, df.columns))
         df.to_parquet(
             ruta_archivo,
             engine="pyarrow",
-            compression="snappy",  # Balance óptimo velocidad / tamaño
-            index=False
+            index=False,
+            **opciones
         )
         print(f"Datos guardados correctamente en {ruta_archivo}")
         return True
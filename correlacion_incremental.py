@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+
+# -----------------------------
+# MOTOR DE CORRELACIÓN INCREMENTAL
+# -----------------------------
+class CorrelacionIncremental:
+    """Mantiene las estadísticas suficientes de una matriz de correlación (n, medias y
+    matriz de co-momentos centrados) actualizándolas por chunks.
+
+    Con metodo='spearman' cada valor se sustituye por su posición en una rejilla de
+    cuantiles fija (`bordes`), de modo que la correlación de Pearson sobre esas
+    posiciones aproxima la de Spearman sin necesitar el ranking global."""
+
+    def __init__(self, columnas, metodo='pearson', bordes=None, n_bins=512):
+        if metodo not in ('pearson', 'spearman'):
+            raise ValueError(f"Método no soportado: {metodo}")
+        self.columnas = list(columnas)
+        self.metodo = metodo
+        self.n_bins = n_bins
+        self.bordes = bordes  # array (k, n_bins - 1) o None hasta el primer chunk
+        k = len(self.columnas)
+        self.n = 0
+        self.media = np.zeros(k)
+        self.comomentos = np.zeros((k, k))
+        self.filas_descartadas = 0
+
+    # --------------------------------------------------
+    # RANGOS APROXIMADOS (SPEARMAN)
+    # --------------------------------------------------
+    @staticmethod
+    def bordes_desde_muestra(muestra, columnas, n_bins=512):
+        """Rejilla de cuantiles por columna a partir de una muestra representativa"""
+        valores = muestra[list(columnas)].to_numpy(dtype=float)
+        cuantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        return np.nanquantile(valores, cuantiles, axis=0).T
+
+    def _a_rangos(self, valores):
+        if self.bordes is None:
+            cuantiles = np.linspace(0, 1, self.n_bins + 1)[1:-1]
+            self.bordes = np.nanquantile(valores, cuantiles, axis=0).T
+        rangos = np.empty_like(valores)
+        for j in range(valores.shape[1]):
+            # Punto medio entre izquierda y derecha para repartir empates entre bins
+            izq = np.searchsorted(self.bordes[j], valores[:, j], side='left')
+            der = np.searchsorted(self.bordes[j], valores[:, j], side='right')
+            rangos[:, j] = (izq + der) / 2.0
+        return rangos
+
+    # --------------------------------------------------
+    # ACTUALIZACIÓN Y COMBINACIÓN
+    # --------------------------------------------------
+    def actualizar(self, chunk):
+        """Incorpora un chunk (DataFrame). Las filas con nulos se descartan completas."""
+        valores = chunk[self.columnas].to_numpy(dtype=float)
+        completas = ~np.isnan(valores).any(axis=1)
+        self.filas_descartadas += int((~completas).sum())
+        valores = valores[completas]
+        if len(valores) == 0:
+            return self
+        if self.metodo == 'spearman':
+            valores = self._a_rangos(valores)
+
+        nb = len(valores)
+        media_b = valores.mean(axis=0)
+        centrados = valores - media_b
+        comomentos_b = centrados.T @ centrados
+        self._combinar_estado(nb, media_b, comomentos_b)
+        return self
+
+    def _combinar_estado(self, nb, media_b, comomentos_b):
+        na = self.n
+        n = na + nb
+        delta = media_b - self.media
+        self.comomentos += comomentos_b + np.outer(delta, delta) * (na * nb / n)
+        self.media += delta * (nb / n)
+        self.n = n
+
+    def combinar(self, otro):
+        """Fusiona el estado de otro motor (p. ej. calculado en otro proceso)"""
+        if otro.columnas != self.columnas or otro.metodo != self.metodo:
+            raise ValueError("Los motores no son compatibles")
+        if self.metodo == 'spearman' and otro.n and self.n:
+            if not np.array_equal(self.bordes, otro.bordes):
+                raise ValueError("Los motores Spearman deben compartir la misma rejilla")
+        # Las filas descartadas cuentan aunque el otro motor no tenga ninguna completa
+        self.filas_descartadas += otro.filas_descartadas
+        if otro.n == 0:
+            return self
+        if self.bordes is None:
+            self.bordes = otro.bordes
+        self._combinar_estado(otro.n, otro.media, otro.comomentos)
+        return self
+
+    # --------------------------------------------------
+    # RESULTADOS
+    # --------------------------------------------------
+    def matriz(self, columnas=None):
+        """Matriz de correlación (completa o de un subconjunto) sin volver a leer datos"""
+        columnas = self.columnas if columnas is None else list(columnas)
+        idx = [self.columnas.index(c) for c in columnas]
+        sub = self.comomentos[np.ix_(idx, idx)]
+        desv = np.sqrt(np.diag(sub))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = sub / np.outer(desv, desv)
+        np.fill_diagonal(corr, 1.0)
+        return pd.DataFrame(corr, index=columnas, columns=columnas)
+
+    def top_pares(self, k=10, columnas=None):
+        """Los k pares distintos con mayor |correlación|, usando selección parcial"""
+        corr = self.matriz(columnas)
+        valores = corr.to_numpy()
+        filas, cols = np.triu_indices(len(valores), k=1)
+        pares = valores[filas, cols]
+        absolutos = np.nan_to_num(np.abs(pares), nan=-1.0)
+
+        k = min(k, len(pares))
+        if k == 0:
+            return pd.DataFrame(columns=['var1', 'var2', 'correlacion'])
+        candidatos = np.argpartition(-absolutos, k - 1)[:k]
+        candidatos = candidatos[np.argsort(-absolutos[candidatos])]
+        nombres = corr.columns
+        return pd.DataFrame({
+            'var1': nombres[filas[candidatos]],
+            'var2': nombres[cols[candidatos]],
+            'correlacion': pares[candidatos],
+        })
+
+
+# -----------------------------
+# CÁLCULO PARALELO POR ARCHIVOS
+# -----------------------------
+def _leer_por_chunks(ruta, columnas, chunksize):
+    if str(ruta).endswith('.parquet'):
+        import pyarrow.parquet as pq
+        archivo = pq.ParquetFile(ruta)
+        for lote in archivo.iter_batches(batch_size=chunksize, columns=list(columnas)):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(ruta, usecols=list(columnas), chunksize=chunksize)
+
+
+def _procesar_archivo(ruta, columnas, metodo, bordes, chunksize):
+    motor = CorrelacionIncremental(columnas, metodo=metodo, bordes=bordes)
+    for chunk in _leer_por_chunks(ruta, columnas, chunksize):
+        motor.actualizar(chunk)
+    return motor
+
+
+def correlacion_paralela(rutas, columnas, metodo='pearson', bordes=None,
+                         max_workers=None, chunksize=100_000):
+    """Procesa cada archivo (CSV o Parquet) en un proceso y combina los resultados.
+    La memoria por worker queda acotada por `chunksize` y el número de columnas."""
+    rutas = list(rutas)
+    if metodo == 'spearman' and bordes is None:
+        # La rejilla debe ser común a todos los workers
+        muestra = next(_leer_por_chunks(rutas[0], columnas, chunksize))
+        bordes = CorrelacionIncremental.bordes_desde_muestra(muestra, columnas)
+
+    total = CorrelacionIncremental(columnas, metodo=metodo, bordes=bordes)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futuros = [executor.submit(_procesar_archivo, ruta, columnas, metodo, bordes, chunksize)
+                   for ruta in rutas]
+        for futuro in futuros:
+            total.combinar(futuro.result())
+    return total
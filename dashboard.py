@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# PRE-AGREGACIÓN (proceso principal)
+# -----------------------------
+def _agregar(panel):
+    """Reduce los datos crudos de un panel a lo mínimo necesario para dibujarlo"""
+    tipo = panel['tipo']
+    datos = panel.get('datos')
+
+    if tipo == 'histograma':
+        valores = pd.Series(datos[panel['x']]).dropna().to_numpy()
+        conteos, bordes = np.histogram(valores, bins=panel.get('bins', 50))
+        lineas = {}
+        for etiqueta, estadistico in panel.get('lineas', {}).items():
+            valor = getattr(np, estadistico)(valores) if isinstance(estadistico, str) else estadistico
+            lineas[etiqueta.format(valor=valor)] = float(valor)
+        return {'conteos': conteos, 'bordes': bordes, 'lineas': lineas}
+
+    if tipo == 'dispersion':
+        puntos = datos[[panel['x'], panel['y']]].dropna()
+        max_puntos = panel.get('max_puntos', 5000)
+        if len(puntos) > max_puntos:
+            puntos = puntos.sample(max_puntos, random_state=panel.get('semilla', 0))
+        return {'x': puntos[panel['x']].to_numpy(), 'y': puntos[panel['y']].to_numpy()}
+
+    if tipo == 'barras':
+        serie = datos.groupby(panel['x'])[panel['y']].agg(panel.get('agregacion', 'sum'))
+        return {'etiquetas': serie.index.astype(str).tolist(), 'valores': serie.to_numpy()}
+
+    if tipo == 'mapa_calor':
+        matriz = datos if isinstance(datos, pd.DataFrame) and panel.get('matriz') else datos.corr()
+        return {'matriz': matriz.to_numpy(), 'etiquetas': list(matriz.columns)}
+
+    raise ValueError(f"Tipo de panel no soportado: {tipo}")
+
+
+def _huella(panel, agregado):
+    """Huella de lo que realmente se dibuja: datos agregados + opciones visuales"""
+    opciones = {k: v for k, v in panel.items() if k not in ('datos', 'subpaneles')}
+    contenido = pickle.dumps((json.dumps(opciones, sort_keys=True, default=str), agregado))
+    return hashlib.sha256(contenido).hexdigest()
+
+
+# -----------------------------
+# DIBUJO (workers con backend Agg)
+# -----------------------------
+def _dibujar(ax, panel, agregado):
+    tipo = panel['tipo']
+    if tipo == 'histograma':
+        bordes = agregado['bordes']
+        ax.bar(bordes[:-1], agregado['conteos'], width=np.diff(bordes), align='edge',
+               alpha=0.7, edgecolor='black')
+        colores = ['red', 'green', 'orange', 'purple']
+        for color, (etiqueta, valor) in zip(colores, agregado['lineas'].items()):
+            ax.axvline(valor, color=color, linestyle='--', label=etiqueta)
+        if agregado['lineas']:
+            ax.legend()
+    elif tipo == 'dispersion':
+        ax.scatter(agregado['x'], agregado['y'], s=panel.get('tamano', 10), alpha=0.6)
+    elif tipo == 'barras':
+        ax.bar(agregado['etiquetas'], agregado['valores'])
+        ax.tick_params(axis='x', rotation=45)
+    elif tipo == 'mapa_calor':
+        matriz = agregado['matriz']
+        imagen = ax.imshow(matriz, cmap='coolwarm', vmin=-1, vmax=1)
+        etiquetas = agregado['etiquetas']
+        ax.set_xticks(range(len(etiquetas)), etiquetas, rotation=90)
+        ax.set_yticks(range(len(etiquetas)), etiquetas)
+        for i in range(len(etiquetas)):
+            for j in range(len(etiquetas)):
+                ax.text(j, i, f'{matriz[i, j]:.2f}', ha='center', va='center', fontsize=7)
+        ax.figure.colorbar(imagen, ax=ax)
+    ax.set_title(panel.get('titulo', ''))
+    ax.set_xlabel(panel.get('etiqueta_x', ''))
+    ax.set_ylabel(panel.get('etiqueta_y', ''))
+
+
+def _renderizar(trabajo):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    panel, agregados = trabajo
+    subpaneles = panel.get('subpaneles') or [panel]
+    columnas = panel.get('columnas', min(len(subpaneles), 2))
+    filas = int(np.ceil(len(subpaneles) / columnas))
+    figura, ejes = plt.subplots(filas, columnas, figsize=panel.get('tamano_figura', (10, 6)),
+                                squeeze=False)
+    for ax, sub, agregado in zip(ejes.flat, subpaneles, agregados):
+        _dibujar(ax, sub, agregado)
+    for ax in list(ejes.flat)[len(subpaneles):]:
+        ax.set_visible(False)
+    if panel.get('subpaneles') and panel.get('titulo'):
+        figura.suptitle(panel['titulo'])
+    figura.tight_layout()
+    figura.savefig(panel['salida'], dpi=panel.get('dpi', 100), bbox_inches='tight')
+    plt.close(figura)
+    return panel['salida']
+
+
+# -----------------------------
+# RENDERIZADOR DE DASHBOARD
+# -----------------------------
+def renderizar_dashboard(paneles, archivo_huellas='.dashboard_huellas.json', max_workers=None):
+    """Renderiza una lista de paneles (cada uno con 'salida' PNG) en paralelo.
+
+    Los datos se pre-agregan aquí (histogramas ya binned, dispersión muestreada) y
+    solo esos arrays viajan a los workers. Un panel cuya huella no cambió y cuyo PNG
+    ya existe no se vuelve a dibujar. Devuelve {salida: 'renderizado'|'sin cambios'}."""
+    huellas = {}
+    if os.path.exists(archivo_huellas):
+        with open(archivo_huellas) as f:
+            huellas = json.load(f)
+
+    pendientes = []
+    estado = {}
+    for panel in paneles:
+        subpaneles = panel.get('subpaneles') or [panel]
+        agregados = [_agregar(sub) for sub in subpaneles]
+        huella = _huella(panel, [(_huella(s, a)) for s, a in zip(subpaneles, agregados)])
+        salida = panel['salida']
+        if huellas.get(salida) == huella and os.path.exists(salida):
+            estado[salida] = 'sin cambios'
+            continue
+        huellas[salida] = huella
+        # Los datos crudos no viajan al worker
+        ligero = {k: v for k, v in panel.items() if k != 'datos'}
+        if 'subpaneles' in ligero:
+            ligero['subpaneles'] = [{k: v for k, v in s.items() if k != 'datos'} for s in subpaneles]
+        pendientes.append((ligero, agregados))
+
+    if len(pendientes) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for salida in executor.map(_renderizar, pendientes):
+                estado[salida] = 'renderizado'
+    else:
+        for trabajo in pendientes:
+            estado[_renderizar(trabajo)] = 'renderizado'
+
+    with open(archivo_huellas, 'w') as f:
+        json.dump(huellas, f, indent=2)
+    return estado
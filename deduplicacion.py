@@ -0,0 +1,190 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# NORMALIZACIÓN VECTORIZADA
+# -----------------------------
+def normalizar_texto(serie):
+    """Minúsculas, sin acentos y con espacios colapsados ('  Ana  García' -> 'ana garcia')"""
+    return (
+        serie.astype('string')
+        .str.normalize('NFKD')
+        .str.replace('[\u0300-\u036f]', '', regex=True)
+        .str.lower()
+        .str.replace(r'[^a-z0-9@._\s-]', ' ', regex=True)
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.strip()
+    )
+
+
+# Reglas fonéticas simplificadas para español, aplicadas en orden
+_REGLAS_FONETICAS = [
+    (r'[^a-z ]', ''),
+    (r'h', ''),              # h muda
+    (r'qu', 'k'),
+    (r'c([ei])', r's\1'),
+    (r'c', 'k'),
+    (r'z', 's'),
+    (r'g([ei])', r'j\1'),
+    (r'v', 'b'),
+    (r'w', 'b'),
+    (r'll', 'y'),
+    (r'x', 'ks'),
+    (r'(.)\1+', r'\1'),     # letras repetidas
+]
+
+
+def clave_fonetica(serie_normalizada):
+    """Clave fonética por palabra ('Ximena Vásquez' y 'jimena basques' comparten prefijo)"""
+    # dtype object para usar el motor `re` de Python (las reglas usan referencias \1)
+    clave = serie_normalizada.fillna('').astype(object)
+    for patron, reemplazo in _REGLAS_FONETICAS:
+        clave = clave.str.replace(patron, reemplazo, regex=True)
+    return clave.str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+# -----------------------------
+# SIMILITUD DENTRO DE BLOQUES
+# -----------------------------
+def _similitud(a, b):
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _similitud_email(a, b):
+    """1.0 si son iguales; si no, similitud de la parte local solo con el mismo dominio
+    (comparar el email entero premia compartir dominio: ana@x.com ~ juan@x.com)"""
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    local_a, _, dominio_a = a.partition('@')
+    local_b, _, dominio_b = b.partition('@')
+    return _similitud(local_a, local_b) if dominio_a == dominio_b else 0.0
+
+
+def _comparar_bloques(bloques, umbral, peso_nombre, umbral_email):
+    """Compara todos los pares dentro de cada bloque. Se ejecuta en los workers.
+    Un par es candidato solo si sus emails superan `umbral_email` (1.0 = idénticos)
+    y la puntuación combinada nombre/email supera `umbral`."""
+    pares = []
+    for filas, nombres, emails in bloques:
+        for i in range(len(filas)):
+            for j in range(i + 1, len(filas)):
+                if umbral_email >= 1.0 and (not emails[i] or emails[i] != emails[j]):
+                    continue
+                similitud_email = _similitud_email(emails[i], emails[j])
+                if similitud_email < umbral_email:
+                    continue
+                puntuacion = (peso_nombre * _similitud(nombres[i], nombres[j])
+                              + (1 - peso_nombre) * similitud_email)
+                if puntuacion >= umbral:
+                    pares.append((filas[i], filas[j], puntuacion))
+    return pares
+
+
+def _raiz(padres, x):
+    while padres[x] != x:
+        padres[x] = padres[padres[x]]
+        x = padres[x]
+    return x
+
+
+# -----------------------------
+# MOTOR DE DEDUPLICACIÓN
+# -----------------------------
+def asignar_clusters(df, columna_nombre='nombre', columna_email='email', umbral=0.85,
+                     peso_nombre=0.6, umbral_email=1.0, max_bloque=2000, max_workers=None,
+                     min_filas_paralelo=50_000):
+    """Devuelve (id_cluster por fila, pares candidatos con su puntuación, bloques omitidos).
+
+    Solo se comparan registros que comparten bloque: mismo email normalizado y, si
+    `umbral_email` < 1 (admite erratas en la parte local del email), también mismo
+    dominio y misma clave fonética del primer y último token del nombre. Por defecto
+    solo se fusionan registros con el mismo email normalizado. Los clusters se forman por enlace completo:
+    dos clusters se unen solo si todos sus pares cruzados son candidatos, así A~B y
+    B~C no arrastran a A y C si no se parecen. Los bloques de más de `max_bloque`
+    filas se omiten (con un aviso) para no volver al caso cuadrático."""
+    nombres = normalizar_texto(df[columna_nombre]).fillna('')
+    emails = normalizar_texto(df[columna_email]).fillna('')
+    dominio = emails.str.extract(r'@(.+)$', expand=False).fillna('')
+    fonetica = clave_fonetica(nombres)
+    primer_token = fonetica.str.extract(r'^(\S+)', expand=False).fillna('')
+    ultimo_token = fonetica.str.extract(r'(\S+)$', expand=False).fillna('')
+
+    claves_bloque = [emails.where(emails != '')]
+    if umbral_email < 1.0:
+        # Con email exacto obligatorio este bloque no aporta pares nuevos
+        claves_bloque.append(
+            (dominio + '|' + primer_token + '|' + ultimo_token).where(primer_token != ''))
+
+    posiciones = np.arange(len(df))
+    nombres_arr = nombres.to_numpy(dtype=object)
+    emails_arr = emails.to_numpy(dtype=object)
+    bloques = []
+    omitidos = 0
+    filas_omitidas = 0
+    for clave in claves_bloque:
+        codigos, _ = pd.factorize(clave)
+        validos = codigos >= 0
+        orden = np.argsort(codigos[validos], kind='stable')
+        filas = posiciones[validos][orden]
+        codigos_ordenados = codigos[validos][orden]
+        cortes = np.flatnonzero(np.diff(codigos_ordenados)) + 1
+        for grupo in np.split(filas, cortes):
+            if len(grupo) < 2:
+                continue
+            if len(grupo) > max_bloque:
+                omitidos += 1
+                filas_omitidas += len(grupo)
+                continue
+            bloques.append((grupo.tolist(), nombres_arr[grupo].tolist(), emails_arr[grupo].tolist()))
+
+    # Reparto de bloques entre procesos solo cuando compensa
+    if omitidos:
+        logger.warning("Deduplicación: %d bloques de más de %d filas omitidos (%d filas sin "
+                       "comparar en esa clave de bloque)", omitidos, max_bloque, filas_omitidas)
+
+    if len(df) >= min_filas_paralelo and len(bloques) > 1:
+        n_lotes = (max_workers or 4) * 8
+        lotes = [bloques[i::n_lotes] for i in range(n_lotes)]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            resultados = executor.map(_comparar_bloques, lotes, [umbral] * n_lotes,
+                                      [peso_nombre] * n_lotes, [umbral_email] * n_lotes)
+            pares = [p for r in resultados for p in r]
+    else:
+        pares = _comparar_bloques(bloques, umbral, peso_nombre, umbral_email)
+
+    # Clusters por enlace completo (union-find con lista de miembros): se procesan los
+    # pares de mayor a menor puntuación y dos clusters se unen solo si todos los pares
+    # cruzados son candidatos
+    candidatos = {(min(i, j), max(i, j)) for i, j, _ in pares}
+    padres = list(range(len(df)))
+    miembros = {}
+    for i, j, _ in sorted(pares, key=lambda par: -par[2]):
+        ri, rj = _raiz(padres, i), _raiz(padres, j)
+        if ri == rj:
+            continue
+        grupo_i, grupo_j = miembros.get(ri, [ri]), miembros.get(rj, [rj])
+        if all((min(a, b), max(a, b)) in candidatos for a in grupo_i for b in grupo_j):
+            raiz, otra = min(ri, rj), max(ri, rj)
+            padres[otra] = raiz
+            miembros[raiz] = grupo_i + grupo_j
+            miembros.pop(otra, None)
+    id_cluster = pd.Series([_raiz(padres, i) for i in range(len(df))], index=df.index, name='id_cluster')
+
+    pares_df = pd.DataFrame(pares, columns=['fila_a', 'fila_b', 'puntuacion']).drop_duplicates(['fila_a', 'fila_b'])
+    return id_cluster, pares_df, omitidos
+
+
+def deduplicar(df, columna_nombre='nombre', columna_email='email', umbral=0.85, **kwargs):
+    """Conserva la primera fila de cada cluster de registros equivalentes"""
+    id_cluster, _, _ = asignar_clusters(df, columna_nombre, columna_email, umbral, **kwargs)
+    return df[~id_cluster.duplicated().to_numpy()]
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import operator
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # dependencia opcional: sin ella se usa pandas .str y no hay streaming Parquet
+    pa = None
+
+
+# -----------------------------
+# REGLAS DECLARATIVAS
+# -----------------------------
+class Tramos:
+    """Asigna etiquetas por intervalos, como pd.cut pero compilado a un searchsorted.
+
+    bordes=[18, 25, 35] con derecha=True da (18, 25] y (25, 35]. Los valores fuera de
+    rango y los nulos reciben `valor_nulo` (NaN por defecto)."""
+
+    def __init__(self, nombre, columna, bordes, etiquetas, derecha=True, valor_nulo=None):
+        if len(etiquetas) != len(bordes) - 1:
+            raise ValueError(f"{nombre}: se esperaban {len(bordes) - 1} etiquetas")
+        self.nombre = nombre
+        self.columna = columna
+        self.bordes = np.asarray(bordes, dtype='float64')
+        self.etiquetas = list(etiquetas)
+        self.derecha = derecha
+        self.valor_nulo = valor_nulo
+
+    def evaluar(self, df):
+        valores = df[self.columna].to_numpy(dtype='float64', na_value=np.nan)
+        codigos = np.searchsorted(self.bordes, valores, side='left' if self.derecha else 'right') - 1
+        fuera = (codigos < 0) | (codigos >= len(self.etiquetas)) | np.isnan(valores)
+        if self.valor_nulo is None:
+            codigos[fuera] = -1
+        else:
+            codigos[fuera] = self.etiquetas.index(self.valor_nulo)
+        return pd.Categorical.from_codes(codigos, categories=self.etiquetas, ordered=True)
+
+    def describir(self):
+        return ['tramos', self.columna, self.bordes.tolist(), self.etiquetas,
+                self.derecha, self.valor_nulo]
+
+
+_OPERADORES = {'>': operator.gt, '>=': operator.ge, '<': operator.lt,
+               '<=': operator.le, '==': operator.eq, '!=': operator.ne}
+
+
+class Condiciones:
+    """Lista ordenada de (columna, operador, umbral, etiqueta) compilada a np.select:
+    gana la primera condición que se cumple; si ninguna, `defecto`"""
+
+    def __init__(self, nombre, condiciones, defecto):
+        for _, op, _, _ in condiciones:
+            if op not in _OPERADORES:
+                raise ValueError(f"{nombre}: operador no soportado {op}")
+        self.nombre = nombre
+        self.condiciones = list(condiciones)
+        self.defecto = defecto
+        self.etiquetas = list(dict.fromkeys([c[3] for c in condiciones] + [defecto]))
+
+    def evaluar(self, df):
+        mascaras = [_OPERADORES[op](df[col].to_numpy(dtype='float64', na_value=np.nan), umbral)
+                    for col, op, umbral, _ in self.condiciones]
+        codigos = [self.etiquetas.index(c[3]) for c in self.condiciones]
+        resultado = np.select(mascaras, codigos, default=self.etiquetas.index(self.defecto))
+        return pd.Categorical.from_codes(resultado, categories=self.etiquetas)
+
+    def describir(self):
+        return ['condiciones', self.condiciones, self.defecto]
+
+
+class Extraccion:
+    """Extrae el primer grupo de un patrón regex. El patrón se compila una sola vez y,
+    con pyarrow, se evalúa en C++ sobre el array completo (sin bucle Python por fila)"""
+
+    def __init__(self, nombre, columna, patron):
+        self.regex = re.compile(patron)
+        if self.regex.groups != 1:
+            raise ValueError(f"{nombre}: el patrón debe tener exactamente un grupo")
+        self.nombre = nombre
+        self.columna = columna
+        self.patron = patron
+        # extract_regex de Arrow exige grupos con nombre
+        self._patron_arrow = patron if self.regex.groupindex else \
+            re.sub(r'(?<!\\)\((?!\?)', '(?P<valor>', patron, count=1)
+
+    def evaluar(self, df):
+        serie = df[self.columna]
+        if pa is not None:
+            try:
+                struct = pc.extract_regex(pa.array(serie, type=pa.string(), from_pandas=True),
+                                          self._patron_arrow)
+                valores = pc.struct_field(struct, [0])
+                # Las filas sin coincidencia quedan nulas, como en str.extract
+                return pd.Series(pc.if_else(pc.is_valid(struct), valores, None).to_pandas(),
+                                 index=df.index)
+            except pa.ArrowInvalid:
+                pass  # patrón no soportado por RE2: se usa el motor de Python
+        return serie.astype(object).str.extract(self.regex, expand=False)
+
+    def describir(self):
+        return ['extraccion', self.columna, self.patron]
+
+
+class Antiguedad:
+    """Días (o meses de 30 días) desde `columna` hasta la fecha de referencia del derivador"""
+
+    def __init__(self, nombre, columna, unidad='dias'):
+        if unidad not in ('dias', 'meses'):
+            raise ValueError(f"{nombre}: unidad no soportada {unidad}")
+        self.nombre = nombre
+        self.columna = columna
+        self.unidad = unidad
+        self.fecha_referencia = None
+
+    def evaluar(self, df):
+        dias = (self.fecha_referencia - pd.to_datetime(df[self.columna])).dt.days
+        return dias // 30 if self.unidad == 'meses' else dias
+
+    def describir(self):
+        return ['antiguedad', self.columna, self.unidad]
+
+
+class Calculo:
+    """Columna derivada a partir de una expresión de df.eval ('ingresos - gastos')"""
+
+    def __init__(self, nombre, expresion):
+        self.nombre = nombre
+        self.expresion = expresion
+
+    def evaluar(self, df):
+        return df.eval(self.expresion)
+
+    def describir(self):
+        return ['calculo', self.expresion]
+
+
+# -----------------------------
+# DERIVADOR
+# -----------------------------
+class DerivadorFeatures:
+    """Aplica una lista ordenada de reglas (cada regla puede usar columnas creadas por
+    las anteriores). La fecha de referencia es fija y forma parte de la huella, así el
+    mismo derivador sobre los mismos datos produce siempre el mismo resultado."""
+
+    def __init__(self, reglas, fecha_referencia):
+        self.reglas = list(reglas)
+        self.fecha_referencia = pd.Timestamp(fecha_referencia)
+        for regla in self.reglas:
+            if isinstance(regla, Antiguedad):
+                regla.fecha_referencia = self.fecha_referencia
+
+    def huella(self):
+        """Identifica reglas + fecha de referencia (útil como clave de caché)"""
+        contenido = json.dumps(
+            [str(self.fecha_referencia)] + [[r.nombre] + r.describir() for r in self.reglas],
+            default=str,
+        )
+        return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+    def transformar(self, df, en_sitio=False):
+        if not en_sitio:
+            df = df.copy()
+        for regla in self.reglas:
+            df[regla.nombre] = regla.evaluar(df)
+        return df
+
+    def transformar_por_chunks(self, chunks):
+        """Evalúa las reglas sobre un iterable de DataFrames, uno a uno"""
+        for chunk in chunks:
+            yield self.transformar(chunk, en_sitio=True)
+
+    def procesar_parquet(self, entrada, salida, filas_por_lote=1_000_000):
+        """Lee `entrada` por row groups, deriva y escribe `salida` en una sola pasada"""
+        if pa is None:
+            raise ImportError("procesar_parquet requiere pyarrow")
+        archivo = pq.ParquetFile(entrada)
+        escritor = None
+        filas = 0
+        try:
+            for lote in archivo.iter_batches(batch_size=filas_por_lote):
+                df = self.transformar(lote.to_pandas(), en_sitio=True)
+                tabla = pa.Table.from_pandas(df, preserve_index=False)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(salida, tabla.schema, compression='zstd')
+                escritor.write_table(tabla)
+                filas += len(df)
+        finally:
+            if escritor is not None:
+                escritor.close()
+        return filas
+
+
+# -----------------------------
+# REGLAS DEL CASO CLIENTES (sem4_dia3)
+# -----------------------------
+def reglas_clientes():
+    return [
+        Tramos('grupo_edad', 'edad', [18, 25, 35, 50, 80],
+               ['Joven', 'Adulto_Joven', 'Adulto', 'Senior']),
+        Calculo('capacidad_ahorro', 'ingresos - gastos_mensuales'),
+        Calculo('ratio_ahorro', 'capacidad_ahorro / ingresos'),
+        # ratio > 0.3, > 0.1, > 0 y el resto (incluidos nulos) en Deficit
+        Tramos('clasificacion_financiera', 'ratio_ahorro', [-np.inf, 0, 0.1, 0.3, np.inf],
+               ['Deficit', 'Equilibra', 'Ahorra_Poco', 'Ahorra_Mucho'], valor_nulo='Deficit'),
+        Extraccion('codigo_area', 'telefono', r'\((\d{3})\)'),
+        Antiguedad('antiguedad_dias', 'fecha_registro'),
+        Antiguedad('antiguedad_meses', 'fecha_registro', unidad='meses'),
+    ]
@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
 
+from muestreo import MuestraEstratificada
+from perfilador import PerfilColumnas
+
 # Crear dataset de ejemplo de e-commerce
 np.random.seed(42)
 n_orders = 1000
@@ -39,9 +42,12 @@ print(df.head())
 print("\nÚltimas 5 filas:")
 print(df.tail()) """
 
+# Perfil de calidad en una sola pasada (nulos, distintos, rangos, top valores)
+perfil = PerfilColumnas().actualizar(df).tabla()
+
 # Valores faltantes
 print("Valores faltantes por columna:")
-print(df.isnull().sum())
+print(perfil['nulos'])
 
 """ print(f"\nPorcentaje de completitud: {(1 - df.isnull().sum() / len(df)) * 100}")
 
@@ -66,4 +72,13 @@ print(f"\nPeríodo de datos: {df['order_date'].min()} a {df['order_date'].max()}
 
 # Edad promedio de clientes
 edad_promedio = df['customer_age'].mean()
-print(f"\nEdad promedio de clientes: {edad_promedio:.1f} años")
\ No newline at end of file
+print(f"\nEdad promedio de clientes: {edad_promedio:.1f} años")
+
+# Las mismas estimaciones sobre una muestra estratificada por región, como se haría
+# con el histórico completo (muestreo.muestrear lee CSV/Parquet/SQLite por lotes)
+muestra = MuestraEstratificada('shipping_region', k_por_estrato=100, semilla=42).actualizar(df)
+edad = muestra.estimar_media('customer_age')
+print(f"\nMUESTRA ESTRATIFICADA ({edad['n']} filas, IC 95%)")
+print(f"Edad promedio estimada: {edad['estimacion']:.1f} ± {edad['error']:.1f} años")
+print("Métodos de pago estimados:")
+print(muestra.estimar_proporciones('payment_method')[['estimacion', 'inferior', 'superior']].round(3))
\ No newline at end of file
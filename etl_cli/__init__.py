@@ -0,0 +1 @@
+"""Punto de entrada único para los trabajos ETL del repositorio (python -m etl_cli)."""
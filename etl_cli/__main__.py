@@ -0,0 +1,5 @@
+import sys
+
+from etl_cli.cli import main
+
+sys.exit(main())
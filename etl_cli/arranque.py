@@ -0,0 +1,58 @@
+import re
+import subprocess
+import sys
+
+from etl_cli.cli import RAIZ
+
+# Módulos que nunca deberían cargarse solo por arrancar la CLI
+MODULOS_PESADOS = ('pandas', 'numpy', 'scipy', 'matplotlib', 'seaborn', 'sqlalchemy', 'pyarrow')
+
+_LINEA = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def medir_importacion(modulo):
+    """Importa `modulo` en un intérprete limpio con -X importtime y devuelve
+    [(modulo, propio_us, acumulado_us, nivel)] en orden de aparición"""
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=RAIZ, capture_output=True, text=True,
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}:\n{resultado.stderr}")
+    filas = []
+    for linea in resultado.stderr.splitlines():
+        m = _LINEA.match(linea)
+        if m:
+            propio, acumulado, sangria, nombre = m.groups()
+            filas.append((nombre, int(propio), int(acumulado), len(sangria) // 2))
+    return filas
+
+
+def main(args):
+    filas = medir_importacion(args.modulo)
+    raiz = [f for f in filas if f[0] == args.modulo]
+    total_ms = (raiz[-1][2] if raiz else sum(f[1] for f in filas)) / 1000
+    pesados = sorted({f[0].split('.')[0] for f in filas} & set(MODULOS_PESADOS))
+
+    print(f"Importación de {args.modulo}: {total_ms:.1f} ms (umbral {args.umbral_ms:.0f} ms)")
+    print(f"\n{'módulo':45} {'propio ms':>10} {'acum. ms':>10}")
+    for nombre, propio, acumulado, _ in sorted(filas, key=lambda f: -f[2])[:args.top]:
+        print(f"{nombre:45} {propio / 1000:10.1f} {acumulado / 1000:10.1f}")
+
+    fallos = []
+    if total_ms > args.umbral_ms:
+        fallos.append(f"tiempo de importación {total_ms:.1f} ms > {args.umbral_ms:.0f} ms")
+    if pesados:
+        fallos.append(f"módulos pesados importados al arrancar: {', '.join(pesados)}")
+    if fallos:
+        print("\nREGRESIÓN DE ARRANQUE:")
+        for fallo in fallos:
+            print(f"  - {fallo}")
+        return 1
+    print("\nArranque dentro de los límites")
+    return 0
+
+
+if __name__ == "__main__":
+    from etl_cli.cli import construir_parser
+    sys.exit(main(construir_parser().parse_args(['arranque'] + sys.argv[1:])))
@@ -0,0 +1,107 @@
+import argparse
+import os
+import sys
+
+# Solo módulos de la biblioteca estándar ligeros: pandas, numpy, sqlalchemy, etc.
+# se importan cuando el trabajo elegido se ejecuta, no al arrancar la CLI.
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TRABAJOS = {
+    'cargar-datos': 'cargar_datos/main.py',
+    'carga-analiticos': 'carga_analiticos/main.py',
+    'etl-errores': 'etl_errores_logging/etl_pipeline.py',
+    'etl-robusto': 'etl_pipeline_robusto/etl_pipeline.py',
+}
+
+
+def ejecutar_script(ruta_script):
+    """Ejecuta un script como __main__ desde su propio directorio (rutas relativas
+    como data/ventas.parquet o etl_database.db siguen funcionando)"""
+    import runpy
+
+    ruta_script = os.path.join(RAIZ, ruta_script)
+    directorio = os.path.dirname(ruta_script)
+    anterior = os.getcwd()
+    sys.path.insert(0, directorio)
+    os.chdir(directorio)
+    try:
+        runpy.run_path(ruta_script, run_name='__main__')
+    finally:
+        os.chdir(anterior)
+        sys.path.remove(directorio)
+    return 0
+
+
+def _cmd_listar(args):
+    for nombre, ruta in TRABAJOS.items():
+        print(f"{nombre:20} {ruta}")
+    return 0
+
+
+def _cmd_ejecutar(args):
+    return ejecutar_script(TRABAJOS[args.trabajo])
+
+
+def _cmd_arranque(args):
+    from etl_cli.arranque import main as arranque
+    return arranque(args)
+
+
+def _cmd_plan(args):
+    from etl_cli.planificador import main as plan
+    return plan(args)
+
+
+def _cmd_historial(args):
+    from etl_comun.historial import HistorialEjecuciones
+    historial = HistorialEjecuciones(args.ruta)
+    hay_regresiones = False
+    for pipeline in args.pipeline or historial.pipelines():
+        print(historial.reporte(pipeline, args.ultimas, ventana=args.ventana, umbral=args.umbral))
+        print()
+        hay_regresiones |= bool(historial.detectar_regresiones(pipeline, args.ventana,
+                                                               umbral=args.umbral))
+    historial.cerrar()
+    return 1 if hay_regresiones else 0
+
+
+def construir_parser():
+    parser = argparse.ArgumentParser(prog='etl_cli', description='Trabajos ETL del proyecto')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p = sub.add_parser('listar', help='Muestra los trabajos disponibles')
+    p.set_defaults(func=_cmd_listar)
+
+    p = sub.add_parser('ejecutar', help='Ejecuta un trabajo')
+    p.add_argument('trabajo', choices=sorted(TRABAJOS))
+    p.set_defaults(func=_cmd_ejecutar)
+
+    p = sub.add_parser('plan', help='Ejecuta en paralelo los trabajos de un archivo de configuración')
+    p.add_argument('--config', default=os.path.join(RAIZ, 'etl_cli', 'trabajos.json'))
+    p.add_argument('--max-workers', type=int, default=None)
+    p.add_argument('--solo', nargs='+', help='Ejecuta solo estos trabajos')
+    p.add_argument('--resumen-json', help='Guarda el resumen de la ejecución en JSON')
+    p.set_defaults(func=_cmd_plan)
+
+    p = sub.add_parser('arranque', help='Mide el tiempo de importación de la CLI (-X importtime)')
+    p.add_argument('--modulo', default='etl_cli.cli', help='Módulo a importar y medir')
+    p.add_argument('--umbral-ms', type=float, default=150.0,
+                   help='Falla si la importación acumulada supera este tiempo')
+    p.add_argument('--top', type=int, default=15, help='Importaciones más lentas a mostrar')
+    p.set_defaults(func=_cmd_arranque)
+
+    p = sub.add_parser('historial', help='Tendencia de duraciones y regresiones de rendimiento')
+    p.add_argument('--pipeline', nargs='+', help='Pipelines a mostrar (por defecto, todos)')
+    p.add_argument('--ruta', help='Base del historial (por defecto .etl_runs/historial.db)')
+    p.add_argument('--ultimas', type=int, default=20, help='Ejecuciones en la tendencia')
+    p.add_argument('--ventana', type=int, default=20, help='Ejecuciones de referencia')
+    p.add_argument('--umbral', type=float, default=0.30,
+                   help='Incremento relativo mínimo para marcar una regresión')
+    p.set_defaults(func=_cmd_historial)
+    return parser
+
+
+def main(argv=None):
+    args = construir_parser().parse_args(argv)
+    return args.func(args)
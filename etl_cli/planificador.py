@@ -0,0 +1,175 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from etl_cli.cli import RAIZ
+
+
+# -----------------------------
+# CONFIGURACIÓN
+# -----------------------------
+def cargar_configuracion(ruta):
+    """Lee el JSON de trabajos y valida nombres, dependencias (sin ciclos) y recursos"""
+    with open(ruta, encoding='utf-8') as f:
+        config = json.load(f)
+
+    nombres = [t['nombre'] for t in config['trabajos']]
+    if len(nombres) != len(set(nombres)):
+        raise ValueError("Hay nombres de trabajo repetidos en la configuración")
+    for trabajo in config['trabajos']:
+        for dependencia in trabajo.get('depende_de', []):
+            if dependencia not in nombres:
+                raise ValueError(f"{trabajo['nombre']} depende de un trabajo inexistente: {dependencia}")
+        for recurso in trabajo.get('recursos', []):
+            if recurso not in config.get('limites_recursos', {}):
+                raise ValueError(f"{trabajo['nombre']} usa un recurso sin límite definido: {recurso}")
+    _validar_sin_ciclos(config['trabajos'])
+    return config
+
+
+def _validar_sin_ciclos(trabajos):
+    """Orden topológico (Kahn): lo que no llega a ordenarse está en un ciclo o depende de él"""
+    dependencias = {t['nombre']: set(t.get('depende_de', [])) for t in trabajos}
+    listos = [n for n, deps in dependencias.items() if not deps]
+    ordenados = set()
+    while listos:
+        nombre = listos.pop()
+        ordenados.add(nombre)
+        for otro, deps in dependencias.items():
+            if otro not in ordenados and nombre in deps and deps <= ordenados:
+                listos.append(otro)
+    if len(ordenados) < len(dependencias):
+        atascados = sorted(set(dependencias) - ordenados)
+        raise ValueError(f"Dependencias circulares entre los trabajos: {', '.join(atascados)}")
+
+
+# Lanzador que fija RLIMIT_AS en el propio hijo y se reemplaza (execv) por el trabajo.
+# No se usa preexec_fn: no es seguro en procesos con hilos y los trabajos se lanzan
+# desde un ThreadPoolExecutor
+_LANZADOR_CON_LIMITE = (
+    "import os, resource, sys; "
+    "limite = int(sys.argv[1]); "
+    "resource.setrlimit(resource.RLIMIT_AS, (limite, limite)); "
+    "os.execv(sys.argv[2], sys.argv[2:])"
+)
+
+
+def _comando(trabajo, script):
+    comando = [sys.executable, script] + trabajo.get('argumentos', [])
+    if trabajo.get('memoria_max_mb') and os.name == 'posix':
+        limite = int(trabajo['memoria_max_mb']) * 1024 * 1024
+        comando = [sys.executable, '-c', _LANZADOR_CON_LIMITE, str(limite)] + comando
+    return comando
+
+
+# -----------------------------
+# EJECUCIÓN DE UN TRABAJO
+# -----------------------------
+def _ejecutar_trabajo(trabajo, semaforos, dir_logs):
+    # Los recursos se adquieren siempre en el mismo orden para evitar interbloqueos
+    recursos = sorted(trabajo.get('recursos', []))
+    espera = time.perf_counter()
+    for recurso in recursos:
+        semaforos[recurso].acquire()
+    inicio = time.perf_counter()
+    try:
+        script = os.path.join(RAIZ, trabajo['script'])
+        directorio = os.path.join(RAIZ, trabajo.get('directorio', os.path.dirname(trabajo['script'])))
+        entorno = dict(os.environ, **trabajo.get('entorno', {}))
+
+        ruta_log = os.path.join(dir_logs, f"{trabajo['nombre']}.log")
+        with open(ruta_log, 'w', encoding='utf-8') as log:
+            try:
+                proceso = subprocess.run(
+                    _comando(trabajo, script),
+                    cwd=directorio, env=entorno, stdout=log, stderr=subprocess.STDOUT,
+                    timeout=trabajo.get('timeout_s'),
+                )
+                codigo = proceso.returncode
+                estado = 'ok' if codigo == 0 else 'fallido'
+            except subprocess.TimeoutExpired:
+                codigo, estado = None, 'timeout'
+    finally:
+        for recurso in reversed(recursos):
+            semaforos[recurso].release()
+
+    return {
+        'nombre': trabajo['nombre'],
+        'estado': estado,
+        'codigo': codigo,
+        'espera_s': inicio - espera,
+        'duracion_s': time.perf_counter() - inicio,
+        'log': ruta_log,
+    }
+
+
+# -----------------------------
+# PLANIFICADOR
+# -----------------------------
+def ejecutar_plan(config, max_workers=None, solo=None, dir_logs=None):
+    """Ejecuta los trabajos respetando dependencias, un pool acotado de workers y los
+    límites de recursos compartidos (p. ej. conexiones simultáneas a Postgres)."""
+    trabajos = {t['nombre']: t for t in config['trabajos']}
+    if solo:
+        trabajos = {n: t for n, t in trabajos.items() if n in solo}
+    max_workers = max_workers or config.get('max_workers', os.cpu_count())
+    semaforos = {r: threading.BoundedSemaphore(n)
+                 for r, n in config.get('limites_recursos', {}).items()}
+
+    dir_logs = dir_logs or os.path.join(RAIZ, '.etl_runs', time.strftime('%Y%m%d_%H%M%S'))
+    os.makedirs(dir_logs, exist_ok=True)
+
+    resultados = {}
+    pendientes = dict(trabajos)
+    en_curso = {}
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pendientes or en_curso:
+            for nombre, trabajo in list(pendientes.items()):
+                dependencias = [d for d in trabajo.get('depende_de', []) if d in trabajos]
+                if any(resultados.get(d, {}).get('estado') not in (None, 'ok') for d in dependencias):
+                    resultados[nombre] = {'nombre': nombre, 'estado': 'omitido', 'codigo': None,
+                                          'espera_s': 0.0, 'duracion_s': 0.0, 'log': None}
+                    del pendientes[nombre]
+                elif all(resultados.get(d, {}).get('estado') == 'ok' for d in dependencias):
+                    en_curso[executor.submit(_ejecutar_trabajo, trabajo, semaforos, dir_logs)] = nombre
+                    del pendientes[nombre]
+
+            if not en_curso:
+                if pendientes:
+                    # Nada corre y nada puede arrancar: esperar sería un bucle infinito
+                    raise RuntimeError("Trabajos que no pueden arrancar (¿dependencias "
+                                       f"circulares?): {', '.join(sorted(pendientes))}")
+                continue
+            terminados, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                nombre = en_curso.pop(futuro)
+                resultados[nombre] = futuro.result()
+
+    resumen = [resultados[n] for n in trabajos]
+    return resumen, time.perf_counter() - inicio
+
+
+def imprimir_resumen(resumen, total_s):
+    print(f"\n{'trabajo':20} {'estado':9} {'espera s':>9} {'duración s':>11}  log")
+    for r in resumen:
+        print(f"{r['nombre']:20} {r['estado']:9} {r['espera_s']:9.2f} {r['duracion_s']:11.2f}  {r['log'] or '-'}")
+    secuencial = sum(r['duracion_s'] for r in resumen)
+    print(f"\nTiempo total: {total_s:.2f}s (suma secuencial {secuencial:.2f}s)")
+    fallidos = [r['nombre'] for r in resumen if r['estado'] != 'ok']
+    if fallidos:
+        print(f"Trabajos con problemas: {', '.join(fallidos)}")
+
+
+def main(args):
+    config = cargar_configuracion(args.config)
+    resumen, total_s = ejecutar_plan(config, args.max_workers, args.solo)
+    imprimir_resumen(resumen, total_s)
+    if args.resumen_json:
+        with open(args.resumen_json, 'w', encoding='utf-8') as f:
+            json.dump({'total_s': total_s, 'trabajos': resumen}, f, indent=2)
+    return 0 if all(r['estado'] == 'ok' for r in resumen) else 1
@@ -0,0 +1,173 @@
+import json
+import os
+import sqlite3
+import statistics
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows: sin medida de memoria
+    resource = None
+
+# Solo biblioteca estándar: la CLI (python -m etl_cli historial) lo importa sin
+# cargar pandas/numpy
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_DEFECTO = os.path.join(RAIZ, '.etl_runs', 'historial.db')
+TOTAL = '__total__'  # pseudo-etapa con la duración completa de la ejecución
+
+
+def _memoria_pico_mb():
+    """Pico de RSS del proceso hasta ahora (ru_maxrss está en KB en Linux, bytes en macOS)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1024 ** 2 if os.uname().sysname == 'Darwin' else pico / 1024
+
+
+# -----------------------------
+# REGISTRO DE EJECUCIONES
+# -----------------------------
+class Ejecucion:
+    """Una ejecución en curso; cada etapa se cronometra con `with ejecucion.etapa(...)`"""
+
+    def __init__(self, historial, pipeline):
+        self.historial = historial
+        self.pipeline = pipeline
+        self.inicio = time.time()
+        self._t0 = time.perf_counter()
+        self.etapas = []
+
+    @contextmanager
+    def etapa(self, nombre):
+        """Cronometra el bloque. Se puede asignar `registro['filas']` dentro del bloque"""
+        registro = {'etapa': nombre, 'filas': None}
+        t0 = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['duracion_s'] = time.perf_counter() - t0
+            registro['memoria_pico_mb'] = _memoria_pico_mb()
+            self.etapas.append(registro)
+
+    def finalizar(self, exito, filas=None, error=None, metricas=None):
+        duracion = time.perf_counter() - self._t0
+        return self.historial.registrar(self.pipeline, self.inicio, duracion, exito, filas,
+                                        error, metricas, self.etapas)
+
+
+class HistorialEjecuciones:
+    """Historial local (SQLite) de ejecuciones de pipelines y de sus etapas"""
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta or os.environ.get('ETL_HISTORIAL', RUTA_DEFECTO)
+        os.makedirs(os.path.dirname(os.path.abspath(self.ruta)), exist_ok=True)
+        self.conn = sqlite3.connect(self.ruta)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS ejecuciones (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                pipeline TEXT NOT NULL,
+                inicio TEXT NOT NULL,
+                duracion_s REAL NOT NULL,
+                exito INTEGER NOT NULL,
+                filas INTEGER,
+                memoria_pico_mb REAL,
+                error TEXT,
+                metricas TEXT
+            );
+            CREATE TABLE IF NOT EXISTS etapas (
+                ejecucion_id INTEGER NOT NULL REFERENCES ejecuciones(id),
+                etapa TEXT NOT NULL,
+                duracion_s REAL NOT NULL,
+                filas INTEGER,
+                filas_por_s REAL,
+                memoria_pico_mb REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_ejecuciones_pipeline ON ejecuciones (pipeline, id);
+            CREATE INDEX IF NOT EXISTS idx_etapas_ejecucion ON etapas (ejecucion_id);
+        ''')
+
+    def iniciar(self, pipeline):
+        return Ejecucion(self, pipeline)
+
+    def registrar(self, pipeline, inicio, duracion_s, exito, filas=None, error=None,
+                  metricas=None, etapas=()):
+        with self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO ejecuciones (pipeline, inicio, duracion_s, exito, filas, '
+                'memoria_pico_mb, error, metricas) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (pipeline, time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(inicio)),
+                 duracion_s, int(bool(exito)), filas, _memoria_pico_mb(),
+                 None if error is None else str(error),
+                 json.dumps(metricas, default=str) if metricas else None))
+            self.conn.executemany(
+                'INSERT INTO etapas VALUES (?, ?, ?, ?, ?, ?)',
+                [(cursor.lastrowid, e['etapa'], e['duracion_s'], e['filas'],
+                  e['filas'] / e['duracion_s'] if e['filas'] and e['duracion_s'] else None,
+                  e['memoria_pico_mb']) for e in etapas])
+        return cursor.lastrowid
+
+    # -----------------------------
+    # CONSULTA Y DETECCIÓN DE REGRESIONES
+    # -----------------------------
+    def pipelines(self):
+        return [fila[0] for fila in self.conn.execute(
+            'SELECT DISTINCT pipeline FROM ejecuciones ORDER BY pipeline')]
+
+    def duraciones(self, pipeline, limite=None):
+        """{etapa: [duración de cada ejecución exitosa, de la más antigua a la última]}"""
+        ids = [fila[0] for fila in self.conn.execute(
+            'SELECT id, duracion_s FROM ejecuciones WHERE pipeline = ? AND exito = 1 '
+            'ORDER BY id DESC LIMIT ?', (pipeline, limite or -1))][::-1]
+        if not ids:
+            return {}
+        series = {TOTAL: [d for (d,) in self.conn.execute(
+            f'SELECT duracion_s FROM ejecuciones WHERE id IN ({",".join("?" * len(ids))}) '
+            'ORDER BY id', ids)]}
+        for etapa, duracion in self.conn.execute(
+                f'SELECT etapa, duracion_s FROM etapas WHERE ejecucion_id IN '
+                f'({",".join("?" * len(ids))}) ORDER BY ejecucion_id', ids):
+            series.setdefault(etapa, []).append(duracion)
+        return series
+
+    def detectar_regresiones(self, pipeline, ventana=20, recientes=1, umbral=0.30,
+                             z_minimo=3.0, base_minima=5):
+        """Etapas cuya mediana en las `recientes` últimas ejecuciones supera la de las
+        `ventana` anteriores en más de `umbral` (30%) Y es estadísticamente anómala:
+        z robusto = (reciente - mediana) / (1.4826·MAD) >= z_minimo. Con menos de
+        `base_minima` ejecuciones de referencia no se juzga nada."""
+        regresiones = []
+        for etapa, serie in self.duraciones(pipeline, ventana + recientes).items():
+            base, ultimas = serie[:-recientes], serie[-recientes:]
+            if len(base) < base_minima or len(ultimas) < recientes:
+                continue
+            mediana = statistics.median(base)
+            actual = statistics.median(ultimas)
+            mad = statistics.median(abs(d - mediana) for d in base)
+            # Suelo para series casi constantes: 1% de la mediana
+            dispersion = max(1.4826 * mad, 0.01 * mediana, 1e-9)
+            z = (actual - mediana) / dispersion
+            if mediana > 0 and actual / mediana - 1 >= umbral and z >= z_minimo:
+                regresiones.append({'etapa': etapa, 'base_s': mediana, 'actual_s': actual,
+                                    'incremento': actual / mediana - 1, 'z': z})
+        return regresiones
+
+    def reporte(self, pipeline, ultimas=20, **opciones):
+        """Tabla de tendencia por etapa (mediana, última, cambio y mini-gráfico)"""
+        barras = '▁▂▃▄▅▆▇█'
+        regresiones = {r['etapa'] for r in self.detectar_regresiones(pipeline, **opciones)}
+        lineas = [f"Pipeline: {pipeline}",
+                  f"{'etapa':24} {'mediana_s':>10} {'ultima_s':>10} {'cambio':>8}  tendencia"]
+        for etapa, serie in self.duraciones(pipeline, ultimas).items():
+            mediana = statistics.median(serie)
+            minimo, maximo = min(serie), max(serie)
+            rango = (maximo - minimo) or 1
+            grafico = ''.join(barras[int((d - minimo) / rango * (len(barras) - 1))] for d in serie)
+            cambio = serie[-1] / mediana - 1 if mediana else 0
+            marca = '  <- REGRESIÓN' if etapa in regresiones else ''
+            lineas.append(f"{etapa:24} {mediana:10.3f} {serie[-1]:10.3f} {cambio:+8.0%}  {grafico}{marca}")
+        return "\n".join(lineas)
+
+    def cerrar(self):
+        self.conn.close()
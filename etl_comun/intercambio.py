@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+import uuid
+from typing import NamedTuple, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+
+# -----------------------------
+# LECTURA / ESCRITURA IPC
+# -----------------------------
+# Formato Arrow IPC sin compresión: el archivo mapeado en memoria ES el buffer de
+# las columnas, así que abrirlo no copia ni deserializa nada. En /dev/shm el archivo
+# vive en memoria compartida y cualquier proceso puede mapear las mismas páginas.
+def _tabla_arrow(datos):
+    if isinstance(datos, pd.DataFrame):
+        return pa.Table.from_pandas(datos, preserve_index=False)
+    if isinstance(datos, pa.RecordBatch):
+        return pa.Table.from_batches([datos])
+    return datos
+
+
+def escribir_ipc(datos, ruta, filas_por_lote=None):
+    """Escribe un DataFrame o tabla Arrow como archivo IPC. La escritura es atómica
+    (temporal + rename): un lector nunca ve un archivo a medias"""
+    tabla = _tabla_arrow(datos)
+    temporal = f"{ruta}.{uuid.uuid4().hex}.tmp"
+    with pa.OSFile(temporal, 'wb') as archivo:
+        with pa.ipc.new_file(archivo, tabla.schema) as escritor:
+            escritor.write_table(tabla, max_chunksize=filas_por_lote)
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def leer_ipc(ruta, lote=None):
+    """Tabla (o un solo lote) respaldada por el archivo mapeado, sin copias"""
+    lector = pa.ipc.open_file(pa.memory_map(ruta, 'r'))
+    if lote is not None:
+        return pa.Table.from_batches([lector.get_batch(lote)])
+    return lector.read_all()
+
+
+def num_lotes(ruta):
+    return pa.ipc.open_file(pa.memory_map(ruta, 'r')).num_record_batches
+
+
+def a_pandas(tabla):
+    """DataFrame sobre los buffers Arrow. Con un solo lote las columnas numéricas sin
+    nulos son vistas de solo lectura del mapa (sin copia); con varios lotes pandas
+    tiene que concatenarlos y sí copia"""
+    return tabla.to_pandas(split_blocks=True)
+
+
+class Referencia(NamedTuple):
+    """Lo único que viaja entre procesos: ruta y lote, no los datos"""
+    ruta: str
+    lote: Optional[int] = None
+
+    def tabla(self):
+        return leer_ipc(self.ruta, self.lote)
+
+    def pandas(self):
+        return a_pandas(self.tabla())
+
+
+# -----------------------------
+# ÁREA DE INTERCAMBIO ENTRE ETAPAS
+# -----------------------------
+def _directorio_compartido():
+    return '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+
+
+class AreaIntercambio:
+    """Directorio temporal (en memoria compartida si existe) donde cada etapa publica
+    su salida con un nombre y la siguiente la abre mapeada.
+
+    Uso:
+        with AreaIntercambio() as area:
+            area.publicar('extraccion', df)
+            refs = area.referencias('extraccion')  # una por lote, para workers
+            df = area.pandas('extraccion')
+    """
+
+    def __init__(self, directorio=None, filas_por_lote=None):
+        base = directorio or _directorio_compartido()
+        self.directorio = tempfile.mkdtemp(prefix='etl_intercambio_', dir=base)
+        self.filas_por_lote = filas_por_lote
+
+    def ruta(self, nombre):
+        return os.path.join(self.directorio, f"{nombre}.arrow")
+
+    def publicar(self, nombre, datos, filas_por_lote=None):
+        ruta = escribir_ipc(datos, self.ruta(nombre), filas_por_lote or self.filas_por_lote)
+        return Referencia(ruta)
+
+    def referencias(self, nombre):
+        ruta = self.ruta(nombre)
+        return [Referencia(ruta, i) for i in range(num_lotes(ruta))]
+
+    def tabla(self, nombre):
+        return leer_ipc(self.ruta(nombre))
+
+    def pandas(self, nombre):
+        return a_pandas(self.tabla(nombre))
+
+    def eliminar(self, nombre):
+        # Los mapas ya abiertos siguen siendo válidos: el SO libera las páginas al cerrarlos
+        if os.path.exists(self.ruta(nombre)):
+            os.remove(self.ruta(nombre))
+
+    def cerrar(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
@@ -0,0 +1,200 @@
+import math
+import os
+import sqlite3
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import pyarrow as pa
+
+from etl_comun.intercambio import AreaIntercambio, a_pandas, escribir_ipc, leer_ipc
+
+try:
+    import psycopg2
+except ImportError:  # solo hace falta para leer de Postgres
+    psycopg2 = None
+
+
+# -----------------------------
+# FILAS -> COLUMNAS ARROW
+# -----------------------------
+FILAS_POR_LOTE = 50_000
+
+
+def _columna(valores, tipo=None):
+    """Array Arrow tipado; si SQLite mezcla tipos en una columna se cae a texto"""
+    try:
+        return pa.array(valores, type=tipo, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None else str(v) for v in valores], type=pa.string())
+
+
+def _lote(filas, nombres, esquema):
+    """Convierte `filas` (tuplas) en un RecordBatch. Los tipos se infieren del primer
+    lote; una columna que allí era todo NULL toma el tipo del primer lote con valores"""
+    columnas = list(zip(*filas)) if filas else [()] * len(nombres)
+    arrays = []
+    for i, valores in enumerate(columnas):
+        tipo = esquema.field(i).type if esquema is not None else None
+        if tipo is not None and not pa.types.is_null(tipo):
+            try:
+                arrays.append(pa.array(valores, type=tipo, from_pandas=True))
+                continue
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                pass
+        arrays.append(_columna(valores))
+    return pa.RecordBatch.from_arrays(arrays, names=nombres)
+
+
+def _concatenar(tablas):
+    """Concatena tablas cuyos tipos pueden diferir entre lotes (SQLite no fija el tipo
+    de una columna). Si una columna cayó a texto en algún lote, pasa a texto en todos,
+    como el object que devolvería pd.read_sql; enteros y decimales se promueven"""
+    texto = {campo.name for tabla in tablas for campo in tabla.schema
+             if pa.types.is_string(campo.type)}
+    unificadas = []
+    for tabla in tablas:
+        for i, campo in enumerate(tabla.schema):
+            if campo.name in texto and not (pa.types.is_string(campo.type)
+                                            or pa.types.is_null(campo.type)):
+                tabla = tabla.set_column(i, campo.name, tabla.column(i).cast(pa.string()))
+        unificadas.append(tabla)
+    return pa.concat_tables(unificadas, promote_options='permissive')
+
+
+# -----------------------------
+# LECTURA EN STREAMING
+# -----------------------------
+def _cursor(conn, sql, parametros, filas_por_lote):
+    if isinstance(conn, sqlite3.Connection):
+        return conn.execute(sql, parametros or ())
+    # Postgres: cursor con nombre = cursor de servidor; el resultado se queda en el
+    # servidor y viaja de `itersize` en `itersize` filas
+    cursor = conn.cursor(name=f"lectura_{uuid.uuid4().hex[:12]}")
+    cursor.itersize = filas_por_lote
+    cursor.execute(sql, parametros)
+    return cursor
+
+
+def leer_lotes(conn, sql, parametros=None, filas_por_lote=FILAS_POR_LOTE):
+    """Genera RecordBatch de hasta `filas_por_lote` filas a medida que llegan.
+
+    En memoria solo hay a la vez un lote de tuplas Python; nunca el resultado entero.
+    Sirve para conexiones sqlite3 y psycopg2."""
+    cursor = _cursor(conn, sql, parametros, filas_por_lote)
+    try:
+        esquema = None
+        while True:
+            filas = cursor.fetchmany(filas_por_lote)
+            if not filas and esquema is not None:
+                break
+            nombres = [d[0] for d in cursor.description]
+            lote = _lote(filas, nombres, esquema)
+            esquema = lote.schema
+            yield lote
+            if not filas:
+                break
+    finally:
+        cursor.close()
+
+
+def leer_tabla(conn, sql, parametros=None, filas_por_lote=FILAS_POR_LOTE):
+    """Resultado completo como tabla Arrow (los lotes se reutilizan, sin copiar salvo
+    las columnas que hay que pasar a texto por cambiar de tipo entre lotes)"""
+    lotes = [pa.Table.from_batches([lote]) for lote in
+             leer_lotes(conn, sql, parametros, filas_por_lote)]
+    return _concatenar(lotes)
+
+
+def leer_pandas(conn, sql, parametros=None, filas_por_lote=FILAS_POR_LOTE):
+    """Sustituto de pd.read_sql: construye el DataFrame desde Arrow liberando cada
+    columna Arrow según se convierte, así el resultado no está dos veces en memoria"""
+    tabla = leer_tabla(conn, sql, parametros, filas_por_lote)
+    return tabla.to_pandas(split_blocks=True, self_destruct=True)
+
+
+# -----------------------------
+# LECTURA PARALELA POR RANGOS DE CLAVE
+# -----------------------------
+def _conectar(origen):
+    """Ruta a una base SQLite (se abre de solo lectura) o DSN de Postgres"""
+    if origen.startswith('postgres') or '=' in origen:
+        if psycopg2 is None:
+            raise ImportError("Leer de Postgres requiere psycopg2")
+        return psycopg2.connect(origen)
+    return sqlite3.connect(f"file:{origen}?mode=ro", uri=True)
+
+
+def _leer_rango(origen, sql, desde, hasta, filas_por_lote, salida):
+    """Worker: lee [desde, hasta) con su propia conexión y deja el resultado en IPC"""
+    conn = _conectar(origen)
+    marcador = '?' if isinstance(conn, sqlite3.Connection) else '%s'
+    try:
+        tabla = leer_tabla(conn, sql.format(marcador=marcador), (desde, hasta), filas_por_lote)
+    finally:
+        conn.close()
+    escribir_ipc(tabla, salida)
+    return salida
+
+
+def leer_por_rangos(origen, tabla, columnas='*', clave='rowid', particiones=None,
+                    filas_por_lote=FILAS_POR_LOTE, intercambio=None):
+    """Lee `tabla` dividiendo [min(clave), max(clave)] en rangos que se leen en paralelo,
+    cada uno en un proceso con su conexión. Los workers devuelven archivos Arrow IPC
+    (no DataFrames serializados) y el resultado sale ordenado por `clave`.
+
+    `clave` debe ser numérica e indexada: el rowid en SQLite, la clave primaria en Postgres."""
+    particiones = particiones or os.cpu_count() or 1
+    conn = _conectar(origen)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT MIN({clave}), MAX({clave}) FROM {tabla}")
+        minimo, maximo = cursor.fetchone()
+    finally:
+        conn.close()
+    sql = (f"SELECT {columnas} FROM {tabla} WHERE {clave} >= {{marcador}} "
+           f"AND {clave} < {{marcador}} ORDER BY {clave}")
+    if minimo is None:
+        rangos = [(0, 0)]
+    else:
+        paso = math.ceil((maximo - minimo + 1) / particiones)
+        rangos = [(desde, min(desde + paso, maximo + 1))
+                  for desde in range(minimo, maximo + 1, paso)]
+
+    area = intercambio or AreaIntercambio()
+    salidas = [area.ruta(f"_rango_{uuid.uuid4().hex[:8]}_{i}") for i in range(len(rangos))]
+    try:
+        if len(rangos) == 1:
+            rutas = [_leer_rango(origen, sql, *rangos[0], filas_por_lote, salidas[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=len(rangos)) as ex:
+                rutas = list(ex.map(_leer_rango, [origen] * len(rangos), [sql] * len(rangos),
+                                    [d for d, _ in rangos], [h for _, h in rangos],
+                                    [filas_por_lote] * len(rangos), salidas))
+        # Las tablas quedan mapeadas: borrar los archivos al cerrar el área no las
+        # invalida, el SO libera las páginas cuando se suelta el último mapa
+        return _concatenar([leer_ipc(ruta) for ruta in rutas])
+    finally:
+        if intercambio is None:
+            area.cerrar()
+
+
+def leer_por_rangos_pandas(origen, tabla, **opciones):
+    return a_pandas(leer_por_rangos(origen, tabla, **opciones))
+
+
+if __name__ == "__main__":
+    # Comprobación: una columna entera en los primeros lotes y texto en otro posterior
+    # (tipado dinámico de SQLite) debe leerse como texto, igual que con pd.read_sql
+    import pandas as pd
+
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE t (a, b REAL)')
+    conn.executemany('INSERT INTO t VALUES (?, ?)',
+                     [(1, 1.5), (2, None), (3, 2.0), (4, 1), ('x', 3.5), (None, 4.0), (7, 5.0)])
+    esperado = pd.read_sql('SELECT a, b FROM t', conn)
+    for filas_por_lote in (1, 3, 50_000):
+        df = leer_pandas(conn, 'SELECT a, b FROM t', filas_por_lote=filas_por_lote)
+        assert [None if pd.isna(v) else str(v) for v in df['a']] == \
+            [None if pd.isna(v) else str(v) for v in esperado['a']], df['a'].tolist()
+        pd.testing.assert_series_equal(df['b'], esperado['b'], check_dtype=False)
+    print("Tipos mezclados entre lotes: OK")
@@ -0,0 +1,185 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+
+
+# -----------------------------
+# FORMATO JSON ESTRUCTURADO
+# -----------------------------
+_CAMPOS_ESTANDAR = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro; los campos pasados con extra= se incluyen tal cual"""
+
+    def format(self, record):
+        datos = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _CAMPOS_ESTANDAR and not clave.startswith('_'):
+                datos[clave] = valor
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            datos['excepcion'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+# -----------------------------
+# HANDLERS CON ESCRITURA POR LOTES
+# -----------------------------
+class _EscrituraPorLotes:
+    """Mixin: el archivo se abre con buffer grande y solo se vacía cada `lote`
+    registros o cada `intervalo` segundos (y siempre al cerrar)"""
+
+    def _configurar_lotes(self, lote, intervalo):
+        self.lote = lote
+        self.intervalo = intervalo
+        self._pendientes = 0
+        self._ultimo_vaciado = time.monotonic()
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=1 << 16, encoding=self.encoding)
+
+    def flush(self):
+        self._pendientes += 1
+        if (self._pendientes >= self.lote
+                or time.monotonic() - self._ultimo_vaciado >= self.intervalo):
+            self.vaciar()
+
+    def vaciar(self):
+        self._pendientes = 0
+        self._ultimo_vaciado = time.monotonic()
+        super().flush()
+
+    def close(self):
+        self.vaciar()
+        super().close()
+
+
+class ArchivoRotativoPorTamano(_EscrituraPorLotes, logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler.shouldRollover hace seek(0, 2) en cada registro y ese seek
+    vacía el buffer: cada registro iría a disco. Aquí el tamaño del archivo se lleva
+    en un contador (tamaño real al abrir + bytes de cada registro escrito)"""
+
+    def __init__(self, archivo, max_bytes, backups, lote=200, intervalo=1.0):
+        self._bytes = 0
+        self._bytes_registro = 0
+        super().__init__(archivo, maxBytes=max_bytes, backupCount=backups,
+                         encoding='utf-8', delay=True)
+        self._configurar_lotes(lote, intervalo)
+
+    def _open(self):
+        stream = super()._open()
+        self._bytes = os.path.getsize(self.baseFilename)
+        return stream
+
+    def shouldRollover(self, record):
+        self._bytes_registro = 0
+        if self.maxBytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        mensaje = f"{self.format(record)}{self.terminator}"
+        self._bytes_registro = len(mensaje.encode(self.encoding or 'utf-8'))
+        return self._bytes > 0 and self._bytes + self._bytes_registro >= self.maxBytes
+
+    def doRollover(self):
+        super().doRollover()
+        self._bytes = 0
+
+    def emit(self, record):
+        super().emit(record)
+        self._bytes += self._bytes_registro
+
+
+class ArchivoRotativoPorTiempo(_EscrituraPorLotes, logging.handlers.TimedRotatingFileHandler):
+    def __init__(self, archivo, cuando, backups, lote=200, intervalo=1.0):
+        super().__init__(archivo, when=cuando, backupCount=backups,
+                         encoding='utf-8', delay=True)
+        self._configurar_lotes(lote, intervalo)
+
+
+class _ColaPerezosa(logging.handlers.QueueHandler):
+    """QueueHandler que no formatea en el hilo que loguea: el mensaje se construye en
+    el hilo del listener. Solo se captura aquí el traceback, que no puede esperar.
+    Por eso los argumentos de log deben ser valores que no se modifiquen después."""
+
+    def prepare(self, record):
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# -----------------------------
+# CONFIGURACIÓN
+# -----------------------------
+_listener = None
+
+
+def configurar_logging(archivo, formato='%(asctime)s - %(levelname)s - %(message)s',
+                       nivel=logging.INFO, estructurado=None, rotacion='tamano',
+                       max_bytes=10 * 1024 ** 2, backups=5, cuando='midnight', consola=True):
+    """Configura el logging raíz de forma asíncrona.
+
+    Los loggers solo encolan el registro (QueueHandler); un QueueListener en segundo
+    plano formatea y escribe al archivo (con rotación por tamaño o por tiempo y
+    escrituras por lotes) y a la consola. Con estructurado=True (o ETL_LOG_JSON=1) el
+    archivo se escribe en JSON por líneas. Se llama desde el punto de entrada, no al
+    importar, y llamadas repetidas reemplazan la configuración anterior."""
+    global _listener
+
+    if estructurado is None:
+        estructurado = os.environ.get('ETL_LOG_JSON') == '1'
+
+    detener_logging()
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+        handler.close()
+
+    if rotacion == 'tamano':
+        archivo_handler = ArchivoRotativoPorTamano(archivo, max_bytes, backups)
+    elif rotacion == 'tiempo':
+        archivo_handler = ArchivoRotativoPorTiempo(archivo, cuando, backups)
+    elif rotacion is None:
+        archivo_handler = ArchivoRotativoPorTamano(archivo, 0, 0)
+    else:
+        raise ValueError(f"Rotación no soportada: {rotacion}")
+    archivo_handler.setFormatter(FormatoJSON() if estructurado else logging.Formatter(formato))
+
+    handlers = [archivo_handler]
+    if consola:
+        consola_handler = logging.StreamHandler()
+        consola_handler.setFormatter(logging.Formatter(formato))
+        handlers.append(consola_handler)
+
+    cola = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(cola, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    raiz.addHandler(_ColaPerezosa(cola))
+    raiz.setLevel(nivel)
+    return raiz
+
+
+def detener_logging():
+    """Vacía la cola y los archivos pendientes y detiene el hilo de escritura"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(detener_logging)
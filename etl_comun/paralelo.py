@@ -0,0 +1,60 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pyarrow as pa
+
+from etl_comun.intercambio import AreaIntercambio, a_pandas, escribir_ipc, leer_ipc
+
+
+# -----------------------------
+# TRANSFORMACIÓN PARTICIONADA EN PROCESOS
+# -----------------------------
+FILAS_MINIMAS = 200_000  # por debajo, arrancar procesos cuesta más que la transformación
+
+
+def _transformar_particion(funcion, entrada, salida):
+    """Worker: lee su lote mapeado (sin copia), transforma y publica el resultado
+    en otro archivo IPC. Solo viajan rutas entre procesos, nunca DataFrames"""
+    resultado = funcion(entrada.pandas())
+    escribir_ipc(resultado, salida)
+    return salida
+
+
+def transformar_en_paralelo(df, funcion, max_workers=None, filas_minimas=FILAS_MINIMAS,
+                            intercambio=None):
+    """Aplica `funcion` (DataFrame -> DataFrame) por particiones en un pool de procesos.
+
+    `funcion` debe ser de nivel de módulo (se referencia por nombre desde los workers)
+    y conservar las filas: trabaja columna a columna, no filtra. El resultado mantiene
+    el orden y el índice de `df`. Con pocas filas o un solo núcleo se ejecuta en el
+    propio proceso, sin pasar por Arrow."""
+    max_workers = max_workers or os.cpu_count() or 1
+    if len(df) < filas_minimas or max_workers < 2:
+        return funcion(df)
+
+    area = intercambio or AreaIntercambio()
+    nombres = ['_paralelo_entrada'] + [f'_paralelo_salida_{i}' for i in range(max_workers)]
+    try:
+        area.publicar(nombres[0], df, filas_por_lote=math.ceil(len(df) / max_workers))
+        referencias = area.referencias(nombres[0])
+        salidas = [area.ruta(nombre) for nombre in nombres[1:len(referencias) + 1]]
+
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(referencias))) as ex:
+            rutas = list(ex.map(_transformar_particion, [funcion] * len(referencias),
+                                referencias, salidas))
+
+        # map() devuelve en orden de envío: concatenar las partes reconstruye el orden
+        tabla = pa.concat_tables([leer_ipc(ruta) for ruta in rutas], promote_options='permissive')
+        resultado = a_pandas(tabla)
+        if len(resultado) != len(df):
+            raise ValueError("La función de transformación paralela no debe añadir ni quitar filas")
+        resultado.index = df.index
+        return resultado
+    finally:
+        if intercambio is None:
+            area.cerrar()
+        else:
+            for nombre in nombres:
+                area.eliminar(nombre)
+
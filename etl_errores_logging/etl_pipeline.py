@@ -1,22 +1,25 @@
 import logging
+import os
+import sys
 import time
+from contextlib import nullcontext
 from functools import wraps
 
 import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from etl_comun.historial import HistorialEjecuciones  # noqa: E402
+from etl_comun.logs import configurar_logging  # noqa: E402
+from etl_comun.paralelo import transformar_en_paralelo  # noqa: E402
+
 # -----------------------------
 # CONFIGURACIÓN DE LOGGING
 # -----------------------------
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('etl_ecommerce.log'),
-        logging.StreamHandler()
-    ]
-)
+# Los handlers se configuran en el punto de entrada (ver __main__), no al importar
+LOG_ARCHIVO = 'etl_ecommerce.log'
+LOG_FORMATO = '%(asctime)s - %(levelname)s - %(message)s'
 
 logger = logging.getLogger('etl_ecommerce')
 
@@ -26,27 +29,55 @@ def log_etapa(etapa):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            logger.info(f"Iniciando {etapa}")
+            logger.info("Iniciando %s", etapa)
             start_time = time.time()
             try:
                 result = func(*args, **kwargs)
                 duration = time.time() - start_time
-                logger.info(f"{etapa} completada en {duration:.2f}s")
+                logger.info("%s completada en %.2fs", etapa, duration)
                 return result
             except Exception as e:
                 duration = time.time() - start_time
-                logger.error(f"{etapa} falló en {duration:.2f}s: {e}")
+                logger.error("%s falló en %.2fs: %s", etapa, duration, e)
                 raise
         return wrapper
     return decorator
 
 
+def calcular_columnas(df: pd.DataFrame) -> pd.DataFrame:
+    """Columnas derivadas fila a fila; a nivel de módulo para poder ejecutarse en workers"""
+    # Con copy-on-write, assign no copia las columnas existentes ni toca las del llamador
+    return df.assign(
+        total=df['cantidad'] * df['precio'],
+        categoria_precio=pd.cut(df['precio'], bins=[0, 50, 100, 200], labels=['Bajo', 'Medio', 'Alto'])
+    )
+
+
 # -----------------------------
 # PIPELINE ETL
 # -----------------------------
 class ETLPipeline:
-    def __init__(self):
+    def __init__(self, intercambio=None, max_workers=1, historial=None):
         self.errores = []
+        # HistorialEjecuciones opcional: duración, filas y memoria por etapa de cada ejecución
+        self.historial = historial
+        self._ejecucion = None
+        # max_workers > 1 (o None = todos los núcleos): lotes grandes se transforman por
+        # particiones en un pool de procesos. Por defecto en proceso: estas columnas son
+        # tan baratas que el viaje por Arrow IPC cuesta más que calcularlas
+        self.max_workers = max_workers
+        # AreaIntercambio opcional: cada etapa publica su salida en Arrow IPC y la
+        # siguiente la lee mapeada, así otro proceso puede tomarla sin pickle
+        self.intercambio = intercambio
+
+    def _etapa(self, nombre):
+        return self._ejecucion.etapa(nombre) if self._ejecucion else nullcontext({})
+
+    def _entregar(self, etapa, df: pd.DataFrame) -> pd.DataFrame:
+        if self.intercambio is None:
+            return df
+        self.intercambio.publicar(etapa, df)
+        return self.intercambio.pandas(etapa)
 
     @log_etapa("extracción de datos")
     def extract(self) -> pd.DataFrame:
@@ -61,7 +92,7 @@ class ETLPipeline:
             'precio': np.round(np.random.uniform(10, 200, 100), 2)
         })
 
-        logger.info(f"Extraídos {len(df)} registros")
+        logger.info("Extraídos %d registros", len(df))
         return df
 
     @log_etapa("transformación de datos")
@@ -69,13 +100,8 @@ class ETLPipeline:
         if df.empty:
             raise ValueError("Dataset vacío")
 
-        df = df.copy()
-        df['total'] = df['cantidad'] * df['precio']
-        df['categoria_precio'] = pd.cut(
-            df['precio'],
-            bins=[0, 50, 100, 200],
-            labels=['Bajo', 'Medio', 'Alto']
-        )
+        df = transformar_en_paralelo(df, calcular_columnas, self.max_workers,
+                                     intercambio=self.intercambio)
 
         if df['total'].isnull().any():
             raise ValueError("Error en cálculo de totales")
@@ -88,18 +114,25 @@ class ETLPipeline:
         if np.random.random() < 0.05:
             raise Exception("Error de conexión a base de datos")
 
-        logger.info(f"Cargados {len(df)} registros")
+        logger.info("Cargados %d registros", len(df))
         return True
 
     def ejecutar_pipeline(self) -> Dict[str, Any]:
         logger.info("Iniciando pipeline ETL completo")
+        self._ejecucion = self.historial.iniciar('etl_ecommerce') if self.historial else None
 
         try:
-            datos = self.extract()
-            datos = self.transform(datos)
-            self.load(datos)
-
-            return {
+            with self._etapa('extraccion') as etapa:
+                datos = self._entregar('extraccion', self.extract())
+                etapa['filas'] = len(datos)
+            with self._etapa('transformacion') as etapa:
+                datos = self._entregar('transformacion', self.transform(datos))
+                etapa['filas'] = len(datos)
+            with self._etapa('carga') as etapa:
+                self.load(datos)
+                etapa['filas'] = len(datos)
+
+            resultado = {
                 'exito': True,
                 'registros_procesados': len(datos),
                 'errores': self.errores
@@ -107,21 +140,32 @@ class ETLPipeline:
 
         except Exception as e:
             self.errores.append(str(e))
-            logger.error(f"Pipeline fallido: {e}")
+            logger.error("Pipeline fallido: %s", e)
 
-            return {
+            resultado = {
                 'exito': False,
                 'error_principal': str(e),
                 'errores': self.errores
             }
 
+        if self._ejecucion:
+            self._ejecucion.finalizar(resultado['exito'], resultado.get('registros_procesados'),
+                                      resultado.get('error_principal'), resultado)
+        return resultado
+
 
 # -----------------------------
 # EJECUCIÓN
 # -----------------------------
 if __name__ == "__main__":
-    pipeline = ETLPipeline()
+    configurar_logging(LOG_ARCHIVO, LOG_FORMATO, rotacion='tamano')
+    historial = HistorialEjecuciones()
+    pipeline = ETLPipeline(historial=historial)
     resultado = pipeline.ejecutar_pipeline()
+    for regresion in historial.detectar_regresiones('etl_ecommerce'):
+        logger.warning("Regresión en %s: %.3fs -> %.3fs (+%.0f%%)", regresion['etapa'],
+                       regresion['base_s'], regresion['actual_s'], regresion['incremento'] * 100)
+    historial.cerrar()
 
     print("\nResultado del pipeline")
     print(f"Éxito: {resultado['exito']}")
@@ -1,33 +1,57 @@
+import json
 import logging
+import os
 import pandas as pd
 import sqlite3
+import sys
 import time
+from contextlib import nullcontext
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from etl_comun.historial import HistorialEjecuciones  # noqa: E402
+from etl_comun.lectura import leer_pandas  # noqa: E402
+from etl_comun.logs import configurar_logging  # noqa: E402
+from etl_comun.paralelo import transformar_en_paralelo  # noqa: E402
 
 # ======================================================
 # CONFIGURACIÓN DE LOGGING
 # ======================================================
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('etl_pipeline.log'),
-        logging.StreamHandler()
-    ]
-)
+# Los handlers se configuran en el punto de entrada (ver __main__), no al importar
+LOG_ARCHIVO = 'etl_pipeline.log'
+LOG_FORMATO = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
 logger = logging.getLogger('etl_pipeline')
 
 
+def columnas_derivadas(data):
+    """Transformaciones fila a fila (a nivel de módulo para ejecutarse en workers)"""
+    return data.assign(
+        valor_cuadrado=data['valor'] ** 2,
+        categoria_normalizada=data['categoria'].str.upper()
+    )
+
+
 # ======================================================
 # CLASE PIPELINE ETL ROBUSTO
 # ======================================================
 class RobustETLPipeline:
-    def __init__(self, db_path='etl_database.db'):
+    def __init__(self, db_path='etl_database.db', intercambio=None, max_workers=1,
+                 historial=None):
         self.db_path = db_path
+        # HistorialEjecuciones opcional (etl_comun/historial.py): las métricas de cada
+        # ejecución y la duración por etapa se guardan para detectar regresiones
+        self.historial = historial
+        self._ejecucion = None
+        # Procesos para transform_with_validation (None = todos los núcleos; 1 = en proceso)
+        self.max_workers = max_workers
+        # AreaIntercambio opcional (etl_comun/intercambio.py): hand-off entre etapas en
+        # Arrow IPC mapeado, legible desde otros procesos sin copiar ni serializar
+        self.intercambio = intercambio
         self.logger = logging.getLogger('etl_pipeline')
         self.metrics = {
             'processed': 0,
             'errors': 0,
+            'rejected': 0,
             'start_time': None
         }
 
@@ -37,19 +61,41 @@ class RobustETLPipeline:
     def run_pipeline(self):
         self.metrics['start_time'] = pd.Timestamp.now()
         self.logger.info("=== INICIANDO PIPELINE ETL ROBUSTO ===")
+        self._ejecucion = self.historial.iniciar('etl_pipeline') if self.historial else None
 
         try:
-            data = self.extract_with_retry()
-            transformed_data = self.transform_with_validation(data)
-            self.load_with_transaction(transformed_data)
-            self.metrics['processed'] = len(transformed_data)
+            with self._etapa('extraccion') as etapa:
+                data = self._entregar('extraccion', self.extract_with_retry())
+                etapa['filas'] = len(data)
+            with self._etapa('transformacion') as etapa:
+                transformed_data = self._entregar('transformacion',
+                                                  self.transform_with_validation(data))
+                etapa['filas'] = len(transformed_data)
+            with self._etapa('carga') as etapa:
+                self.metrics['processed'] = self.load_with_transaction(transformed_data)
+                etapa['filas'] = self.metrics['processed']
             self.report_success()
+            self._registrar_ejecucion(True)
 
         except Exception as e:
             self.metrics['errors'] += 1
             self.report_failure(e)
+            self._registrar_ejecucion(False, e)
             raise
 
+    def _etapa(self, nombre):
+        return self._ejecucion.etapa(nombre) if self._ejecucion else nullcontext({})
+
+    def _registrar_ejecucion(self, exito, error=None):
+        if self._ejecucion:
+            self._ejecucion.finalizar(exito, self.metrics['processed'], error, self.metrics)
+
+    def _entregar(self, etapa, data):
+        if self.intercambio is None:
+            return data
+        self.intercambio.publicar(etapa, data)
+        return self.intercambio.pandas(etapa)
+
     # --------------------------------------------------
     # EXTRACCIÓN CON REINTENTOS
     # --------------------------------------------------
@@ -58,7 +104,7 @@ class RobustETLPipeline:
 
         for attempt in range(1, max_retries + 1):
             try:
-                self.logger.info(f"Intento de extracción #{attempt}")
+                self.logger.info("Intento de extracción #%d", attempt)
 
                 # Simulación de extracción
                 data = pd.DataFrame({
@@ -67,11 +113,11 @@ class RobustETLPipeline:
                     'categoria': ['A', 'B', 'C'] * 33 + ['A']
                 })
 
-                self.logger.info(f"Extracción exitosa: {len(data)} registros")
+                self.logger.info("Extracción exitosa: %d registros", len(data))
                 return data
 
             except Exception as e:
-                self.logger.warning(f"Intento #{attempt} falló: {e}")
+                self.logger.warning("Intento #%d falló: %s", attempt, e)
                 if attempt == max_retries:
                     raise
                 time.sleep(1)
@@ -88,33 +134,63 @@ class RobustETLPipeline:
             if data.isnull().any().any():
                 nulls = data.isnull().sum()
                 self.logger.warning(
-                    f"Valores nulos encontrados: {nulls[nulls > 0].to_dict()}"
+                    "Valores nulos encontrados: %s", nulls[nulls > 0].to_dict()
                 )
 
-            # Limpieza
-            data_clean = data.dropna().copy()
+            # Limpieza (con copy-on-write no hace falta .copy(): añadir columnas
+            # no modifica `data`)
+            data_clean = data.dropna()
 
-            # Transformaciones
-            data_clean['valor_cuadrado'] = data_clean['valor'] ** 2
-            data_clean['categoria_normalizada'] = data_clean['categoria'].str.upper()
+            # Transformaciones (en paralelo por particiones si el lote es grande)
+            data_clean = transformar_en_paralelo(data_clean, columnas_derivadas, self.max_workers,
+                                                 intercambio=self.intercambio)
 
             # Validación lógica
             if (data_clean['valor_cuadrado'] < 0).any():
                 raise ValueError("Valores negativos detectados en valor_cuadrado")
 
             self.logger.info(
-                f"Transformación exitosa: {original_count} -> {len(data_clean)} registros"
+                "Transformación exitosa: %d -> %d registros", original_count, len(data_clean)
             )
             return data_clean
 
         except Exception as e:
-            self.logger.error(f"Error en transformación: {e}")
+            self.logger.error("Error en transformación: %s", e)
             raise
 
     # --------------------------------------------------
     # CARGA CON TRANSACCIONES
     # --------------------------------------------------
-    def load_with_transaction(self, data):
+    # Errores achacables a una fila concreta; el resto (disco, bloqueos, SQL) abortan
+    ERRORES_DE_FILA = (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.DataError)
+
+    def _insertar_lote(self, conn, sql, filas, rechazos):
+        """Inserta `filas` bajo un savepoint. Si falla, deshace solo este lote y lo parte
+        en dos hasta aislar las filas culpables: k filas malas en un lote de n cuestan
+        unos 2·k·log2(n) reintentos, no repetir la carga"""
+        conn.execute('SAVEPOINT lote')
+        try:
+            conn.executemany(sql, filas)
+            conn.execute('RELEASE lote')
+            return len(filas)
+        except self.ERRORES_DE_FILA as e:
+            conn.execute('ROLLBACK TO lote')
+            conn.execute('RELEASE lote')
+            if rechazos is None:
+                raise
+            if len(filas) == 1:
+                rechazos.append((filas[0], f"{type(e).__name__}: {e}"))
+                return 0
+            mitad = len(filas) // 2
+            return (self._insertar_lote(conn, sql, filas[:mitad], rechazos)
+                    + self._insertar_lote(conn, sql, filas[mitad:], rechazos))
+
+    def load_with_transaction(self, data, tamano_lote=10_000, aislar_rechazos=True):
+        """Carga con estrategia replace en una transacción, por lotes bajo savepoints.
+
+        Con aislar_rechazos, las filas que violan restricciones se apartan a la tabla
+        datos_rechazados (fila en JSON + error) y el resto se confirma; sin él, la
+        primera fila mala deshace toda la carga como antes. Devuelve las filas cargadas."""
         self.logger.info("Iniciando carga a base de datos")
 
         with sqlite3.connect(self.db_path) as conn:
@@ -131,23 +207,47 @@ class RobustETLPipeline:
                     )
                 ''')
 
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS datos_rechazados (
+                        fila TEXT,
+                        error TEXT,
+                        fecha TEXT DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+
                 # Estrategia replace
                 conn.execute('DELETE FROM datos_transformados')
 
-                data.to_sql(
-                    'datos_transformados',
-                    conn,
-                    index=False,
-                    if_exists='append'
-                )
+                columnas = list(data.columns)
+                sql = (f"INSERT INTO datos_transformados ({', '.join(columnas)}) "
+                       f"VALUES ({', '.join('?' * len(columnas))})")
+                rechazos = [] if aislar_rechazos else None
+                cargados = 0
+                for inicio in range(0, len(data), tamano_lote):
+                    lote = data.iloc[inicio:inicio + tamano_lote]
+                    filas = list(lote.astype(object).where(lote.notna(), None)
+                                 .itertuples(index=False, name=None))
+                    cargados += self._insertar_lote(conn, sql, filas, rechazos)
+
+                if rechazos:
+                    conn.executemany(
+                        'INSERT INTO datos_rechazados (fila, error) VALUES (?, ?)',
+                        [(json.dumps(dict(zip(columnas, fila)), ensure_ascii=False, default=str), error)
+                         for fila, error in rechazos]
+                    )
+                    self.metrics['rejected'] += len(rechazos)
+                    self.logger.warning(
+                        "%d registros rechazados (ver tabla datos_rechazados)", len(rechazos)
+                    )
 
                 conn.commit()
                 self.logger.info(
-                    f"Carga exitosa: {len(data)} registros insertados"
+                    "Carga exitosa: %d registros insertados", cargados
                 )
+                return cargados
 
             except Exception as e:
-                self.logger.error(f"Error en carga, rollback ejecutado: {e}")
+                self.logger.error("Error en carga, rollback ejecutado: %s", e)
                 raise
 
     # --------------------------------------------------
@@ -156,28 +256,35 @@ class RobustETLPipeline:
     def report_success(self):
         duration = pd.Timestamp.now() - self.metrics['start_time']
         self.logger.info("=== PIPELINE ETL COMPLETADO EXITOSAMENTE ===")
-        self.logger.info(f"Duración total: {duration}")
-        self.logger.info(f"Registros procesados: {self.metrics['processed']}")
-        self.logger.info(f"Errores: {self.metrics['errors']}")
+        self.logger.info("Duración total: %s", duration)
+        self.logger.info("Registros procesados: %d", self.metrics['processed'])
+        self.logger.info("Registros rechazados: %d", self.metrics['rejected'])
+        self.logger.info("Errores: %d", self.metrics['errors'])
 
     def report_failure(self, error):
         duration = pd.Timestamp.now() - self.metrics['start_time']
         self.logger.error("=== PIPELINE ETL FALLÓ ===")
-        self.logger.error(f"Duración hasta fallo: {duration}")
-        self.logger.error(f"Error: {error}")
+        self.logger.error("Duración hasta fallo: %s", duration)
+        self.logger.error("Error: %s", error)
 
 
 # ======================================================
 # EJECUCIÓN
 # ======================================================
 if __name__ == "__main__":
-    pipeline = RobustETLPipeline()
+    configurar_logging(LOG_ARCHIVO, LOG_FORMATO, rotacion='tamano')
+    historial = HistorialEjecuciones()
+    pipeline = RobustETLPipeline(historial=historial)
     pipeline.run_pipeline()
+    for regresion in historial.detectar_regresiones('etl_pipeline'):
+        logger.warning("Regresión en %s: %.3fs -> %.3fs (+%.0f%%)", regresion['etapa'],
+                       regresion['base_s'], regresion['actual_s'], regresion['incremento'] * 100)
+    historial.cerrar()
 
     # Verificación final
     with sqlite3.connect('etl_database.db') as conn:
-        df_check = pd.read_sql(
-            'SELECT COUNT(*) AS registros FROM datos_transformados',
-            conn
+        df_check = leer_pandas(
+            conn,
+            'SELECT COUNT(*) AS registros FROM datos_transformados'
         )
         print(f"\nRegistros en base de datos: {df_check.iloc[0, 0]}")
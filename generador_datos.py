@@ -0,0 +1,353 @@
+import argparse
+import os
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# CONFIGURACIÓN POR DEFECTO
+# -----------------------------
+CONFIG_DEFECTO = {
+    'n_clientes': 100_000,
+    'n_productos': 5_000,
+    'sesgo': 1.1,               # exponente Zipf de clientes/productos (0 = uniforme)
+    'tasa_nulos': 0.0,
+    'tasa_outliers': 0.0,
+    'tasa_fk_invalidas': 0.0,
+    'fecha_inicio': '2023-01-01',
+    'fecha_fin': '2024-12-31',
+}
+
+NOMBRES = np.array(['Ana', 'Carlos', 'María', 'Juan', 'Luis', 'Lucía', 'Sofía', 'Pedro',
+                    'Elena', 'Diego', 'Marta', 'Javier', 'Laura', 'Pablo', 'Carmen'])
+APELLIDOS = np.array(['García', 'López', 'Rodríguez', 'Pérez', 'Martín', 'Sánchez', 'Gómez',
+                      'Díaz', 'Ruiz', 'Torres', 'Flores', 'Vega', 'Castro', 'Ortiz'])
+CIUDADES = ['Madrid', 'Barcelona', 'Valencia', 'Sevilla', 'Bilbao', 'Zaragoza', 'Málaga']
+REGIONES = ['Norte', 'Sur', 'Este', 'Oeste', 'Centro']
+CATEGORIAS = ['Electrónica', 'Ropa', 'Hogar', 'Deportes', 'Libros', 'Accesorios', 'Audio']
+MARCAS = ['Acme', 'Nova', 'Zeta', 'Orbit', 'Delta', 'Prisma']
+METODOS_PAGO = ['Tarjeta', 'PayPal', 'Efectivo', 'Transferencia']
+PROB_PAGO = [0.6, 0.2, 0.15, 0.05]
+TIPOS_CLIENTE = ['Regular', 'Premium', 'VIP']
+PROB_TIPO = [0.7, 0.2, 0.1]
+CANALES = ['web', 'app', 'tienda']
+
+
+# -----------------------------
+# UTILIDADES VECTORIZADAS
+# -----------------------------
+@lru_cache(maxsize=8)
+def _cdf_zipf(n, sesgo):
+    pesos = 1.0 / np.arange(1, n + 1) ** sesgo
+    cdf = np.cumsum(pesos)
+    return cdf / cdf[-1]
+
+
+def _ids_sesgados(rng, n_ids, tamano, sesgo):
+    """Ids 1..n_ids con popularidad Zipf (unos pocos clientes/productos concentran ventas)"""
+    if sesgo <= 0:
+        return rng.integers(1, n_ids + 1, tamano)
+    return np.searchsorted(_cdf_zipf(n_ids, sesgo), rng.random(tamano)) + 1
+
+
+def _categoria(rng, valores, tamano, p=None):
+    """Columna categórica sin crear millones de objetos str"""
+    codigos = rng.choice(len(valores), tamano, p=p)
+    return pd.Categorical.from_codes(codigos, categories=valores)
+
+
+def _fechas(rng, tamano, cfg):
+    inicio = np.datetime64(cfg['fecha_inicio'], 's').astype(np.int64)
+    fin = np.datetime64(cfg['fecha_fin'], 's').astype(np.int64)
+    return pd.to_datetime(rng.integers(inicio, fin, tamano), unit='s')
+
+
+def _inyectar_nulos(rng, df, columnas, tasa):
+    if tasa <= 0:
+        return
+    for col in columnas:
+        mascara = rng.random(len(df)) < tasa
+        df[col] = df[col].mask(mascara)
+
+
+def _inyectar_outliers(rng, df, columnas, tasa):
+    if tasa <= 0:
+        return
+    for col in columnas:
+        mascara = rng.random(len(df)) < tasa
+        factor = np.where(mascara, rng.uniform(10, 100, len(df)), 1.0)
+        df[col] = df[col] * factor
+
+
+def _inyectar_fk_invalidas(rng, df, columna, n_validos, tasa):
+    if tasa <= 0:
+        return
+    mascara = rng.random(len(df)) < tasa
+    df.loc[mascara, columna] = n_validos + rng.integers(1, 1000, int(mascara.sum()))
+
+
+# -----------------------------
+# GENERADORES POR TABLA
+# -----------------------------
+def _clientes(inicio, n, rng, cfg):
+    ids = np.arange(inicio + 1, inicio + n + 1)
+    df = pd.DataFrame({
+        'id_cliente': ids,
+        'nombre': pd.Series(rng.choice(NOMBRES, n)) + ' ' + rng.choice(APELLIDOS, n),
+        'email': 'cliente' + pd.Series(ids).astype(str) + '@ejemplo.com',
+        'ciudad': _categoria(rng, CIUDADES, n),
+        'tipo_cliente': _categoria(rng, TIPOS_CLIENTE, n, PROB_TIPO),
+        'fecha_registro': _fechas(rng, n, cfg),
+    })
+    _inyectar_nulos(rng, df, ['email', 'ciudad'], cfg['tasa_nulos'])
+    return df
+
+
+def _productos(inicio, n, rng, cfg):
+    ids = np.arange(inicio + 1, inicio + n + 1)
+    df = pd.DataFrame({
+        'id_producto': ids,
+        'nombre': 'Producto ' + pd.Series(ids).astype(str),
+        'categoria': _categoria(rng, CATEGORIAS, n),
+        'precio': np.round(rng.lognormal(4, 1, n), 2),
+    })
+    _inyectar_outliers(rng, df, ['precio'], cfg['tasa_outliers'])
+    return df
+
+
+def _pedidos(inicio, n, rng, cfg):
+    cantidad = rng.integers(1, 6, n)
+    precio = np.round(rng.lognormal(4, 1, n), 2)
+    df = pd.DataFrame({
+        'id_pedido': np.arange(inicio + 1, inicio + n + 1),
+        'id_cliente': _ids_sesgados(rng, cfg['n_clientes'], n, cfg['sesgo']),
+        'id_producto': _ids_sesgados(rng, cfg['n_productos'], n, cfg['sesgo']),
+        'fecha_pedido': _fechas(rng, n, cfg),
+        'cantidad': cantidad,
+        'precio_unitario': precio,
+        'metodo_pago': _categoria(rng, METODOS_PAGO, n, PROB_PAGO),
+        'region': _categoria(rng, REGIONES, n),
+    })
+    _inyectar_outliers(rng, df, ['precio_unitario'], cfg['tasa_outliers'])
+    df['total'] = np.round(df['cantidad'] * df['precio_unitario'], 2)
+    _inyectar_nulos(rng, df, ['precio_unitario', 'metodo_pago', 'region'], cfg['tasa_nulos'])
+    _inyectar_fk_invalidas(rng, df, 'id_cliente', cfg['n_clientes'], cfg['tasa_fk_invalidas'])
+    _inyectar_fk_invalidas(rng, df, 'id_producto', cfg['n_productos'], cfg['tasa_fk_invalidas'])
+    return df
+
+
+# --- Modelo dimensional (ecommerce_dw.sql) ---
+def _dim_customer(inicio, n, rng, cfg):
+    ids = np.arange(inicio + 1, inicio + n + 1)
+    return pd.DataFrame({
+        'customer_id': ids,
+        'email': 'cliente' + pd.Series(ids).astype(str) + '@ejemplo.com',
+        'registration_date': _fechas(rng, n, cfg).normalize(),
+        'customer_segment': _categoria(rng, TIPOS_CLIENTE, n, PROB_TIPO),
+        'total_orders': rng.poisson(8, n),
+        'lifetime_value': np.round(rng.lognormal(6, 1, n), 2),
+    })
+
+
+def _dim_product(inicio, n, rng, cfg):
+    ids = np.arange(inicio + 1, inicio + n + 1)
+    coste = np.round(rng.lognormal(3.5, 1, n), 2)
+    return pd.DataFrame({
+        'product_id': ids,
+        'sku': 'SKU-' + pd.Series(ids).astype(str).str.zfill(8),
+        'name': 'Producto ' + pd.Series(ids).astype(str),
+        'category': _categoria(rng, CATEGORIAS, n),
+        'brand': _categoria(rng, MARCAS, n),
+        'unit_cost': coste,
+        'current_price': np.round(coste * rng.uniform(1.1, 2.0, n), 2),
+    })
+
+
+def _dim_location(inicio, n, rng, cfg):
+    ids = np.arange(inicio + 1, inicio + n + 1)
+    return pd.DataFrame({
+        'location_id': ids,
+        'country': 'España',
+        'region': _categoria(rng, REGIONES, n),
+        'city': _categoria(rng, CIUDADES, n),
+        'postal_code': pd.Series(rng.integers(1000, 52999, n)).astype(str).str.zfill(5),
+        'timezone': 'Europe/Madrid',
+    })
+
+
+def _fact_orders(inicio, n, rng, cfg):
+    fechas = _fechas(rng, n, cfg)
+    cantidad = rng.integers(1, 6, n)
+    # Outliers en el precio antes de derivar importes (como en _pedidos): así el total
+    # sigue cuadrando con precio × cantidad
+    precios = pd.DataFrame({'unit_price': np.round(rng.lognormal(4, 1, n), 2)})
+    _inyectar_outliers(rng, precios, ['unit_price'], cfg['tasa_outliers'])
+    precio = np.round(precios['unit_price'].to_numpy(), 2)
+    bruto = cantidad * precio
+    descuento = np.round(bruto * rng.choice([0, 0.05, 0.1, 0.2], n, p=[0.7, 0.15, 0.1, 0.05]), 2)
+    impuesto = np.round((bruto - descuento) * 0.21, 2)
+    envio = np.round(rng.choice([0, 4.99, 9.99], n, p=[0.5, 0.35, 0.15]), 2)
+    df = pd.DataFrame({
+        'order_id': np.arange(inicio + 1, inicio + n + 1),
+        'customer_id': _ids_sesgados(rng, cfg['n_clientes'], n, cfg['sesgo']),
+        'product_id': _ids_sesgados(rng, cfg['n_productos'], n, cfg['sesgo']),
+        'time_id': (fechas.year * 10000 + fechas.month * 100 + fechas.day).to_numpy(),
+        'location_id': rng.integers(1, cfg.get('n_ubicaciones', 500) + 1, n),
+        'quantity_ordered': cantidad,
+        'unit_price': precio,
+        'discount_amount': descuento,
+        'tax_amount': impuesto,
+        'shipping_cost': envio,
+        'total_amount': np.round(bruto - descuento + impuesto + envio, 2),
+        'profit_margin': np.round(rng.uniform(0.05, 0.4, n), 2),
+        'is_first_purchase': rng.random(n) < 0.1,
+        'order_channel': _categoria(rng, CANALES, n),
+        'payment_method': _categoria(rng, METODOS_PAGO, n, PROB_PAGO),
+    })
+    _inyectar_nulos(rng, df, ['discount_amount', 'payment_method'], cfg['tasa_nulos'])
+    _inyectar_fk_invalidas(rng, df, 'customer_id', cfg['n_clientes'], cfg['tasa_fk_invalidas'])
+    _inyectar_fk_invalidas(rng, df, 'product_id', cfg['n_productos'], cfg['tasa_fk_invalidas'])
+    return df
+
+
+def dim_time(fecha_inicio='2023-01-01', fecha_fin='2024-12-31'):
+    """Calendario completo (no depende de la escala, se genera entero)"""
+    fechas = pd.date_range(fecha_inicio, fecha_fin, freq='D')
+    return pd.DataFrame({
+        'date_key': fechas.year * 10000 + fechas.month * 100 + fechas.day,
+        'full_date': fechas,
+        'year': fechas.year,
+        'quarter': fechas.quarter,
+        'month': fechas.month,
+        'day_of_week': fechas.dayofweek,
+        'is_weekend': fechas.dayofweek >= 5,
+        'is_holiday': (fechas.month == 1) & (fechas.day == 1) | (fechas.month == 12) & (fechas.day == 25),
+    })
+
+
+TABLAS = {
+    'clientes': _clientes,
+    'productos': _productos,
+    'pedidos': _pedidos,
+    'dim_customer': _dim_customer,
+    'dim_product': _dim_product,
+    'dim_location': _dim_location,
+    'fact_orders': _fact_orders,
+}
+
+
+# -----------------------------
+# GENERACIÓN POR CHUNKS
+# -----------------------------
+def _plan_chunks(n_filas, chunk_filas, semilla):
+    """(índice, inicio, tamaño, semilla) por chunk. Las semillas derivan de una
+    SeedSequence, así el resultado es idéntico con 1 o con N procesos."""
+    n_chunks = max(1, -(-n_filas // chunk_filas))
+    semillas = np.random.SeedSequence(semilla).spawn(n_chunks)
+    return [(i, i * chunk_filas, min(chunk_filas, n_filas - i * chunk_filas), semillas[i])
+            for i in range(n_chunks)]
+
+
+def _generar_chunk(tabla, inicio, n, semilla, cfg):
+    return TABLAS[tabla](inicio, n, np.random.default_rng(semilla), cfg)
+
+
+def generar(tabla, n_filas, chunk_filas=1_000_000, semilla=42, **config):
+    """Generador en streaming: produce la tabla en DataFrames de `chunk_filas` filas"""
+    cfg = dict(CONFIG_DEFECTO, **config)
+    for _, inicio, n, sem in _plan_chunks(n_filas, chunk_filas, semilla):
+        yield _generar_chunk(tabla, inicio, n, sem, cfg)
+
+
+def _escribir_parte(tabla, indice, inicio, n, semilla, cfg, directorio, formato):
+    """Trabajo de un worker: genera un chunk y lo escribe en su propio archivo"""
+    df = _generar_chunk(tabla, inicio, n, semilla, cfg)
+    ruta = os.path.join(directorio, f'parte_{indice:05d}.{formato}')
+    if formato == 'parquet':
+        df.to_parquet(ruta, engine='pyarrow', compression='zstd', index=False)
+    else:
+        df.to_csv(ruta, index=False)
+    return len(df)
+
+
+def escribir_tabla(tabla, n_filas, destino, formato='parquet', chunk_filas=1_000_000,
+                   semilla=42, max_workers=None, **config):
+    """Genera y escribe una tabla a escala en chunks, en varios procesos.
+
+    parquet/csv: un archivo por chunk en destino/<tabla>/ (dataset particionado).
+    sqlite: los workers generan y el proceso principal inserta (un único escritor)."""
+    cfg = dict(CONFIG_DEFECTO, **config)
+    plan = _plan_chunks(n_filas, chunk_filas, semilla)
+    inicio = time.perf_counter()
+    filas = 0
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        if formato in ('parquet', 'csv'):
+            directorio = os.path.join(destino, tabla)
+            os.makedirs(directorio, exist_ok=True)
+            futuros = [executor.submit(_escribir_parte, tabla, i, ini, n, sem, cfg, directorio, formato)
+                       for i, ini, n, sem in plan]
+            filas = sum(f.result() for f in futuros)
+        elif formato == 'sqlite':
+            # Ventana de futuros acotada: si el escritor va más lento que los workers,
+            # en memoria hay como mucho `en_vuelo` chunks, no la tabla entera
+            en_vuelo = 2 * (max_workers or os.cpu_count() or 1)
+            futuros = deque()
+            with sqlite3.connect(destino) as conn:
+                for i, (_, ini, n, sem) in enumerate(plan):
+                    futuros.append(executor.submit(_generar_chunk, tabla, ini, n, sem, cfg))
+                    while futuros and (len(futuros) >= en_vuelo or i == len(plan) - 1):
+                        df = futuros.popleft().result()
+                        df.to_sql(tabla, conn, if_exists='append', index=False, chunksize=50_000)
+                        filas += len(df)
+        else:
+            raise ValueError(f"Formato no soportado: {formato}")
+
+    duracion = time.perf_counter() - inicio
+    print(f"{tabla}: {filas:,} filas en {duracion:.1f}s ({filas / max(duracion, 1e-9):,.0f} filas/s)")
+    return filas
+
+
+# -----------------------------
+# EJECUCIÓN
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generador de datos sintéticos a escala')
+    parser.add_argument('tabla', choices=sorted(TABLAS) + ['dim_time'])
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--salida', default='datos_sinteticos')
+    parser.add_argument('--formato', choices=['parquet', 'csv', 'sqlite'], default='parquet')
+    parser.add_argument('--chunk', type=int, default=1_000_000)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--clientes', type=int, default=CONFIG_DEFECTO['n_clientes'])
+    parser.add_argument('--productos', type=int, default=CONFIG_DEFECTO['n_productos'])
+    parser.add_argument('--sesgo', type=float, default=CONFIG_DEFECTO['sesgo'])
+    parser.add_argument('--nulos', type=float, default=0.0)
+    parser.add_argument('--outliers', type=float, default=0.0)
+    parser.add_argument('--fk-invalidas', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    if args.tabla == 'dim_time':
+        df = dim_time()
+        os.makedirs(args.salida, exist_ok=True)
+        df.to_parquet(os.path.join(args.salida, 'dim_time.parquet'), index=False)
+        print(f"dim_time: {len(df)} filas")
+        return
+
+    escribir_tabla(
+        args.tabla, args.filas, args.salida, args.formato, args.chunk, args.semilla,
+        args.workers, n_clientes=args.clientes, n_productos=args.productos,
+        sesgo=args.sesgo, tasa_nulos=args.nulos, tasa_outliers=args.outliers,
+        tasa_fk_invalidas=args.fk_invalidas,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# LADO DE CONSTRUCCIÓN (DIMENSIÓN)
+# -----------------------------
+class DimensionHash:
+    """Tabla hash construida una sola vez sobre una dimensión pequeña (productos,
+    clientes...). Solo se guardan las columnas proyectadas, ya renombradas, para que
+    no aparezcan colisiones tipo nombre_x / nombre_y al enriquecer los hechos."""
+
+    def __init__(self, df, clave, columnas=None, renombrar=None, clave_hechos=None):
+        self.clave = clave
+        self.clave_hechos = clave_hechos or clave
+        columnas = [c for c in (columnas or df.columns) if c != clave]
+        if df[clave].duplicated().any():
+            raise ValueError(f"La clave '{clave}' de la dimensión no es única")
+
+        # Diccionario de claves: índice hash clave -> posición
+        self.indice = pd.Index(df[clave].to_numpy())
+        self.columnas = {
+            (renombrar or {}).get(c, c): df[c].to_numpy() for c in columnas
+        }
+
+    def __len__(self):
+        return len(self.indice)
+
+    def sondear(self, claves):
+        """Posición en la dimensión de cada clave de hechos (-1 si no existe)"""
+        return self.indice.get_indexer(claves)
+
+    def tomar(self, posiciones):
+        """Columnas de la dimensión alineadas con `posiciones` (NaN/None en -1)"""
+        faltantes = posiciones < 0
+        resultado = {}
+        for nombre, valores in self.columnas.items():
+            if len(valores) == 0:
+                tomados = np.full(len(posiciones), None, dtype=object)
+            else:
+                tomados = valores.take(np.where(faltantes, 0, posiciones))
+                if faltantes.any():
+                    tomados = pd.Series(tomados).where(~faltantes).to_numpy()
+            resultado[nombre] = tomados
+        return resultado
+
+
+# -----------------------------
+# LADO DE SONDEO (HECHOS EN STREAMING)
+# -----------------------------
+def unir_chunk(hechos, dimensiones, como='inner', columnas_hechos=None):
+    """Enriquece un chunk de hechos con todas las dimensiones sin copias intermedias"""
+    if columnas_hechos is not None:
+        hechos = hechos[list(columnas_hechos)]
+
+    mantener = np.ones(len(hechos), dtype=bool)
+    posiciones = []
+    for dim in dimensiones:
+        pos = dim.sondear(hechos[dim.clave_hechos].to_numpy())
+        posiciones.append(pos)
+        if como == 'inner':
+            mantener &= pos >= 0
+
+    if not mantener.all():
+        hechos = hechos[mantener]
+        posiciones = [pos[mantener] for pos in posiciones]
+
+    columnas = {c: hechos[c].to_numpy() for c in hechos.columns}
+    for dim, pos in zip(dimensiones, posiciones):
+        for nombre, valores in dim.tomar(pos).items():
+            if nombre in columnas:
+                raise ValueError(f"Columna duplicada tras el join: '{nombre}' (usa renombrar)")
+            columnas[nombre] = valores
+    return pd.DataFrame(columnas, index=hechos.index)
+
+
+def unir_hechos(hechos, dimensiones, como='inner', columnas_hechos=None):
+    """Join en memoria de un DataFrame de hechos contra las dimensiones"""
+    return unir_chunk(hechos, dimensiones, como, columnas_hechos)
+
+
+def unir_streaming(chunks, dimensiones, como='inner', columnas_hechos=None):
+    """Generador: sondea cada chunk de hechos contra tablas hash construidas una vez"""
+    for chunk in chunks:
+        yield unir_chunk(chunk, dimensiones, como, columnas_hechos)
+
+
+# -----------------------------
+# JOIN PARTICIONADO CON DERRAME A DISCO (GRACE HASH JOIN)
+# -----------------------------
+def _particion(claves, n_particiones):
+    """Partición de cada clave. hash_array depende del dtype: las claves numéricas se
+    pasan a float64 (y -0.0 a 0.0) para que una FK float64 con NaN caiga en la misma
+    partición que la clave int64 de la dimensión, igual que las empareja pd.merge"""
+    claves = pd.Series(claves).infer_objects()
+    if pd.api.types.is_numeric_dtype(claves):
+        valores = claves.to_numpy(dtype=np.float64, na_value=np.nan) + 0.0
+    else:
+        valores = claves.to_numpy()
+    return (pd.util.hash_array(valores) % n_particiones).astype(np.int64)
+
+
+def _esquema_derrame(tabla):
+    """Esquema fijo de los hechos derramados: los enteros pasan a float64, porque un
+    chunk posterior de read_csv con algún nulo trae la misma columna como float64"""
+    import pyarrow as pa
+
+    return pa.schema([campo.with_type(pa.float64()) if pa.types.is_integer(campo.type) else campo
+                      for campo in tabla.schema])
+
+
+def _escribir_particiones(df, columna_clave, n_particiones, escritores, esquemas,
+                          directorio, prefijo):
+    """Reparte `df` por hash de la clave en un Parquet por partición. Todos los chunks
+    de un lado se convierten al esquema fijado con el primero (`esquemas[prefijo]`):
+    un ParquetWriter no admite tablas con otro esquema que el de su creación. La
+    dimensión se escribe de una vez y conserva sus tipos"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    if prefijo not in esquemas:
+        esquemas[prefijo] = _esquema_derrame(tabla) if prefijo == 'hechos' else tabla.schema
+    tabla = tabla.cast(esquemas[prefijo])
+    part = _particion(df[columna_clave], n_particiones)
+    for p in np.unique(part):
+        if (prefijo, p) not in escritores:
+            ruta = os.path.join(directorio, f'{prefijo}_{p}.parquet')
+            escritores[(prefijo, p)] = pq.ParquetWriter(ruta, esquemas[prefijo])
+        escritores[(prefijo, p)].write_table(tabla.filter(pa.array(part == p)))
+
+
+def unir_con_derrame(chunks, dimension_df, clave, como='inner', columnas=None,
+                     renombrar=None, clave_hechos=None, max_filas_memoria=5_000_000,
+                     n_particiones=32, directorio=None):
+    """Join de hechos en streaming contra una dimensión posiblemente grande.
+
+    Si la dimensión cabe en memoria (`max_filas_memoria`) se comporta como
+    `unir_streaming`. Si no, ambos lados se particionan por hash de la clave y se
+    derraman a Parquet; después se une partición a partición, así solo una partición
+    de la dimensión está en memoria a la vez. En ese modo no se conserva el orden y las
+    columnas enteras de los hechos salen como float64 (los chunks pueden diferir en dtype)."""
+    clave_hechos = clave_hechos or clave
+    if len(dimension_df) <= max_filas_memoria:
+        dim = DimensionHash(dimension_df, clave, columnas, renombrar, clave_hechos)
+        yield from unir_streaming(chunks, [dim], como)
+        return
+
+    import pyarrow.parquet as pq
+
+    temporal = directorio is None
+    directorio = directorio or tempfile.mkdtemp(prefix='hash_join_')
+    escritores = {}
+    esquemas = {}
+    try:
+        proyectadas = [clave] + [c for c in (columnas or dimension_df.columns) if c != clave]
+        _escribir_particiones(dimension_df[proyectadas], clave, n_particiones,
+                              escritores, esquemas, directorio, 'dim')
+        for chunk in chunks:
+            _escribir_particiones(chunk, clave_hechos, n_particiones,
+                                  escritores, esquemas, directorio, 'hechos')
+        for escritor in escritores.values():
+            escritor.close()
+        escritores = {}
+
+        for p in range(n_particiones):
+            ruta_hechos = os.path.join(directorio, f'hechos_{p}.parquet')
+            if not os.path.exists(ruta_hechos):
+                continue
+            ruta_dim = os.path.join(directorio, f'dim_{p}.parquet')
+            if os.path.exists(ruta_dim):
+                dim_part = pd.read_parquet(ruta_dim)
+            else:
+                dim_part = dimension_df[proyectadas].iloc[:0]
+            dim = DimensionHash(dim_part, clave, columnas, renombrar, clave_hechos)
+            archivo = pq.ParquetFile(ruta_hechos)
+            for i in range(archivo.num_row_groups):
+                yield unir_chunk(archivo.read_row_group(i).to_pandas(), [dim], como)
+    finally:
+        for escritor in escritores.values():
+            escritor.close()
+        if temporal:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    # Comprobación: el join con derrame debe dar lo mismo que pd.merge, también con una
+    # FK float64 con nulos contra una clave int64 (dtypes distintos en cada lado) y con
+    # chunks cuyo dtype cambia (int64 sin nulos / float64 con nulos, como en read_csv)
+    rng = np.random.default_rng(0)
+    productos = pd.DataFrame({'producto_id': np.arange(1, 2_001),
+                              'categoria': rng.choice(['A', 'B', 'C'], 2_000)})
+    ventas = pd.DataFrame({'venta_id': np.arange(10_000),
+                           'producto_id': rng.integers(1, 2_500, 10_000).astype(float)})
+    impares = (ventas['venta_id'] // 1_000) % 2 == 1
+    ventas.loc[ventas[impares].sample(frac=0.1, random_state=0).index, 'producto_id'] = np.nan
+
+    def chunks_mixtos():
+        for i in range(0, len(ventas), 1_000):
+            chunk = ventas.iloc[i:i + 1_000]
+            if (i // 1_000) % 2 == 0:
+                chunk = chunk.astype({'producto_id': 'int64'})
+            yield chunk
+
+    for como in ('inner', 'left'):
+        for nombre, chunks in (('float', (ventas.iloc[i:i + 1_000] for i in range(0, len(ventas), 1_000))),
+                               ('int/float', chunks_mixtos())):
+            derrame = pd.concat(unir_con_derrame(chunks, productos, 'producto_id', como=como,
+                                                 max_filas_memoria=100, n_particiones=8))
+            esperado = ventas.merge(productos, on='producto_id', how=como)
+            derrame = derrame.sort_values('venta_id').reset_index(drop=True)
+            esperado = esperado.sort_values('venta_id').reset_index(drop=True)
+            pd.testing.assert_frame_equal(derrame, esperado, check_dtype=False)
+            print(f"Join con derrame ({como}, chunks {nombre}): {len(derrame):,} filas, igual que pd.merge")
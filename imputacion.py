@@ -0,0 +1,216 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+
+GLOBAL = '__global__'
+
+
+# -----------------------------
+# SKETCH DE CUANTILES (mergeable)
+# -----------------------------
+def cubetas_logaritmicas(valores, gamma):
+    """Lleva cada valor al centro de su cubeta logarítmica (error relativo acotado,
+    estilo DDSketch). El representante conserva el orden y sirve como estimación."""
+    valores = np.asarray(valores, dtype='float64')
+    absolutos = np.abs(valores)
+    con_valor = absolutos > 0
+    k = np.zeros(len(valores))
+    k[con_valor] = np.ceil(np.log(absolutos[con_valor]) / np.log(gamma))
+    rep = np.sign(valores) * gamma ** k * 2 / (gamma + 1)
+    return np.where(con_valor, rep, 0.0)
+
+
+def _cuantil_por_grupo(conteos, q):
+    """conteos: Series con índice (grupo, representante) -> frecuencia"""
+    if conteos.empty:
+        return pd.Series(dtype='float64')
+    conteos = conteos.sort_index()
+    grupos = conteos.index.get_level_values(0)
+    acumulado = conteos.groupby(level=0, sort=False).cumsum()
+    total = conteos.groupby(level=0, sort=False).transform('sum')
+    # Primera cubeta cuyo acumulado alcanza q * total (regla de la mediana inferior/superior)
+    alcanzado = acumulado.to_numpy() >= q * total.to_numpy()
+    primeras = pd.Series(alcanzado, index=conteos.index).groupby(grupos, sort=False).idxmax()
+    return pd.Series([idx[1] for idx in primeras], index=primeras.index, dtype='float64')
+
+
+def _nativo(valor):
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+# -----------------------------
+# IMPUTADOR POR GRUPO
+# -----------------------------
+class ImputadorPorGrupo:
+    """Ajusta en una pasada estadísticos por grupo (media, mediana o moda) y los aplica
+    a chunks nuevos sin reajustar.
+
+    Todo el estado son conteos agregados, así `ajustar_parcial` se puede llamar chunk
+    a chunk (o en varios procesos y luego `combinar`) sin guardar el dataset: la media
+    son sumas y conteos, la moda frecuencias exactas por valor y la mediana un sketch
+    de cubetas logarítmicas con error relativo `error_relativo`. Los grupos sin datos
+    (o no vistos en el ajuste) usan el estadístico global."""
+
+    ESTRATEGIAS = ('media', 'mediana', 'moda')
+
+    def __init__(self, estrategias, grupo=None, error_relativo=0.005):
+        for columna, estrategia in estrategias.items():
+            if estrategia not in self.ESTRATEGIAS:
+                raise ValueError(f"Estrategia no soportada para {columna}: {estrategia}")
+        self.estrategias = dict(estrategias)
+        self.grupo = grupo
+        self.error_relativo = error_relativo
+        self.gamma = (1 + error_relativo) / (1 - error_relativo)
+        self.filas = 0
+        self._conteos = {col: pd.Series(dtype='float64') for col in estrategias}
+        self._nulos = None
+        self._estadisticos = None
+
+    # --------------------------------------------------
+    # AJUSTE
+    # --------------------------------------------------
+    def _codificar(self, chunk):
+        """Códigos de grupo por fila y sus etiquetas; los nulos van al grupo GLOBAL"""
+        if self.grupo is None:
+            return np.zeros(len(chunk), dtype='int64'), np.array([GLOBAL], dtype=object)
+        codigos, unicos = pd.factorize(chunk[self.grupo])
+        etiquetas = np.append(np.asarray(unicos, dtype=object), GLOBAL)
+        return np.where(codigos < 0, len(etiquetas) - 1, codigos), etiquetas
+
+    def _claves(self, chunk):
+        codigos, etiquetas = self._codificar(chunk)
+        return etiquetas[codigos]
+
+    def ajustar_parcial(self, chunk):
+        claves = self._claves(chunk)
+        for columna, estrategia in self.estrategias.items():
+            serie = chunk[columna]
+            presentes = serie.notna().to_numpy()
+            if estrategia == 'media':
+                valores = serie.to_numpy(dtype='float64', na_value=np.nan)[presentes]
+                por_grupo = pd.DataFrame({'suma': valores, 'n': 1.0}).groupby(
+                    claves[presentes]).sum()
+                nuevos = por_grupo.stack()
+            else:
+                if estrategia == 'mediana':
+                    valores = cubetas_logaritmicas(
+                        serie.to_numpy(dtype='float64', na_value=np.nan)[presentes], self.gamma)
+                else:
+                    valores = serie.to_numpy(dtype=object)[presentes]
+                nuevos = pd.Series(1.0, index=pd.MultiIndex.from_arrays(
+                    [claves[presentes], valores])).groupby(level=[0, 1]).sum()
+            self._conteos[columna] = self._conteos[columna].add(nuevos, fill_value=0)
+
+        nulos = chunk.isna().groupby(claves).sum()
+        self._nulos = nulos if self._nulos is None else self._nulos.add(nulos, fill_value=0)
+        self.filas += len(chunk)
+        self._estadisticos = None
+        return self
+
+    def ajustar(self, chunks):
+        """Ajusta sobre un DataFrame o sobre un iterable de chunks"""
+        if isinstance(chunks, pd.DataFrame):
+            chunks = [chunks]
+        for chunk in chunks:
+            self.ajustar_parcial(chunk)
+        return self
+
+    def combinar(self, otro):
+        """Une el estado de otro imputador ajustado sobre otra partición de los datos"""
+        for columna in self.estrategias:
+            self._conteos[columna] = self._conteos[columna].add(otro._conteos[columna], fill_value=0)
+        if otro._nulos is not None:
+            self._nulos = otro._nulos if self._nulos is None else self._nulos.add(otro._nulos, fill_value=0)
+        self.filas += otro.filas
+        self._estadisticos = None
+        return self
+
+    # --------------------------------------------------
+    # ESTADÍSTICOS
+    # --------------------------------------------------
+    def _calcular(self, columna):
+        estrategia = self.estrategias[columna]
+        conteos = self._conteos[columna]
+        if conteos.empty:
+            return {}
+        if estrategia == 'media':
+            tabla = conteos.unstack()
+            globales = tabla.sum()
+            por_grupo = tabla['suma'] / tabla['n']
+            por_grupo[GLOBAL] = globales['suma'] / globales['n']
+            return por_grupo.to_dict()
+
+        # El global se obtiene sumando los conteos de todos los grupos
+        todos = conteos.groupby(level=1).sum()
+        todos.index = pd.MultiIndex.from_product([[GLOBAL], todos.index])
+        if self.grupo is not None:
+            conteos = pd.concat([conteos.drop(GLOBAL, level=0, errors='ignore'), todos])
+        if estrategia == 'mediana':
+            return _cuantil_por_grupo(conteos, 0.5).to_dict()
+        # Moda: valor más frecuente (en empate, el menor, como Series.mode()[0])
+        ordenados = conteos.reset_index().sort_values(['level_0', 0, 'level_1'],
+                                                      ascending=[True, False, True])
+        return ordenados.drop_duplicates('level_0').set_index('level_0')['level_1'].to_dict()
+
+    def estadisticos(self):
+        """{columna: {grupo: valor}}; la clave GLOBAL es el valor de respaldo"""
+        if self._estadisticos is None:
+            self._estadisticos = {col: self._calcular(col) for col in self.estrategias}
+        return self._estadisticos
+
+    def reporte_nulos(self):
+        """Nulos por grupo y columna acumulados durante el ajuste"""
+        if self._nulos is None:
+            return pd.DataFrame()
+        return self._nulos.astype('int64')
+
+    # --------------------------------------------------
+    # APLICACIÓN
+    # --------------------------------------------------
+    def aplicar(self, chunk, en_sitio=False):
+        if not en_sitio:
+            chunk = chunk.copy()
+        estadisticos = self.estadisticos()
+        codigos, etiquetas = self._codificar(chunk)
+        for columna, valores in estadisticos.items():
+            if not valores or not chunk[columna].isna().any():
+                continue
+            # Tabla de relleno por grupo y un take por código: sin map fila a fila
+            tabla = pd.Series([valores.get(g, valores.get(GLOBAL)) for g in etiquetas])
+            relleno = pd.Series(tabla.to_numpy()[codigos], index=chunk.index)
+            chunk[columna] = chunk[columna].fillna(relleno)
+        return chunk
+
+    def aplicar_por_chunks(self, chunks):
+        for chunk in chunks:
+            yield self.aplicar(chunk, en_sitio=True)
+
+    # --------------------------------------------------
+    # PERSISTENCIA
+    # --------------------------------------------------
+    def guardar(self, ruta):
+        """Guarda solo los estadísticos ajustados (no los conteos)"""
+        datos = {
+            'grupo': self.grupo,
+            'estrategias': self.estrategias,
+            'error_relativo': self.error_relativo,
+            'filas': self.filas,
+            # Lista de pares para conservar el tipo de las claves de grupo
+            'estadisticos': {col: [[_nativo(g), _nativo(v)] for g, v in valores.items()]
+                             for col, valores in self.estadisticos().items()},
+        }
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False, indent=2, default=str)
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Imputador listo para `aplicar` (no admite seguir ajustando)"""
+        with open(ruta, encoding='utf-8') as f:
+            datos = json.load(f)
+        imputador = cls(datos['estrategias'], datos['grupo'], datos['error_relativo'])
+        imputador.filas = datos['filas']
+        imputador._estadisticos = {col: {g: v for g, v in pares}
+                                   for col, pares in datos['estadisticos'].items()}
+        return imputador
@@ -0,0 +1,175 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# PARSEO DE FECHAS CON CACHÉ
+# -----------------------------
+_CACHE_FECHAS = {}
+MAX_CACHE_FECHAS = 500_000
+
+
+def parsear_fechas(serie, formato=None):
+    """Convierte una serie de textos a datetime parseando solo los valores únicos.
+
+    Las fechas de los extractos se repiten mucho: se factoriza la serie, se parsean
+    los únicos y se reconstruye con `take`. Los valores inválidos quedan como NaT
+    (igual que errors='coerce').
+
+    Solo con `formato` explícito se usa la caché del módulo: sin formato, pandas lo
+    infiere de los valores de cada llamada, y un resultado cacheado con el formato
+    inferido en otra llamada podría no coincidir con pd.to_datetime sobre esta serie."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+
+    codigos, unicos = pd.factorize(serie)
+    unicos = unicos.astype(str)
+    if formato is None:
+        # Todos los únicos juntos: el formato se infiere igual que con la serie entera
+        valores_unicos = pd.DatetimeIndex(pd.to_datetime(unicos, errors='coerce'))
+    else:
+        nuevos = [u for u in unicos if (formato, u) not in _CACHE_FECHAS]
+        if nuevos:
+            parseados = pd.to_datetime(pd.Index(nuevos), format=formato, errors='coerce')
+            if len(_CACHE_FECHAS) + len(nuevos) > MAX_CACHE_FECHAS:
+                _CACHE_FECHAS.clear()
+            _CACHE_FECHAS.update(zip(((formato, u) for u in nuevos), parseados))
+        valores_unicos = pd.DatetimeIndex([_CACHE_FECHAS.get((formato, u), pd.NaT) for u in unicos])
+    # Los nulos llegan con código -1 y se convierten en NaT
+    valores = valores_unicos.take(codigos, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(valores, index=serie.index, name=serie.name)
+
+
+# -----------------------------
+# PIPELINE DE LIMPIEZA
+# -----------------------------
+class PipelineLimpieza:
+    """Pasos de limpieza componibles que se ejecutan sobre un único DataFrame de trabajo.
+
+    Los filtros (duplicados, nulos, fechas inválidas) no crean copias intermedias:
+    se fusionan en una máscara booleana que se aplica una sola vez al final. Las
+    imputaciones y columnas calculadas se asignan columna a columna."""
+
+    def __init__(self):
+        self.pasos = []
+
+    # --------------------------------------------------
+    # DEFINICIÓN DE PASOS
+    # --------------------------------------------------
+    def eliminar_duplicados(self, subset=None):
+        self.pasos.append(('eliminar_duplicados', self._duplicados, {'subset': subset}))
+        return self
+
+    def imputar(self, columna, valor=None, estadistico=None):
+        """Rellena nulos con un valor fijo o con 'mediana'/'media' de las filas vigentes"""
+        if (valor is None) == (estadistico is None):
+            raise ValueError("Indica un valor fijo o un estadístico, no ambos")
+        self.pasos.append((f'imputar_{columna}', self._imputar,
+                           {'columna': columna, 'valor': valor, 'estadistico': estadistico}))
+        return self
+
+    def descartar_nulos(self, columnas):
+        self.pasos.append(('descartar_nulos', self._descartar_nulos, {'columnas': list(columnas)}))
+        return self
+
+    def parsear_fecha(self, columna, formato=None, descartar_invalidas=True):
+        self.pasos.append((f'parsear_{columna}', self._parsear_fecha,
+                           {'columna': columna, 'formato': formato,
+                            'descartar_invalidas': descartar_invalidas}))
+        return self
+
+    def calcular(self, columna, funcion):
+        """Añade una columna derivada; `funcion` recibe el DataFrame y devuelve una serie"""
+        self.pasos.append((f'calcular_{columna}', self._calcular,
+                           {'columna': columna, 'funcion': funcion}))
+        return self
+
+    # --------------------------------------------------
+    # IMPLEMENTACIÓN DE PASOS (trabajan sobre df y la máscara)
+    # --------------------------------------------------
+    @staticmethod
+    def _duplicados(df, mascara, subset):
+        if mascara.all():
+            duplicados = df.duplicated(subset=subset).to_numpy()
+        else:
+            duplicados = np.zeros(len(df), dtype=bool)
+            duplicados[mascara] = df[mascara].duplicated(subset=subset).to_numpy()
+        return mascara & ~duplicados
+
+    @staticmethod
+    def _imputar(df, mascara, columna, valor, estadistico):
+        if estadistico is not None:
+            vigentes = df[columna].to_numpy(dtype=float)[mascara]
+            if estadistico == 'mediana':
+                valor = np.nanmedian(vigentes)
+            elif estadistico == 'media':
+                valor = np.nanmean(vigentes)
+            else:
+                raise ValueError(f"Estadístico no soportado: {estadistico}")
+        df[columna] = df[columna].fillna(valor)
+        return mascara
+
+    @staticmethod
+    def _descartar_nulos(df, mascara, columnas):
+        return mascara & df[columnas].notna().all(axis=1).to_numpy()
+
+    @staticmethod
+    def _parsear_fecha(df, mascara, columna, formato, descartar_invalidas):
+        df[columna] = parsear_fechas(df[columna], formato=formato)
+        if descartar_invalidas:
+            mascara = mascara & df[columna].notna().to_numpy()
+        return mascara
+
+    @staticmethod
+    def _calcular(df, mascara, columna, funcion):
+        df[columna] = funcion(df)
+        return mascara
+
+    # --------------------------------------------------
+    # EJECUCIÓN
+    # --------------------------------------------------
+    def ejecutar(self, df, en_sitio=False):
+        """Ejecuta el plan. Devuelve (df_limpio, reporte) con tiempos y filas descartadas
+        por paso. Con en_sitio=True se modifican las columnas del DataFrame recibido."""
+        trabajo = df if en_sitio else df.copy(deep=False)
+        mascara = np.ones(len(trabajo), dtype=bool)
+        reporte = []
+
+        for nombre, funcion, parametros in self.pasos:
+            inicio = time.perf_counter()
+            antes = int(mascara.sum())
+            mascara = funcion(trabajo, mascara, **parametros)
+            despues = int(mascara.sum())
+            reporte.append({
+                'paso': nombre,
+                'segundos': time.perf_counter() - inicio,
+                'filas_descartadas': antes - despues,
+                'filas_restantes': despues,
+            })
+
+        # Única materialización de filas al final del plan
+        inicio = time.perf_counter()
+        resultado = trabajo if mascara.all() else trabajo[mascara]
+        reporte.append({
+            'paso': 'materializar',
+            'segundos': time.perf_counter() - inicio,
+            'filas_descartadas': 0,
+            'filas_restantes': len(resultado),
+        })
+        return resultado, pd.DataFrame(reporte)
+
+
+def limpiar_datos_ventas(df, en_sitio=False):
+    """Misma limpieza que el ejercicio de m3_s1_d2 expresada como plan fusionado"""
+    plan = (
+        PipelineLimpieza()
+        .eliminar_duplicados()
+        .imputar('precio', estadistico='mediana')
+        .imputar('cantidad', valor=1)  # Asumir cantidad mínima
+        .descartar_nulos(['producto'])
+        .parsear_fecha('fecha')
+        .calcular('total', lambda d: d['precio'] * d['cantidad'])
+    )
+    return plan.ejecutar(df, en_sitio=en_sitio)
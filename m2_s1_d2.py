@@ -22,12 +22,15 @@ print(df.head())
 print("MEDIDAS DE TENDENCIA CENTRAL")
 print("=" * 40)
 
-# Variables numéricas
-for col in ['edad', 'salario', 'años_experiencia']:
+# Variables numéricas (media y mediana de todas las columnas en una llamada)
+columnas_numericas = ['edad', 'salario', 'años_experiencia']
+tendencia = df[columnas_numericas].agg(['mean', 'median'])
+for col in columnas_numericas:
     print(f"\n{col.upper()}:")
-    print(f"  Media: {df[col].mean():.2f}")
-    print(f"  Mediana: {df[col].median():.2f}")
-    print(f"  Moda: {df[col].mode().iloc[0] if len(df[col].mode()) > 0 else 'Sin moda única'}")
+    print(f"  Media: {tendencia.loc['mean', col]:.2f}")
+    print(f"  Mediana: {tendencia.loc['median', col]:.2f}")
+    moda = df[col].mode()
+    print(f"  Moda: {moda.iloc[0] if len(moda) > 0 else 'Sin moda única'}")
 
 # Variables categóricas
 print(f"\nDEPARTAMENTO MÁS COMÚN: {df['departamento'].mode().iloc[0]}")
@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from scipy import stats
+from momentos import AcumuladorMomentos
+from dashboard import renderizar_dashboard
 
 # Crear dataset de transacciones financieras
 np.random.seed(42)
@@ -81,14 +82,12 @@ print(f"Outliers detectados por ambos métodos: {len(outliers_comunes)}")
 print("\nANÁLISIS POR CATEGORÍA")
 print("=" * 25)
 
-categoria_stats = df.groupby('categoria').agg(
-    count=('monto', 'count'),
-    mean=('monto', 'mean'),
-    median=('monto', 'median'),
-    std=('monto', 'std'),
-    skew=('monto', 'skew'),
-    kurtosis=('monto', lambda x: x.kurt())
-).round(3)
+# Momentos por categoría en una sola pasada (sin lambdas por grupo)
+acumulador = AcumuladorMomentos(['monto'])
+acumulador.actualizar(df, claves=df['categoria'])
+categoria_stats = acumulador.resumen('monto')[['count', 'mean', 'std', 'skew', 'kurtosis']]
+categoria_stats.insert(2, 'median', df.groupby('categoria')['monto'].median())
+categoria_stats = categoria_stats.round(3)
 
 
 print(categoria_stats)
@@ -103,17 +102,19 @@ cliente_stats = df.groupby('tipo_cliente').agg({
 
 print(cliente_stats)
 
-# Histograma simple (si matplotlib está disponible)
+# Histograma pre-agregado (solo los conteos viajan al renderizador, backend Agg)
 try:
-    plt.figure(figsize=(10, 6))
-    plt.hist(df['monto'], bins=50, alpha=0.7, edgecolor='black')
-    plt.axvline(df['monto'].mean(), color='red', linestyle='--', label=f'Media: ${df["monto"].mean():.2f}')
-    plt.axvline(df['monto'].median(), color='green', linestyle='--', label=f'Mediana: ${df["monto"].median():.2f}')
-    plt.title('Distribución de Montos de Transacciones')
-    plt.xlabel('Monto ($)')
-    plt.ylabel('Frecuencia')
-    plt.legend()
-    plt.savefig('distribucion_montos.png', dpi=100, bbox_inches='tight')
-    print("\nGráfico guardado como 'distribucion_montos.png'")
+    estado = renderizar_dashboard([{
+        'salida': 'distribucion_montos.png',
+        'tipo': 'histograma',
+        'datos': df,
+        'x': 'monto',
+        'bins': 50,
+        'lineas': {'Media: ${valor:.2f}': 'mean', 'Mediana: ${valor:.2f}': 'median'},
+        'titulo': 'Distribución de Montos de Transacciones',
+        'etiqueta_x': 'Monto ($)',
+        'etiqueta_y': 'Frecuencia',
+    }])
+    print(f"\nGráfico 'distribucion_montos.png': {estado['distribucion_montos.png']}")
 except ImportError:
     print("\nMatplotlib no disponible - omitiendo visualización")
\ No newline at end of file
@@ -1,5 +1,8 @@
 import pandas as pd
 import numpy as np
+from correlacion_incremental import CorrelacionIncremental
+from dashboard import renderizar_dashboard
+from muestreo import intervalo_correlacion
 
 # Crear dataset de rendimiento estudiantil
 np.random.seed(42)
@@ -25,8 +28,13 @@ df['nivel_socioeconomico_num'] = df['nivel_socioeconomico'].map(nivel_map)
 print(f"Dataset creado: {len(df)} estudiantes")
 print(f"Variables numéricas: {len(df.select_dtypes(include=[np.number]).columns)}")
 
+# Estadísticas suficientes de correlación en una sola pasada; las matrices y
+# sub-matrices posteriores se derivan de ellas sin volver a recorrer los datos
+columnas_numericas = df.select_dtypes(include=[np.number]).columns
+motor_corr = CorrelacionIncremental(columnas_numericas).actualizar(df)
+
 # Correlaciones con calificaciones
-correlaciones_calificaciones = df.corr(numeric_only=True)['promedio_calificaciones'].sort_values(ascending=False)
+correlaciones_calificaciones = motor_corr.matriz()['promedio_calificaciones'].sort_values(ascending=False)
 
 print("CORRELACIONES CON PROMEDIO DE CALIFICACIONES")
 print("=" * 50)
@@ -41,7 +49,7 @@ variables_interes = ['edad', 'horas_estudio_semanal', 'promedio_calificaciones',
                     'ingresos_familiares', 'asistencia_clases', 'horas_extracurriculares',
                     'satisfaccion_vida', 'nivel_estres', 'nivel_socioeconomico_num']
 
-correlation_matrix = df[variables_interes].corr()
+correlation_matrix = motor_corr.matriz(variables_interes)
 
 print("\nMATRIZ DE CORRELACIÓN")
 print("=" * 25)
@@ -49,18 +57,14 @@ print("=" * 25)
 strong_correlations = correlation_matrix.where(abs(correlation_matrix) > 0.3)
 print(strong_correlations.round(3))
 
-# Encontrar pares con correlaciones más fuertes
-corr_unstack = correlation_matrix.unstack()
-corr_unstack = corr_unstack[corr_unstack.index.get_level_values(0) != corr_unstack.index.get_level_values(1)]
-
-top_correlations = corr_unstack.abs().sort_values(ascending=False).head(10)
+# Encontrar pares con correlaciones más fuertes (selección parcial, sin ordenar todo)
+top_correlations = motor_corr.top_pares(10, variables_interes)
 
 print("\nTOP 10 CORRELACIONES MÁS FUERTES")
 print("=" * 35)
-for (var1, var2), corr_abs in top_correlations.items():
-    if var1 < var2:  # Evitar duplicados
-        corr_real = correlation_matrix.loc[var1, var2]
-        print(f"{var1:20} ↔ {var2:20} | {corr_real:+.3f}")
+for var1, var2, corr_real in top_correlations.itertuples(index=False):
+    ic = intervalo_correlacion(corr_real, motor_corr.n)
+    print(f"{var1:20} ↔ {var2:20} | {corr_real:+.3f} [IC 95%: {ic['inferior']:+.3f}, {ic['superior']:+.3f}]")
 
 # Identificar clusters de variables relacionadas
 print("\nANÁLISIS DE GRUPOS CORRELACIONADOS")
@@ -68,32 +72,32 @@ print("=" * 40)
 
 # Variables relacionadas con rendimiento académico
 academic_vars = ['horas_estudio_semanal', 'asistencia_clases', 'promedio_calificaciones']
-academic_corr = df[academic_vars].corr()
+academic_corr = motor_corr.matriz(academic_vars)
 print("Variables académicas:")
 print(academic_corr.round(3))
 
 # Variables relacionadas con bienestar
 wellbeing_vars = ['satisfaccion_vida', 'nivel_estres', 'horas_extracurriculares']
-wellbeing_corr = df[wellbeing_vars].corr()
+wellbeing_corr = motor_corr.matriz(wellbeing_vars)
 print("\nVariables de bienestar:")
 print(wellbeing_corr.round(3))
 
 # Variables socioeconómicas
 socio_vars = ['ingresos_familiares', 'nivel_socioeconomico_num', 'promedio_calificaciones']
-socio_corr = df[socio_vars].corr()
+socio_corr = motor_corr.matriz(socio_vars)
 print("\nVariables socioeconómicas:")
 print(socio_corr.round(3))
 
 try:
-    import matplotlib.pyplot as plt
-    import seaborn as sns
-    
-    plt.figure(figsize=(10, 8))
-    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0, fmt='.2f')
-    plt.title('Matriz de Correlación - Rendimiento Estudiantil')
-    plt.tight_layout()
-    plt.savefig('matriz_correlacion_estudiantil.png', dpi=100, bbox_inches='tight')
-    print("\nMapa de calor guardado como 'matriz_correlacion_estudiantil.png'")
-    
+    estado = renderizar_dashboard([{
+        'salida': 'matriz_correlacion_estudiantil.png',
+        'tipo': 'mapa_calor',
+        'datos': correlation_matrix,
+        'matriz': True,
+        'titulo': 'Matriz de Correlación - Rendimiento Estudiantil',
+        'tamano_figura': (10, 8),
+    }])
+    print(f"\nMapa de calor 'matriz_correlacion_estudiantil.png': {estado['matriz_correlacion_estudiantil.png']}")
+
 except ImportError:
-    print("\nMatplotlib/Seaborn no disponibles - omitiendo visualización")
\ No newline at end of file
+    print("\nMatplotlib no disponible - omitiendo visualización")
\ No newline at end of file
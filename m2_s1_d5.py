@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
 
+from muestreo import MuestraEstratificada
+from perfilador import PerfilColumnas
+
 # Crear dataset comprehensivo de e-commerce
 np.random.seed(42)
 n_pedidos = 2500
@@ -34,7 +37,9 @@ print("ANÁLISIS DE CALIDAD DE DATOS")
 print("=" * 30)
 print(f"Dimensiones: {df.shape}")
 print(f"Tipos de datos:\n{df.dtypes}")
-print(f"Valores faltantes: {df.isnull().sum().sum()}")
+perfil = PerfilColumnas().actualizar(df).tabla()
+print(f"Valores faltantes: {perfil['nulos'].sum()}")
+print(f"Valores distintos (aprox.):\n{perfil['distintos_aprox']}")
 
 # Estadísticos descriptivos
 print("\nESTADÍSTICOS DESCRIPTIVOS")
@@ -102,6 +107,14 @@ print("\nVENTAS POR DÍA DE LA SEMANA")
 print("=" * 30)
 print(ventas_dia.sort_values('sum', ascending=False))
 
+# Estimación por muestreo estratificado (región × categoría × tipo de cliente): con el
+# histórico completo se obtiene lo mismo en una pasada con muestreo.muestrear
+muestra = MuestraEstratificada(['region', 'categoria', 'tipo_cliente'], k_por_estrato=10,
+                               semilla=42).actualizar(df)
+ticket = muestra.estimar_media('total_pedido')
+print(f"\nTICKET MEDIO ESTIMADO ({ticket['n']} de {len(df)} pedidos, IC 95%)")
+print(f"${ticket['estimacion']:.2f} ± {ticket['error']:.2f} (real: ${df['total_pedido'].mean():.2f})")
+
 # Calcular métricas clave para reporte
 total_ventas = df['total_pedido'].sum()
 pedidos_promedio = df['total_pedido'].mean()
@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# COMBINACIÓN DE MOMENTOS (Chan / Pébay)
+# -----------------------------
+def _combinar(a, b):
+    """Combina dos conjuntos de momentos (n, media, M2, M3, M4) elemento a elemento"""
+    na, ma, m2a, m3a, m4a = a
+    nb, mb, m2b, m3b, m4b = b
+
+    n = na + nb
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = mb - ma
+        d_n = np.where(n > 0, delta / n, 0.0)
+        d_n2 = d_n * d_n
+        termino = delta * d_n * na * nb
+
+        media = ma + d_n * nb
+        m2 = m2a + m2b + termino
+        m3 = (m3a + m3b + termino * d_n * (na - nb)
+              + 3.0 * d_n * (na * m2b - nb * m2a))
+        m4 = (m4a + m4b + termino * d_n2 * (na * na - na * nb + nb * nb)
+              + 6.0 * d_n2 * (na * na * m2b + nb * nb * m2a)
+              + 4.0 * d_n * (na * m3b - nb * m3a))
+
+    # Donde uno de los lados está vacío se conserva el otro tal cual
+    vacio_a = na == 0
+    vacio_b = nb == 0
+    media = np.where(vacio_a, mb, np.where(vacio_b, ma, media))
+    m2 = np.where(vacio_a, m2b, np.where(vacio_b, m2a, m2))
+    m3 = np.where(vacio_a, m3b, np.where(vacio_b, m3a, m3))
+    m4 = np.where(vacio_a, m4b, np.where(vacio_b, m4a, m4))
+    return n, media, m2, m3, m4
+
+
+# -----------------------------
+# ACUMULADOR ONLINE
+# -----------------------------
+class AcumuladorMomentos:
+    """Acumula count, media, M2, M3, M4, min y max por columna (y opcionalmente por grupo)
+    en una sola pasada por chunks. Dos acumuladores se pueden combinar con `combinar`."""
+
+    def __init__(self, columnas):
+        self.columnas = list(columnas)
+        self.grupos = {}  # clave de grupo -> fila en los arrays de estado
+        k = len(self.columnas)
+        self.n = np.zeros((0, k))
+        self.media = np.zeros((0, k))
+        self.m2 = np.zeros((0, k))
+        self.m3 = np.zeros((0, k))
+        self.m4 = np.zeros((0, k))
+        self.minimo = np.zeros((0, k))
+        self.maximo = np.zeros((0, k))
+
+    def _asegurar_grupos(self, claves_nuevas):
+        """Registra grupos no vistos y devuelve su posición en los arrays de estado"""
+        posiciones = np.empty(len(claves_nuevas), dtype=np.int64)
+        faltantes = 0
+        for i, clave in enumerate(claves_nuevas):
+            pos = self.grupos.get(clave)
+            if pos is None:
+                pos = len(self.grupos)
+                self.grupos[clave] = pos
+                faltantes += 1
+            posiciones[i] = pos
+
+        if faltantes:
+            k = len(self.columnas)
+            ceros = np.zeros((faltantes, k))
+            self.n = np.vstack([self.n, ceros])
+            self.media = np.vstack([self.media, ceros])
+            self.m2 = np.vstack([self.m2, ceros])
+            self.m3 = np.vstack([self.m3, ceros])
+            self.m4 = np.vstack([self.m4, ceros])
+            self.minimo = np.vstack([self.minimo, np.full((faltantes, k), np.inf)])
+            self.maximo = np.vstack([self.maximo, np.full((faltantes, k), -np.inf)])
+        return posiciones
+
+    def ampliar(self, columnas):
+        """Reordena el estado según `columnas`, que debe incluir las actuales. Las
+        columnas nuevas empiezan vacías (n=0), como si no se hubiera visto ningún valor"""
+        columnas = list(columnas)
+        faltantes = [c for c in self.columnas if c not in columnas]
+        if faltantes:
+            raise ValueError(f"No se pueden quitar columnas del acumulador: {faltantes}")
+        posicion = {c: j for j, c in enumerate(self.columnas)}
+        g = len(self.grupos)
+
+        def reordenar(estado, relleno):
+            nuevo = np.full((g, len(columnas)), relleno)
+            for j, c in enumerate(columnas):
+                if c in posicion:
+                    nuevo[:, j] = estado[:, posicion[c]]
+            return nuevo
+
+        self.n = reordenar(self.n, 0.0)
+        self.media = reordenar(self.media, 0.0)
+        self.m2 = reordenar(self.m2, 0.0)
+        self.m3 = reordenar(self.m3, 0.0)
+        self.m4 = reordenar(self.m4, 0.0)
+        self.minimo = reordenar(self.minimo, np.inf)
+        self.maximo = reordenar(self.maximo, -np.inf)
+        self.columnas = columnas
+        return self
+
+    def actualizar(self, datos, claves=None):
+        """Incorpora un chunk. `datos` es un DataFrame (o array 2D) con las columnas del
+        acumulador; `claves` es opcional y define el grupo de cada fila."""
+        if isinstance(datos, pd.DataFrame):
+            valores = datos[self.columnas].to_numpy(dtype=float)
+        else:
+            valores = np.asarray(datos, dtype=float).reshape(len(datos), -1)
+        if len(valores) == 0:
+            return self
+
+        if claves is None:
+            codigos = np.zeros(len(valores), dtype=np.int64)
+            unicos = [None]
+        else:
+            codigos, unicos = pd.factorize(np.asarray(claves), use_na_sentinel=False)
+        g = len(unicos)
+
+        # Momentos del chunk por grupo, todo con bincount (sin lambdas por grupo)
+        k = len(self.columnas)
+        lote = [np.zeros((g, k)) for _ in range(5)]
+        lote_min = np.full((g, k), np.inf)
+        lote_max = np.full((g, k), -np.inf)
+        for j in range(k):
+            x = valores[:, j]
+            validos = ~np.isnan(x)
+            c = codigos[validos]
+            x = x[validos]
+            n = np.bincount(c, minlength=g).astype(float)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                media = np.bincount(c, weights=x, minlength=g) / n
+            d = x - media[c]
+            d2 = d * d
+            lote[0][:, j] = n
+            lote[1][:, j] = np.nan_to_num(media)
+            lote[2][:, j] = np.bincount(c, weights=d2, minlength=g)
+            lote[3][:, j] = np.bincount(c, weights=d2 * d, minlength=g)
+            lote[4][:, j] = np.bincount(c, weights=d2 * d2, minlength=g)
+            np.minimum.at(lote_min[:, j], c, x)
+            np.maximum.at(lote_max[:, j], c, x)
+
+        pos = self._asegurar_grupos(unicos)
+        estado = (self.n[pos], self.media[pos], self.m2[pos], self.m3[pos], self.m4[pos])
+        (self.n[pos], self.media[pos], self.m2[pos],
+         self.m3[pos], self.m4[pos]) = _combinar(estado, lote)
+        self.minimo[pos] = np.minimum(self.minimo[pos], lote_min)
+        self.maximo[pos] = np.maximum(self.maximo[pos], lote_max)
+        return self
+
+    def combinar(self, otro):
+        """Fusiona otro acumulador (p. ej. de otro worker) sobre este"""
+        if otro.columnas != self.columnas:
+            raise ValueError("Los acumuladores tienen columnas distintas")
+        claves = list(otro.grupos)
+        if not claves:
+            return self
+        origen = np.array([otro.grupos[c] for c in claves])
+        pos = self._asegurar_grupos(claves)
+
+        estado = (self.n[pos], self.media[pos], self.m2[pos], self.m3[pos], self.m4[pos])
+        otro_estado = (otro.n[origen], otro.media[origen], otro.m2[origen],
+                       otro.m3[origen], otro.m4[origen])
+        (self.n[pos], self.media[pos], self.m2[pos],
+         self.m3[pos], self.m4[pos]) = _combinar(estado, otro_estado)
+        self.minimo[pos] = np.minimum(self.minimo[pos], otro.minimo[origen])
+        self.maximo[pos] = np.maximum(self.maximo[pos], otro.maximo[origen])
+        return self
+
+    def resumen(self, columna=None):
+        """Estadísticos finales. Con `columna` devuelve una tabla por grupo para esa
+        columna; sin ella, columnas MultiIndex (columna, estadístico) como `agg`."""
+        n, m2, m3, m4 = self.n, self.m2, self.m3, self.m4
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = np.where(n > 1, m2 / (n - 1), np.nan)
+            # Mismos estimadores corregidos que pandas (skew G1, kurt G2 en exceso)
+            g1 = np.sqrt(n) * m3 / m2 ** 1.5
+            skew = np.where((n > 2) & (m2 > 0), g1 * np.sqrt(n * (n - 1)) / (n - 2), np.nan)
+            g2 = n * m4 / (m2 * m2) - 3.0
+            kurt = np.where((n > 3) & (m2 > 0),
+                            ((n + 1) * g2 + 6.0) * (n - 1) / ((n - 2) * (n - 3)), np.nan)
+        vacio = n == 0
+        estadisticos = {
+            'count': n.astype(np.int64),
+            'mean': np.where(vacio, np.nan, self.media),
+            'std': np.sqrt(var),
+            'var': var,
+            'min': np.where(vacio, np.nan, self.minimo),
+            'max': np.where(vacio, np.nan, self.maximo),
+            'skew': skew,
+            'kurtosis': kurt,
+        }
+
+        claves = list(self.grupos)
+        if claves == [None]:
+            indice = pd.Index(['total'])
+        else:
+            indice = pd.Index(claves)
+        orden = indice.argsort() if claves != [None] else np.arange(len(indice))
+
+        if columna is not None:
+            j = self.columnas.index(columna)
+            tabla = pd.DataFrame({e: v[:, j] for e, v in estadisticos.items()}, index=indice)
+            return tabla.iloc[orden]
+
+        partes = {(col, e): v[:, j]
+                  for j, col in enumerate(self.columnas)
+                  for e, v in estadisticos.items()}
+        tabla = pd.DataFrame(partes, index=indice)
+        return tabla.iloc[orden]
@@ -0,0 +1,176 @@
+import glob
+import logging
+import os
+
+try:
+    import duckdb
+except ImportError:  # dependencia opcional
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# FACHADA DE CONSULTAS SQL
+# -----------------------------
+class MotorConsultas:
+    """Registra archivos Parquet y bases SQLite como tablas y ejecuta SQL sobre ellos
+    con DuckDB (ejecución columnar y multihilo). Los Parquet se exponen como vistas,
+    así proyecciones, filtros y agregaciones se empujan al escaneo y nunca se carga
+    el archivo completo en pandas antes de consultar."""
+
+    def __init__(self, hilos=None, memoria_maxima=None):
+        if duckdb is None:
+            raise ImportError("MotorConsultas requiere duckdb (pip install duckdb)")
+        self.con = duckdb.connect(database=':memory:')
+        if hilos:
+            self.con.execute(f"SET threads = {int(hilos)}")
+        if memoria_maxima:
+            self.con.execute(f"SET memory_limit = '{memoria_maxima}'")
+        self.tablas = {}
+        self._sqlite_cargado = None
+
+    # --------------------------------------------------
+    # REGISTRO DE FUENTES
+    # --------------------------------------------------
+    def registrar_parquet(self, nombre, ruta):
+        """Registra un archivo o patrón glob Parquet como vista `nombre`"""
+        if not glob.glob(ruta):
+            raise FileNotFoundError(f"No existe ningún Parquet en {ruta}")
+        ruta_sql = ruta.replace("'", "''")
+        self.con.execute(
+            f'CREATE OR REPLACE VIEW "{nombre}" AS SELECT * FROM read_parquet(\'{ruta_sql}\')'
+        )
+        self.tablas[nombre] = ('parquet', ruta)
+        return self
+
+    def registrar_sqlite(self, alias, ruta):
+        """Adjunta una base SQLite en solo lectura; sus tablas quedan como alias.tabla"""
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(f"No existe la base de datos {ruta}")
+        if self._cargar_extension_sqlite():
+            ruta_sql = ruta.replace("'", "''")
+            self.con.execute(f"ATTACH '{ruta_sql}' AS \"{alias}\" (TYPE sqlite, READ_ONLY)")
+        else:
+            logger.warning("Extensión sqlite de DuckDB no disponible: copiando %s en memoria", ruta)
+            self._copiar_sqlite(alias, ruta)
+        self.tablas[alias] = ('sqlite', ruta)
+        return self
+
+    def _cargar_extension_sqlite(self):
+        if self._sqlite_cargado is None:
+            try:
+                self.con.execute("LOAD sqlite")
+                self._sqlite_cargado = True
+            except duckdb.Error:
+                try:
+                    # Descarga la extensión la primera vez (requiere red)
+                    self.con.execute("INSTALL sqlite")
+                    self.con.execute("LOAD sqlite")
+                    self._sqlite_cargado = True
+                except duckdb.Error:
+                    self._sqlite_cargado = False
+        return self._sqlite_cargado
+
+    def _copiar_sqlite(self, alias, ruta):
+        """Alternativa sin extensión: lee cada tabla por lotes y la copia a un esquema.
+        leer_tabla arrastra el esquema entre lotes y unifica tipos (una columna NULL en
+        el primer lote y con texto después, o entera y luego texto)"""
+        import sqlite3
+
+        from etl_comun.lectura import leer_tabla
+
+        self.con.execute(f'CREATE SCHEMA IF NOT EXISTS "{alias}"')
+        with sqlite3.connect(ruta) as origen:
+            tablas = [fila[0] for fila in origen.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            )]
+            for tabla in tablas:
+                datos = leer_tabla(origen, f'SELECT * FROM "{tabla}"')
+                if datos.num_rows == 0:
+                    # Tabla vacía: se conserva al menos la estructura
+                    definicion = ", ".join(f'"{c}" VARCHAR' for c in datos.column_names)
+                    self.con.execute(f'CREATE OR REPLACE TABLE "{alias}"."{tabla}" ({definicion})')
+                else:
+                    self.con.register('_copia_sqlite', datos)
+                    self.con.execute(
+                        f'CREATE OR REPLACE TABLE "{alias}"."{tabla}" AS SELECT * FROM _copia_sqlite'
+                    )
+                    self.con.unregister('_copia_sqlite')
+
+    def usar(self, alias):
+        """Fija la base adjunta por defecto para consultas sin calificar (p. ej. ejercicios.sql)"""
+        self.con.execute(f'USE "{alias}"')
+        return self
+
+    # --------------------------------------------------
+    # EJECUCIÓN
+    # --------------------------------------------------
+    def consultar(self, sql, parametros=None, formato='pandas'):
+        """Ejecuta una consulta y devuelve un DataFrame ('pandas') o una tabla ('arrow')"""
+        resultado = self.con.execute(sql, parametros or [])
+        if formato == 'arrow':
+            return resultado.fetch_arrow_table()
+        if formato == 'pandas':
+            return resultado.df()
+        raise ValueError(f"Formato no soportado: {formato}")
+
+    def consultar_por_lotes(self, sql, parametros=None, filas_por_lote=100_000):
+        """Itera el resultado como lotes Arrow sin materializarlo entero"""
+        lector = self.con.execute(sql, parametros or []).fetch_record_batch(filas_por_lote)
+        yield from lector
+
+    def explicar(self, sql):
+        """Plan físico de la consulta (útil para comprobar el pushdown)"""
+        filas = self.con.execute(f"EXPLAIN {sql}").fetchall()
+        return "\n".join(fila[1] for fila in filas)
+
+    def cerrar(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+# -----------------------------
+# ARTEFACTOS DEL PROYECTO
+# -----------------------------
+PARQUET_PROYECTO = {
+    'ventas_analiticas': 'carga_analiticos/data/ventas.parquet',
+    'ventas_incremental': 'practica_carga_datos/ventas_incremental.parquet',
+    'ventas_inc_test': 'practica_carga_datos/ventas_inc_test.parquet',
+}
+
+SQLITE_PROYECTO = {
+    'tienda': 'tienda_ejemplo.db',
+    'ventas_db': 'ventas.db',
+    'etl': 'etl_pipeline_robusto/etl_database.db',
+}
+
+
+def motor_proyecto(raiz='.', **kwargs):
+    """Motor con todos los artefactos Parquet y SQLite del repositorio registrados"""
+    motor = MotorConsultas(**kwargs)
+    for nombre, ruta in PARQUET_PROYECTO.items():
+        ruta = os.path.join(raiz, ruta)
+        if glob.glob(ruta):
+            motor.registrar_parquet(nombre, ruta)
+    for alias, ruta in SQLITE_PROYECTO.items():
+        ruta = os.path.join(raiz, ruta)
+        if os.path.exists(ruta):
+            motor.registrar_sqlite(alias, ruta)
+    return motor
+
+
+if __name__ == "__main__":
+    with motor_proyecto() as motor:
+        print("Tablas registradas:", ", ".join(motor.tablas))
+        print(motor.consultar('SELECT COUNT(*) AS pedidos, SUM(precio) AS total FROM ventas_analiticas'))
+        print(motor.consultar('''
+            SELECT nombre, precio, categoria FROM tienda.productos
+            WHERE precio > 100
+            ORDER BY precio DESC
+        '''))
@@ -0,0 +1,309 @@
+import argparse
+import math
+import sqlite3
+import time
+from collections import Counter
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# LECTURA POR LOTES
+# -----------------------------
+def leer_por_lotes(origen, columnas=None, filas_por_lote=500_000, tabla=None):
+    """Lotes (DataFrame) de un DataFrame, Parquet, CSV o tabla SQLite, sin cargarlo entero"""
+    if isinstance(origen, pd.DataFrame):
+        datos = origen if columnas is None else origen[columnas]
+        for inicio in range(0, len(datos), filas_por_lote):
+            yield datos.iloc[inicio:inicio + filas_por_lote]
+    elif str(origen).endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for lote in pq.ParquetFile(origen).iter_batches(batch_size=filas_por_lote, columns=columnas):
+            yield lote.to_pandas()
+    elif str(origen).endswith('.csv'):
+        yield from pd.read_csv(origen, usecols=columnas, chunksize=filas_por_lote)
+    else:
+        from etl_comun.lectura import leer_lotes
+        if tabla is None:
+            raise ValueError("Para leer de SQLite hay que indicar la tabla")
+        lista = '*' if columnas is None else ', '.join(f'"{c}"' for c in columnas)
+        conn = sqlite3.connect(f"file:{origen}?mode=ro", uri=True)
+        try:
+            for lote in leer_lotes(conn, f'SELECT {lista} FROM "{tabla}"', filas_por_lote=filas_por_lote):
+                yield lote.to_pandas()
+        finally:
+            conn.close()
+
+
+# -----------------------------
+# INTERVALOS DE CONFIANZA
+# -----------------------------
+def _intervalo(estimacion, varianza, confianza):
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+    error = z * math.sqrt(max(varianza, 0.0))
+    return {'estimacion': estimacion, 'error': error,
+            'inferior': estimacion - error, 'superior': estimacion + error}
+
+
+def intervalo_correlacion(r, n, confianza=0.95):
+    """Intervalo de Fisher (atanh) para una correlación de Pearson sobre n filas"""
+    if n <= 3 or abs(r) >= 1:
+        return {'estimacion': r, 'inferior': r, 'superior': r}
+    z = NormalDist().inv_cdf(0.5 + confianza / 2) / math.sqrt(n - 3)
+    return {'estimacion': r, 'inferior': math.tanh(math.atanh(r) - z),
+            'superior': math.tanh(math.atanh(r) + z)}
+
+
+# -----------------------------
+# MUESTRA UNIFORME (RESERVORIO)
+# -----------------------------
+class MuestraUniforme:
+    """Reservorio de k filas en una pasada, vectorizado: cada fila recibe una clave
+    U(0,1) y se conservan las k claves más pequeñas (equivale a un muestreo aleatorio
+    simple sin reemplazo). Una vez lleno, solo entran filas con clave menor que la
+    k-ésima actual, así cada lote cuesta poco más que generar sus claves. Dos muestras
+    de trozos distintos de los datos se combinan quedándose con las k menores."""
+
+    def __init__(self, k, semilla=42):
+        self.k = k
+        self.rng = np.random.default_rng(semilla)
+        self.n_poblacion = 0
+        self._muestra = None
+
+    def _umbral(self):
+        if self._muestra is None or len(self._muestra) < self.k:
+            return np.inf
+        return self._muestra['_clave'].max()
+
+    def _recortar(self, candidatos):
+        if len(candidatos) > self.k:
+            candidatos = candidatos.nsmallest(self.k, '_clave')
+        return candidatos
+
+    def actualizar(self, df):
+        claves = self.rng.random(len(df))
+        self.n_poblacion += len(df)
+        entran = claves < self._umbral()
+        if entran.any():
+            nuevos = df[entran].assign(_clave=claves[entran])
+            partes = [p for p in (self._muestra, nuevos) if p is not None]
+            self._muestra = self._recortar(pd.concat(partes, ignore_index=True))
+        return self
+
+    def combinar(self, otra):
+        self.n_poblacion += otra.n_poblacion
+        partes = [p for p in (self._muestra, otra._muestra) if p is not None]
+        if partes:
+            self._muestra = self._recortar(pd.concat(partes, ignore_index=True))
+        return self
+
+    def muestra(self):
+        if self._muestra is None:
+            return pd.DataFrame()
+        return self._muestra.sort_values('_clave').drop(columns='_clave').reset_index(drop=True)
+
+    # -----------------------------
+    # ESTIMACIONES
+    # -----------------------------
+    def estimar_media(self, columna, confianza=0.95):
+        valores = self._muestra[columna].dropna().to_numpy(dtype=float)
+        n = len(valores)
+        fpc = 1 - len(self._muestra) / self.n_poblacion  # corrección por población finita
+        varianza = valores.var(ddof=1) / n * fpc if n > 1 else 0.0
+        return dict(_intervalo(valores.mean(), varianza, confianza), n=n)
+
+    def estimar_total(self, columna, confianza=0.95):
+        media = self.estimar_media(columna, confianza)
+        return {clave: valor * self.n_poblacion if clave != 'n' else valor
+                for clave, valor in media.items()}
+
+    def estimar_proporciones(self, columna, confianza=0.95):
+        valores = self._muestra[columna].dropna()
+        n = len(valores)
+        fpc = 1 - len(self._muestra) / self.n_poblacion
+        filas = {valor: _intervalo(p, p * (1 - p) / max(n - 1, 1) * fpc, confianza)
+                 for valor, p in valores.value_counts(normalize=True).items()}
+        return pd.DataFrame.from_dict(filas, orient='index')
+
+    def estimar_correlaciones(self, columnas):
+        """Matriz de Pearson de la muestra y n para intervalo_correlacion"""
+        datos = self._muestra[list(columnas)].dropna()
+        return datos.corr(), len(datos)
+
+
+# -----------------------------
+# MUESTRA ESTRATIFICADA
+# -----------------------------
+class MuestraEstratificada:
+    """Hasta k_por_estrato filas por cada combinación de `estratos`, con el mismo
+    esquema de claves aleatorias que MuestraUniforme pero con un umbral por estrato.
+    Cuenta además las filas de la población en cada estrato (N_h), que dan los pesos
+    de las estimaciones: los estratos raros quedan bien representados en la muestra
+    sin sesgar los resultados."""
+
+    def __init__(self, estratos, k_por_estrato, semilla=42):
+        self.estratos = [estratos] if isinstance(estratos, str) else list(estratos)
+        self.k = k_por_estrato
+        self.rng = np.random.default_rng(semilla)
+        self.poblacion = Counter()
+        self._muestra = None
+
+    @property
+    def n_poblacion(self):
+        return sum(self.poblacion.values())
+
+    def _etiqueta(self, valor):
+        if len(self.estratos) == 1:
+            return str(valor)
+        return ' | '.join(str(v) for v in valor)
+
+    def _umbrales(self):
+        if self._muestra is None:
+            return {}
+        maximos = self._muestra.groupby('_estrato')['_clave'].agg(['max', 'size'])
+        return maximos.loc[maximos['size'] >= self.k, 'max'].to_dict()
+
+    def _recortar(self, candidatos):
+        candidatos = candidatos.sort_values(['_estrato', '_clave'])
+        return candidatos[candidatos.groupby('_estrato').cumcount() < self.k]
+
+    def actualizar(self, df):
+        claves = self.rng.random(len(df))
+        # Código de grupo por fila (sin construir una etiqueta de texto por fila); las
+        # etiquetas solo se crean para los grupos del lote y las filas que entran
+        grupos = df.groupby(self.estratos, observed=True, sort=False, dropna=False)
+        codigos = grupos.ngroup().to_numpy()
+        tamanos = grupos.size()
+        etiquetas = np.array([self._etiqueta(v) for v in tamanos.index], dtype=object)
+        self.poblacion.update(dict(zip(etiquetas, tamanos.to_numpy().tolist())))
+        umbrales = self._umbrales()
+        umbral_grupo = np.array([umbrales.get(e, np.inf) for e in etiquetas])
+        entran = claves < umbral_grupo[codigos]
+        if entran.any():
+            nuevos = df[entran].assign(_clave=claves[entran], _estrato=etiquetas[codigos[entran]])
+            partes = [p for p in (self._muestra, nuevos) if p is not None]
+            self._muestra = self._recortar(pd.concat(partes, ignore_index=True))
+        return self
+
+    def combinar(self, otra):
+        self.poblacion.update(otra.poblacion)
+        partes = [p for p in (self._muestra, otra._muestra) if p is not None]
+        if partes:
+            self._muestra = self._recortar(pd.concat(partes, ignore_index=True))
+        return self
+
+    def muestra(self):
+        """Filas muestreadas con su estrato y su peso (N_h / n_h)"""
+        if self._muestra is None:
+            return pd.DataFrame()
+        tamanos = self._muestra['_estrato'].map(self._muestra['_estrato'].value_counts())
+        pesos = self._muestra['_estrato'].map(self.poblacion) / tamanos
+        return (self._muestra.assign(_peso=pesos).drop(columns='_clave')
+                .reset_index(drop=True))
+
+    def resumen_estratos(self):
+        conteo = self._muestra['_estrato'].value_counts()
+        return pd.DataFrame({'poblacion': pd.Series(self.poblacion), 'muestra': conteo}).fillna(0)
+
+    # -----------------------------
+    # ESTIMACIONES (estimadores estratificados)
+    # -----------------------------
+    def _por_estrato(self, columna):
+        grupos = self._muestra.dropna(subset=[columna]).groupby('_estrato')[columna]
+        tabla = grupos.agg(['mean', 'var', 'size'])
+        tabla['N'] = tabla.index.map(self.poblacion)
+        tabla['W'] = tabla['N'] / self.n_poblacion
+        return tabla.fillna({'var': 0.0})  # estratos con una sola fila: sin varianza
+
+    def estimar_media(self, columna, confianza=0.95):
+        """Media = Σ W_h·ȳ_h;  Var = Σ W_h²·(1 - n_h/N_h)·s_h²/n_h"""
+        t = self._por_estrato(columna)
+        # Los estratos sin valores observados no aportan: se reescalan los pesos
+        peso = t['W'].sum()
+        media = (t['W'] * t['mean']).sum() / peso
+        varianza = (t['W'] ** 2 * (1 - t['size'] / t['N']) * t['var'] / t['size']).sum() / peso ** 2
+        return dict(_intervalo(media, varianza, confianza), n=int(t['size'].sum()))
+
+    def estimar_total(self, columna, confianza=0.95):
+        media = self.estimar_media(columna, confianza)
+        return {clave: valor * self.n_poblacion if clave != 'n' else valor
+                for clave, valor in media.items()}
+
+    def estimar_proporciones(self, columna, confianza=0.95):
+        datos = self._muestra.dropna(subset=[columna])
+        p = pd.crosstab(datos['_estrato'], datos[columna], normalize='index')
+        n_h = datos['_estrato'].value_counts().reindex(p.index)
+        N_h = p.index.map(self.poblacion).to_numpy(dtype=float)
+        W = N_h / N_h.sum()
+        f = (1 - n_h.to_numpy() / N_h) / np.maximum(n_h.to_numpy() - 1, 1)
+        filas = {}
+        for valor in p.columns:
+            p_h = p[valor].to_numpy()
+            filas[valor] = _intervalo(float(W @ p_h), float((W ** 2 * f * p_h * (1 - p_h)).sum()),
+                                      confianza)
+        return pd.DataFrame.from_dict(filas, orient='index').sort_values('estimacion', ascending=False)
+
+
+def muestrear(origen, k=10_000, estratos=None, k_por_estrato=1_000, semilla=42,
+              columnas=None, filas_por_lote=500_000, tabla=None):
+    """Una sola pasada sobre `origen` alimentando la muestra uniforme y, si se indican
+    estratos, la estratificada. Cada una recibe su propia semilla derivada de `semilla`,
+    así el resultado es reproducible e independiente entre ambas."""
+    semillas = np.random.SeedSequence(semilla).spawn(2)
+    uniforme = MuestraUniforme(k, semillas[0])
+    estratificada = MuestraEstratificada(estratos, k_por_estrato, semillas[1]) if estratos else None
+    for lote in leer_por_lotes(origen, columnas, filas_por_lote, tabla):
+        uniforme.actualizar(lote)
+        if estratificada is not None:
+            estratificada.actualizar(lote)
+    return uniforme, estratificada
+
+
+# -----------------------------
+# EJECUCIÓN
+# -----------------------------
+def _fmt(intervalo):
+    return f"{intervalo['estimacion']:,.3f} ± {intervalo['error']:,.3f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='EDA por muestreo con intervalos de confianza')
+    parser.add_argument('origen', help='Archivo .parquet, .csv o base SQLite')
+    parser.add_argument('--tabla', help='Tabla a leer si el origen es SQLite')
+    parser.add_argument('--k', type=int, default=10_000, help='Tamaño de la muestra uniforme')
+    parser.add_argument('--estratos', nargs='+', help='Columnas de estratificación')
+    parser.add_argument('--k-estrato', type=int, default=1_000, help='Filas por estrato')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--confianza', type=float, default=0.95)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    uniforme, estratificada = muestrear(args.origen, args.k, args.estratos, args.k_estrato,
+                                        args.semilla, tabla=args.tabla)
+    print(f"Población: {uniforme.n_poblacion:,} filas; muestra uniforme: {len(uniforme.muestra()):,} "
+          f"({time.perf_counter() - inicio:.2f}s)")
+    print(f"Intervalos al {args.confianza:.0%}\n")
+
+    muestra = uniforme.muestra()
+    numericas = muestra.select_dtypes(include=[np.number]).columns
+    for columna in numericas:
+        linea = f"{columna:25} media {_fmt(uniforme.estimar_media(columna, args.confianza))}"
+        if estratificada is not None:
+            linea += f"   estratificada {_fmt(estratificada.estimar_media(columna, args.confianza))}"
+        print(linea)
+
+    for columna in args.estratos or []:
+        print(f"\nDistribución de {columna}:")
+        print(uniforme.estimar_proporciones(columna, args.confianza).round(4).to_string())
+
+    if len(numericas) > 1:
+        matriz, n = uniforme.estimar_correlaciones(numericas)
+        ancho = max(intervalo_correlacion(0.0, n, args.confianza)['superior'], 0)
+        print(f"\nCorrelaciones (n={n:,}; IC de Fisher ±{ancho:.3f} para r≈0):")
+        print(matriz.round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
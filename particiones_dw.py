@@ -0,0 +1,394 @@
+import argparse
+import io
+import re
+import sqlite3
+import time
+from datetime import date
+
+import pandas as pd
+
+
+# -----------------------------
+# ESQUEMA DE fact_orders (ecommerce_dw.sql)
+# -----------------------------
+TABLA = 'fact_orders'
+COLUMNAS = [
+    ('order_id', 'BIGINT NOT NULL'),
+    ('customer_id', 'INT REFERENCES dim_customer(customer_id)'),
+    ('product_id', 'INT REFERENCES dim_product(product_id)'),
+    ('time_id', 'INT NOT NULL REFERENCES dim_time(date_key)'),
+    ('location_id', 'INT REFERENCES dim_location(location_id)'),
+    ('quantity_ordered', 'INT'),
+    ('unit_price', 'DECIMAL(10,2)'),
+    ('discount_amount', 'DECIMAL(10,2)'),
+    ('tax_amount', 'DECIMAL(10,2)'),
+    ('shipping_cost', 'DECIMAL(10,2)'),
+    ('total_amount', 'DECIMAL(10,2)'),
+    ('profit_margin', 'DECIMAL(10,2)'),
+    ('is_first_purchase', 'BOOLEAN'),
+    ('order_channel', 'TEXT'),
+    ('payment_method', 'TEXT'),
+]
+NOMBRES_COLUMNAS = [c for c, _ in COLUMNAS]
+COLUMNAS_ENTERAS = [c for c, tipo in COLUMNAS if tipo.split()[0] in ('INT', 'BIGINT')]
+# Mismos índices que ecommerce_dw.sql, ahora locales a cada partición
+INDICES = {'time': 'time_id', 'product': 'product_id', 'customer': 'customer_id'}
+
+
+# -----------------------------
+# MESES Y RANGOS
+# -----------------------------
+# time_id es la date_key AAAAMMDD de dim_time; una partición es un mes AAAAMM
+def mes_de(valor):
+    """AAAAMM de una date_key, una fecha o un texto 'AAAA-MM'"""
+    if isinstance(valor, str):
+        anio, mes = valor.split('-')[:2]
+        return int(anio) * 100 + int(mes)
+    if isinstance(valor, date):
+        return valor.year * 100 + valor.month
+    return int(valor) // 100
+
+
+def siguiente_mes(mes, n=1):
+    anio, m = divmod(mes, 100)
+    total = anio * 12 + (m - 1) + n
+    return (total // 12) * 100 + total % 12 + 1
+
+
+def meses_entre(desde, hasta):
+    """Meses AAAAMM de `desde` a `hasta`, ambos incluidos"""
+    meses = []
+    while desde <= hasta:
+        meses.append(desde)
+        desde = siguiente_mes(desde)
+    return meses
+
+
+def rango_mes(mes):
+    """Límites [desde, hasta) de time_id para el mes"""
+    return mes * 100 + 1, siguiente_mes(mes) * 100 + 1
+
+
+# -----------------------------
+# GESTOR COMÚN
+# -----------------------------
+class _GestorParticiones:
+    """Particiones mensuales de rango sobre time_id.
+
+    Las cargas de un mes nuevo (o vacío) van a una tabla de staging sin índices;
+    se indexa al final, de una vez, y se engancha como partición. Así la carga no
+    mantiene tres índices grandes fila a fila y la retención es un DROP, no un DELETE."""
+
+    def __init__(self, conn, tabla=TABLA):
+        self.conn = conn
+        self.tabla = tabla
+
+    def nombre_particion(self, mes):
+        return f"{self.tabla}_p{mes}"
+
+    def _mes_de_nombre(self, nombre):
+        m = re.fullmatch(rf"{re.escape(self.tabla)}_p(\d{{6}})", nombre)
+        return int(m.group(1)) if m else None
+
+    def asegurar_particiones(self, meses_adelante=3, hoy=None):
+        """Crea las particiones que falten hasta `meses_adelante` después del mes actual.
+
+        Empieza tras la última existente (o en el mes actual si no hay ninguna), así
+        que no rellena huecos que la retención haya abierto a propósito."""
+        actual = mes_de(hoy or date.today())
+        existentes = self.particiones()
+        desde = siguiente_mes(existentes[-1]) if existentes else actual
+        nuevas = meses_entre(desde, siguiente_mes(actual, meses_adelante))
+        for mes in nuevas:
+            self.crear_particion(mes)
+        return nuevas
+
+    def cargar(self, df, reemplazar=False):
+        """Reparte `df` por mes de time_id y carga cada mes. Devuelve {mes: filas}"""
+        cargadas = {}
+        for mes, parte in df.groupby(df['time_id'] // 100, sort=True):
+            self.cargar_mes(parte, int(mes), reemplazar)
+            cargadas[int(mes)] = len(parte)
+        return cargadas
+
+    def cargar_mes(self, df, mes, reemplazar=False):
+        """Meses nuevos, vacíos o a reemplazar: staging + índices + enganche.
+        Meses que ya tienen datos: se anexan directamente a su partición."""
+        desde, hasta = rango_mes(mes)
+        fuera = (df['time_id'] < desde) | (df['time_id'] >= hasta)
+        if fuera.any():
+            raise ValueError(f"{int(fuera.sum())} filas no pertenecen al mes {mes}")
+        df = df[NOMBRES_COLUMNAS]
+        existe = mes in self.particiones()
+        if existe and not reemplazar and not self._vacia(mes):
+            self._insertar(self.nombre_particion(mes), df)
+            self.conn.commit()
+            return 'anexado'
+        self._cargar_por_intercambio(df, mes, existe)
+        return 'enganchado'
+
+    def aplicar_retencion(self, meses_retenidos, hoy=None):
+        """Elimina las particiones anteriores a los últimos `meses_retenidos` meses"""
+        limite = siguiente_mes(mes_de(hoy or date.today()), 1 - meses_retenidos)
+        viejas = [m for m in self.particiones() if m < limite]
+        for mes in viejas:
+            self.eliminar_particion(mes)
+        return viejas
+
+    def _vacia(self, mes):
+        cur = self.conn.cursor()
+        cur.execute(f'SELECT 1 FROM {self.nombre_particion(mes)} LIMIT 1')
+        return cur.fetchone() is None
+
+
+# -----------------------------
+# POSTGRES (particionado declarativo)
+# -----------------------------
+class ParticionesPostgres(_GestorParticiones):
+    """PARTITION BY RANGE (time_id) nativo. `conn` es una conexión psycopg2
+    (por ejemplo get_engine().raw_connection() de cargar_datos/db.py)"""
+
+    def sentencias_tabla(self):
+        # La clave primaria de una tabla particionada debe incluir la clave de partición
+        columnas = ",\n    ".join(f"{c} {t}" for c, t in COLUMNAS)
+        sentencias = [
+            f"CREATE TABLE IF NOT EXISTS {self.tabla} (\n    {columnas},\n"
+            f"    PRIMARY KEY (order_id, time_id)\n) PARTITION BY RANGE (time_id)"
+        ]
+        for sufijo, col in INDICES.items():
+            sentencias.append(f"CREATE INDEX IF NOT EXISTS idx_{self.tabla}_{sufijo} "
+                              f"ON {self.tabla} ({col})")
+        return sentencias
+
+    def sentencias_particion(self, mes):
+        desde, hasta = rango_mes(mes)
+        return [f"CREATE TABLE IF NOT EXISTS {self.nombre_particion(mes)} PARTITION OF {self.tabla} "
+                f"FOR VALUES FROM ({desde}) TO ({hasta})"]
+
+    def sentencias_eliminar(self, mes):
+        particion = self.nombre_particion(mes)
+        return [f"ALTER TABLE {self.tabla} DETACH PARTITION {particion}",
+                f"DROP TABLE {particion}"]
+
+    def _ejecutar(self, sentencias):
+        cur = self.conn.cursor()
+        for sql in sentencias:
+            cur.execute(sql)
+        self.conn.commit()
+
+    def crear_tabla(self):
+        self._ejecutar(self.sentencias_tabla())
+
+    def crear_particion(self, mes):
+        self._ejecutar(self.sentencias_particion(mes))
+
+    def eliminar_particion(self, mes):
+        self._ejecutar(self.sentencias_eliminar(mes))
+
+    def particiones(self):
+        cur = self.conn.cursor()
+        cur.execute(
+            "SELECT hija.relname FROM pg_inherits i "
+            "JOIN pg_class hija ON hija.oid = i.inhrelid "
+            "JOIN pg_class padre ON padre.oid = i.inhparent "
+            "WHERE padre.relname = %s", (self.tabla,))
+        return sorted(m for (nombre,) in cur.fetchall() if (m := self._mes_de_nombre(nombre)))
+
+    def _insertar(self, destino, df):
+        buffer = io.StringIO(csv_para_copy(df))
+        self.conn.cursor().copy_expert(
+            f"COPY {destino} ({', '.join(NOMBRES_COLUMNAS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+    def _cargar_por_intercambio(self, df, mes, existe):
+        particion = self.nombre_particion(mes)
+        staging = f"{particion}_carga"
+        desde, hasta = rango_mes(mes)
+        cur = self.conn.cursor()
+        cur.execute(f"DROP TABLE IF EXISTS {staging}")
+        cur.execute(f"CREATE TABLE {staging} (LIKE {self.tabla} INCLUDING DEFAULTS)")
+        self._insertar(staging, df)
+        # Índices equivalentes a los del padre: ATTACH los adopta en lugar de reconstruirlos
+        cur.execute(f"ALTER TABLE {staging} ADD PRIMARY KEY (order_id, time_id)")
+        for col in INDICES.values():
+            cur.execute(f"CREATE INDEX ON {staging} ({col})")
+        # Con el CHECK ya validado, ATTACH no necesita recorrer la tabla
+        cur.execute(f"ALTER TABLE {staging} ADD CONSTRAINT {staging}_rango "
+                    f"CHECK (time_id >= {desde} AND time_id < {hasta})")
+        if existe:
+            for sql in self.sentencias_eliminar(mes):
+                cur.execute(sql)
+        cur.execute(f"ALTER TABLE {staging} RENAME TO {particion}")
+        cur.execute(f"ALTER TABLE {self.tabla} ATTACH PARTITION {particion} "
+                    f"FOR VALUES FROM ({desde}) TO ({hasta})")
+        self.conn.commit()
+
+
+def csv_para_copy(df):
+    """CSV para COPY ... FROM STDIN WITH (FORMAT csv), columnas en el orden de COLUMNAS.
+    Las columnas INT con nulos llegan como float64 y to_csv escribiría '3.0', que COPY
+    rechaza en una columna INT: se pasan a Int64 (un valor no entero hace fallar el
+    cast aquí, antes de llegar a Postgres). Los nulos quedan como campo vacío = NULL"""
+    enteras = {c: 'Int64' for c in COLUMNAS_ENTERAS if not pd.api.types.is_integer_dtype(df[c])}
+    return df[NOMBRES_COLUMNAS].astype(enteras).to_csv(index=False, header=False)
+
+
+def _comprobar_csv_copy():
+    fila = {c: None for c in NOMBRES_COLUMNAS}
+    df = pd.DataFrame([dict(fila, order_id=1, time_id=20240105, location_id=3.0,
+                            unit_price=9.5, is_first_purchase=True),
+                       dict(fila, order_id=2, time_id=20240106, location_id=None,
+                            unit_price=10.25, is_first_purchase=False)])
+    df['location_id'] = df['location_id'].astype(float)
+    lineas = csv_para_copy(df).splitlines()
+    assert lineas[0].split(',')[:5] == ['1', '', '', '20240105', '3'], lineas[0]
+    assert lineas[1].split(',')[:5] == ['2', '', '', '20240106', ''], lineas[1]
+    assert lineas[0].split(',')[6] == '9.5' and lineas[0].split(',')[12] == 'True', lineas[0]
+    try:
+        csv_para_copy(df.assign(location_id=[3.5, None]))
+    except (TypeError, ValueError):
+        pass
+    else:
+        raise AssertionError("Un location_id no entero debería rechazarse")
+    print("CSV para COPY: enteros sin decimales y nulos vacíos")
+
+
+# -----------------------------
+# SQLITE (emulación: una tabla por mes + vista UNION ALL)
+# -----------------------------
+class ParticionesSQLite(_GestorParticiones):
+    """Cada mes es una tabla con CHECK sobre time_id y sus propios índices; `fact_orders`
+    es una vista UNION ALL que se regenera al enganchar o eliminar particiones"""
+
+    def _ddl_particion(self, nombre, mes):
+        desde, hasta = rango_mes(mes)
+        columnas = ", ".join(f"{c} {t.split(' REFERENCES')[0]}" for c, t in COLUMNAS)
+        return (f'CREATE TABLE IF NOT EXISTS "{nombre}" ({columnas}, PRIMARY KEY (order_id), '
+                f'CHECK (time_id >= {desde} AND time_id < {hasta}))')
+
+    def _crear_indices(self, nombre, particion):
+        # SQLite no renombra índices: se alternan sufijos para que el staging de un
+        # reemplazo no choque con los de la partición que sigue visible
+        existentes = {fila[0] for fila in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (particion,))}
+        sufijo = 'b' if any(n.endswith('_a') for n in existentes) else 'a'
+        for corto, col in INDICES.items():
+            self.conn.execute(f'CREATE INDEX "idx_{particion}_{corto}_{sufijo}" ON "{nombre}" ({col})')
+
+    def _recrear_vista(self):
+        self.conn.execute(f'DROP VIEW IF EXISTS "{self.tabla}"')
+        particiones = self.particiones()
+        columnas = ", ".join(NOMBRES_COLUMNAS)
+        if particiones:
+            cuerpo = "\nUNION ALL\n".join(f'SELECT {columnas} FROM "{self.nombre_particion(m)}"'
+                                          for m in particiones)
+        else:
+            cuerpo = "SELECT " + ", ".join(f"NULL AS {c}" for c in NOMBRES_COLUMNAS) + " WHERE 0"
+        self.conn.execute(f'CREATE VIEW "{self.tabla}" AS\n{cuerpo}')
+
+    def crear_tabla(self):
+        self._recrear_vista()
+        self.conn.commit()
+
+    def crear_particion(self, mes):
+        particion = self.nombre_particion(mes)
+        self.conn.execute(self._ddl_particion(particion, mes))
+        self._crear_indices(particion, particion)
+        self._recrear_vista()
+        self.conn.commit()
+
+    def eliminar_particion(self, mes):
+        self.conn.execute(f'DROP TABLE IF EXISTS "{self.nombre_particion(mes)}"')
+        self._recrear_vista()
+        self.conn.commit()
+
+    def particiones(self):
+        nombres = self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?",
+            (f"{self.tabla}_p%",)).fetchall()
+        return sorted(m for (nombre,) in nombres if (m := self._mes_de_nombre(nombre)))
+
+    def _insertar(self, destino, df):
+        df.to_sql(destino, self.conn, if_exists='append', index=False, chunksize=100_000)
+
+    def _cargar_por_intercambio(self, df, mes, existe):
+        particion = self.nombre_particion(mes)
+        staging = f"{particion}_carga"
+        self.conn.execute(f'DROP TABLE IF EXISTS "{staging}"')
+        self.conn.execute(self._ddl_particion(staging, mes))
+        self._insertar(staging, df)
+        self._crear_indices(staging, particion)
+        self.conn.commit()
+
+        # Intercambio atómico: la vista nunca ve el mes a medias
+        self.conn.execute('BEGIN')
+        self.conn.execute(f'DROP VIEW IF EXISTS "{self.tabla}"')
+        if existe:
+            self.conn.execute(f'DROP TABLE "{particion}"')
+        self.conn.execute(f'ALTER TABLE "{staging}" RENAME TO "{particion}"')
+        self._recrear_vista()
+        self.conn.commit()
+
+
+def gestor_particiones(conn, tabla=TABLA):
+    """Gestor adecuado al tipo de conexión"""
+    if isinstance(conn, sqlite3.Connection):
+        return ParticionesSQLite(conn, tabla)
+    return ParticionesPostgres(conn, tabla)
+
+
+# -----------------------------
+# EJECUCIÓN
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Particiones mensuales de fact_orders')
+    sub = parser.add_subparsers(dest='accion', required=True)
+
+    ddl = sub.add_parser('ddl', help='Imprime el DDL Postgres de la tabla particionada')
+    ddl.add_argument('--desde', required=True, help='Primer mes (AAAA-MM)')
+    ddl.add_argument('--hasta', required=True, help='Último mes (AAAA-MM)')
+
+    sub.add_parser('comprobar', help='Comprueba el CSV que se envía a COPY (sin Postgres)')
+
+    sqlite = sub.add_parser('sqlite', help='Emulación local sobre una base SQLite')
+    sqlite.add_argument('base')
+    sqlite.add_argument('--cargar', help='Parquet o CSV con filas de fact_orders')
+    sqlite.add_argument('--reemplazar', action='store_true',
+                        help='Los meses cargados sustituyen a los existentes')
+    sqlite.add_argument('--adelante', type=int, default=0,
+                        help='Crear particiones hasta N meses después de --hoy')
+    sqlite.add_argument('--retener', type=int, help='Meses a conservar (borra los anteriores)')
+    sqlite.add_argument('--hoy', help='Mes de referencia AAAA-MM (por defecto, el actual)')
+    args = parser.parse_args(argv)
+
+    if args.accion == 'comprobar':
+        _comprobar_csv_copy()
+        return
+
+    if args.accion == 'ddl':
+        gestor = ParticionesPostgres(None)
+        sentencias = gestor.sentencias_tabla()
+        for mes in meses_entre(mes_de(args.desde), mes_de(args.hasta)):
+            sentencias += gestor.sentencias_particion(mes)
+        print(";\n\n".join(sentencias) + ";")
+        return
+
+    hoy = date(*divmod(mes_de(args.hoy), 100), 1) if args.hoy else None
+    conn = sqlite3.connect(args.base)
+    gestor = ParticionesSQLite(conn)
+    gestor.crear_tabla()
+    if args.cargar:
+        inicio = time.perf_counter()
+        df = pd.read_parquet(args.cargar) if args.cargar.endswith('.parquet') else pd.read_csv(args.cargar)
+        cargadas = gestor.cargar(df, args.reemplazar)
+        print(f"{sum(cargadas.values())} filas en {len(cargadas)} meses "
+              f"({time.perf_counter() - inicio:.2f}s)")
+    if args.adelante:
+        print(f"Particiones creadas: {gestor.asegurar_particiones(args.adelante, hoy)}")
+    if args.retener:
+        print(f"Particiones eliminadas: {gestor.aplicar_retencion(args.retener, hoy)}")
+    print(f"Particiones: {gestor.particiones()}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from imputacion import cubetas_logaritmicas
+from momentos import AcumuladorMomentos
+
+
+# -----------------------------
+# DISTINTOS APROXIMADOS (HyperLogLog)
+# -----------------------------
+class HyperLogLog:
+    """Estimador de cardinalidad con 2**precision registros de un byte
+    (error típico 1.04 / sqrt(2**precision), ~0.8% con precision=14)"""
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registros = np.zeros(1 << precision, dtype=np.uint8)
+
+    def actualizar(self, serie):
+        serie = serie.dropna()
+        if serie.empty:
+            return self
+        if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            # El hash depende del dtype: 1 (int64) y 1.0 (float64) contarían como dos
+            # distintos. Igual que hash_join._particion, todo número va como float64
+            serie = pd.Series(serie.to_numpy(dtype=np.float64) + 0.0)
+        h = pd.util.hash_pandas_object(serie, index=False).to_numpy()
+        p = self.precision
+        indices = (h >> np.uint64(64 - p)).astype(np.int64)
+        resto = h << np.uint64(p)
+        # Longitud en bits exacta sin pasar de 53 bits a float
+        altos = resto >> np.uint64(11)
+        bits = np.where(altos > 0,
+                        np.frexp(altos.astype('float64'))[1] + 11,
+                        np.frexp(resto.astype('float64'))[1])
+        rho = np.minimum(64 - bits + 1, 64 - p + 1).astype(np.uint8)
+        np.maximum.at(self.registros, indices, rho)
+        return self
+
+    def combinar(self, otro):
+        np.maximum(self.registros, otro.registros, out=self.registros)
+        return self
+
+    def estimar(self):
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimacion = alfa * m * m / np.sum(np.exp2(-self.registros.astype('float64')))
+        ceros = np.count_nonzero(self.registros == 0)
+        if estimacion <= 2.5 * m and ceros:
+            estimacion = m * np.log(m / ceros)  # conteo lineal para cardinalidades bajas
+        return int(round(estimacion))
+
+
+# -----------------------------
+# VALORES MÁS FRECUENTES (Misra-Gries / space-saving)
+# -----------------------------
+class ResumenFrecuentes:
+    """Guarda como mucho `capacidad` contadores. Al desbordarse se resta a todos el
+    contador (capacidad+1)-ésimo y se descartan los que quedan a cero, así el resumen
+    es combinable y cada conteo subestima el real como mucho en `error`."""
+
+    def __init__(self, capacidad=100):
+        self.capacidad = capacidad
+        self.conteos = pd.Series(dtype='float64')
+        self.error = 0.0
+
+    def _reducir(self):
+        if len(self.conteos) > self.capacidad:
+            umbral = self.conteos.nlargest(self.capacidad + 1).iloc[-1]
+            self.conteos = self.conteos[self.conteos > umbral] - umbral
+            self.error += umbral
+
+    def actualizar(self, serie):
+        frecuencias = serie.value_counts(dropna=True)
+        self.conteos = self.conteos.add(frecuencias.astype('float64'), fill_value=0)
+        self._reducir()
+        return self
+
+    def combinar(self, otro):
+        self.conteos = self.conteos.add(otro.conteos, fill_value=0)
+        self.error += otro.error
+        self._reducir()
+        return self
+
+    def top(self, k=10):
+        return [(valor, int(conteo)) for valor, conteo in self.conteos.nlargest(k).items()]
+
+
+# -----------------------------
+# PERFIL POR COLUMNAS
+# -----------------------------
+def _tipo(serie):
+    if pd.api.types.is_bool_dtype(serie):
+        return 'booleano'
+    if pd.api.types.is_numeric_dtype(serie):
+        return 'numerico'
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return 'fecha'
+    return 'texto'
+
+
+def _tipo_comun(a, b):
+    """Solo int y float se unen como numérico; cualquier otra mezcla pasa a texto"""
+    return a if a == b else 'texto'
+
+
+def _dtype_comun(a, b, tipo):
+    if a == b:
+        return a
+    if tipo != 'numerico':
+        return 'object'
+    try:
+        return str(np.result_type(a, b))
+    except TypeError:  # dtypes de extensión (Int64, Float64...)
+        return 'float64'
+
+
+def _nativo(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, float) and np.isnan(valor):
+        return None
+    return valor
+
+
+class PerfilColumnas:
+    """Perfil de calidad de todas las columnas en una sola pasada por chunk.
+
+    Por columna: nulos, distintos aproximados (HyperLogLog), valores más frecuentes
+    (Misra-Gries) y, en las numéricas, momentos exactos (AcumuladorMomentos) más un
+    sketch de cuantiles de cubetas logarítmicas. La memoria no depende del número de
+    filas y dos perfiles de particiones distintas se unen con `combinar`."""
+
+    def __init__(self, k_top=10, precision_hll=14, error_relativo=0.005):
+        self.k_top = k_top
+        self.precision_hll = precision_hll
+        self.error_relativo = error_relativo
+        self.gamma = (1 + error_relativo) / (1 - error_relativo)
+        self.filas = 0
+        self.columnas = {}
+        self.momentos = None
+
+    def _estado_nuevo(self, tipo, dtype):
+        return {
+            'tipo': tipo,
+            'dtype': dtype,
+            'nulos': 0,
+            'valores': 0,
+            'minimo': None,
+            'maximo': None,
+            'hll': HyperLogLog(self.precision_hll),
+            # Los top-k de un float continuo no aportan nada
+            'frecuentes': None if tipo == 'numerico' and pd.api.types.is_float_dtype(dtype)
+            else ResumenFrecuentes(self.k_top * 10),
+            'cubetas': pd.Series(dtype='float64') if tipo == 'numerico' else None,
+        }
+
+    def _ampliar(self, estado, tipo, dtype):
+        """Ensancha el estado de una columna cuyo dtype cambia entre chunks o archivos
+        (int64 sin nulos y float64 con nulos en read_csv, un número que pasa a texto)"""
+        tipo = _tipo_comun(estado['tipo'], tipo)
+        estado['dtype'] = _dtype_comun(estado['dtype'], dtype, tipo)
+        if tipo == estado['tipo']:
+            return
+        estado['tipo'] = tipo
+        estado['cubetas'] = None
+        estado['minimo'] = estado['maximo'] = None
+        if estado['frecuentes'] is None:
+            # Los valores ya vistos no se contaron: cada conteo puede quedarse corto en ellos
+            estado['frecuentes'] = ResumenFrecuentes(self.k_top * 10)
+            estado['frecuentes'].error = float(estado['valores'])
+
+    def _estado(self, nombre, serie):
+        tipo, dtype = _tipo(serie), str(serie.dtype)
+        estado = self.columnas.get(nombre)
+        if estado is None or estado['valores'] == 0:
+            # Una columna sin ningún valor todavía (todo nulos) toma el tipo del chunk
+            nuevo = self._estado_nuevo(tipo, dtype)
+            if estado is not None:
+                nuevo['nulos'] = estado['nulos']
+            self.columnas[nombre] = estado = nuevo
+        elif (tipo, dtype) != (estado['tipo'], estado['dtype']):
+            self._ampliar(estado, tipo, dtype)
+        return estado
+
+    def actualizar(self, chunk):
+        numericas = []
+        for nombre in chunk.columns:
+            serie = chunk[nombre]
+            estado = self._estado(nombre, serie)
+            nulos = serie.isna()
+            n_nulos = int(nulos.sum())
+            estado['nulos'] += n_nulos
+            estado['valores'] += len(serie) - n_nulos
+            estado['hll'].actualizar(serie)
+            if estado['frecuentes'] is not None:
+                estado['frecuentes'].actualizar(serie)
+            if estado['tipo'] == 'numerico':
+                numericas.append(nombre)
+                valores = serie.to_numpy(dtype='float64', na_value=np.nan)[~nulos.to_numpy()]
+                cubetas = pd.Series(cubetas_logaritmicas(valores, self.gamma)).value_counts()
+                estado['cubetas'] = estado['cubetas'].add(cubetas.astype('float64'), fill_value=0)
+            elif estado['tipo'] == 'fecha' and not nulos.all():
+                minimo, maximo = serie.min(), serie.max()
+                estado['minimo'] = minimo if estado['minimo'] is None else min(estado['minimo'], minimo)
+                estado['maximo'] = maximo if estado['maximo'] is None else max(estado['maximo'], maximo)
+
+        if numericas:
+            if self.momentos is None:
+                self.momentos = AcumuladorMomentos(numericas)
+            else:
+                nuevas = [c for c in numericas if c not in self.momentos.columnas]
+                if nuevas:
+                    self.momentos.ampliar(self.momentos.columnas + nuevas)
+            # Columnas del acumulador que en este chunk no son numéricas no aportan nada
+            datos = pd.DataFrame({c: chunk[c] if c in numericas else np.nan
+                                  for c in self.momentos.columnas}, index=chunk.index)
+            self.momentos.actualizar(datos)
+        self.filas += len(chunk)
+        return self
+
+    def combinar(self, otro):
+        for nombre, suyo in otro.columnas.items():
+            mio = self.columnas.get(nombre)
+            if mio is None or mio['valores'] == 0:
+                if mio is not None:
+                    suyo['nulos'] += mio['nulos']
+                self.columnas[nombre] = suyo
+                continue
+            mio['nulos'] += suyo['nulos']
+            if suyo['valores'] == 0:
+                continue
+            self._ampliar(mio, suyo['tipo'], suyo['dtype'])
+            mio['valores'] += suyo['valores']
+            mio['hll'].combinar(suyo['hll'])
+            if mio['frecuentes'] is not None:
+                if suyo['frecuentes'] is not None:
+                    mio['frecuentes'].combinar(suyo['frecuentes'])
+                else:
+                    mio['frecuentes'].error += suyo['valores']
+            if mio['cubetas'] is not None and suyo['cubetas'] is not None:
+                mio['cubetas'] = mio['cubetas'].add(suyo['cubetas'], fill_value=0)
+            if mio['tipo'] == 'fecha':
+                for clave, funcion in (('minimo', min), ('maximo', max)):
+                    valores = [v for v in (mio[clave], suyo[clave]) if v is not None]
+                    mio[clave] = funcion(valores) if valores else None
+        if otro.momentos is not None:
+            if self.momentos is None:
+                self.momentos = otro.momentos
+            else:
+                columnas = self.momentos.columnas + [c for c in otro.momentos.columnas
+                                                     if c not in self.momentos.columnas]
+                self.momentos.ampliar(columnas)
+                otro.momentos.ampliar(columnas)
+                self.momentos.combinar(otro.momentos)
+        self.filas += otro.filas
+        return self
+
+    # --------------------------------------------------
+    # RESULTADO
+    # --------------------------------------------------
+    @staticmethod
+    def _cuantiles(cubetas, qs=(0.25, 0.5, 0.75)):
+        if cubetas.empty:
+            return {f'p{int(q * 100)}': None for q in qs}
+        cubetas = cubetas.sort_index()
+        acumulado = cubetas.cumsum().to_numpy()
+        posiciones = np.searchsorted(acumulado, np.array(qs) * acumulado[-1])
+        return {f'p{int(q * 100)}': float(cubetas.index[p]) for q, p in zip(qs, posiciones)}
+
+    def perfil(self):
+        """Diccionario serializable a JSON con el perfil de cada columna"""
+        resumen = self.momentos.resumen() if self.momentos is not None else None
+        columnas = {}
+        for nombre, estado in self.columnas.items():
+            info = {
+                'tipo': estado['tipo'],
+                'dtype': estado['dtype'],
+                'nulos': estado['nulos'],
+                'pct_nulos': round(100 * estado['nulos'] / self.filas, 4) if self.filas else 0.0,
+                'distintos_aprox': estado['hll'].estimar(),
+            }
+            if estado['tipo'] == 'numerico':
+                fila = resumen.iloc[0]
+                for estadistico in ('min', 'max', 'mean', 'std', 'skew', 'kurtosis'):
+                    info[estadistico] = _nativo(fila[(nombre, estadistico)])
+                info.update(self._cuantiles(estado['cubetas']))
+            elif estado['tipo'] == 'fecha':
+                info['min'] = str(estado['minimo']) if estado['minimo'] is not None else None
+                info['max'] = str(estado['maximo']) if estado['maximo'] is not None else None
+            if estado['frecuentes'] is not None:
+                info['top'] = [[_nativo(v), c] for v, c in estado['frecuentes'].top(self.k_top)]
+                info['top_error_max'] = int(estado['frecuentes'].error)
+            columnas[nombre] = info
+        return {'filas': self.filas, 'columnas': columnas}
+
+    def tabla(self):
+        """Vista tabular del perfil (una fila por columna)"""
+        filas = {nombre: {k: v for k, v in info.items() if k not in ('top', 'top_error_max')}
+                 for nombre, info in self.perfil()['columnas'].items()}
+        return pd.DataFrame.from_dict(filas, orient='index')
+
+    def guardar(self, ruta):
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(self.perfil(), f, ensure_ascii=False, indent=2, default=str)
+
+
+# -----------------------------
+# PERFILADO PARALELO DE ARCHIVOS
+# -----------------------------
+def _unidades(ruta):
+    """Parquet se reparte por row groups; un CSV es una sola unidad"""
+    if str(ruta).endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return [(ruta, grupo) for grupo in range(pq.ParquetFile(ruta).num_row_groups)]
+    return [(ruta, None)]
+
+
+def _perfilar_unidad(ruta, grupo, columnas, filas_por_lote, opciones):
+    perfil = PerfilColumnas(**opciones)
+    if grupo is not None:
+        import pyarrow.parquet as pq
+        archivo = pq.ParquetFile(ruta)
+        for lote in archivo.iter_batches(batch_size=filas_por_lote, row_groups=[grupo],
+                                         columns=columnas):
+            perfil.actualizar(lote.to_pandas())
+    else:
+        for chunk in pd.read_csv(ruta, usecols=columnas, chunksize=filas_por_lote):
+            perfil.actualizar(chunk)
+    return perfil
+
+
+def perfilar_archivos(rutas, columnas=None, filas_por_lote=500_000, max_workers=None, **opciones):
+    """Perfila CSV/Parquet en varios procesos (un row group o un CSV por tarea) y
+    combina los resultados. La memoria por worker queda acotada por `filas_por_lote`."""
+    unidades = [u for ruta in rutas for u in _unidades(ruta)]
+    total = PerfilColumnas(**opciones)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futuros = [executor.submit(_perfilar_unidad, ruta, grupo, columnas, filas_por_lote, opciones)
+                   for ruta, grupo in unidades]
+        for futuro in futuros:
+            total.combinar(futuro.result())
+    return total
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python perfilador.py ARCHIVO [ARCHIVO ...] [--salida perfil.json]")
+        sys.exit(1)
+    argumentos = sys.argv[1:]
+    salida = 'perfil.json'
+    if '--salida' in argumentos:
+        i = argumentos.index('--salida')
+        salida = argumentos[i + 1]
+        del argumentos[i:i + 2]
+    perfil = perfilar_archivos(argumentos)
+    perfil.guardar(salida)
+    print(perfil.tabla().to_string())
+    print(f"\nPerfil guardado en {salida}")
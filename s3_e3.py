@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from deduplicacion import deduplicar
 
 # Crear datos con problemas típicos
 datos = {
@@ -44,4 +45,10 @@ df_limpio['categoria_edad'] = pd.cut(df_limpio['edad'],
                                     labels=['Joven', 'Adulto', 'Senior'])
 
 print("Con columnas calculadas:")
-print(df_limpio[['nombre', 'edad', 'categoria_edad', 'salario', 'salario_mensual']]) """
\ No newline at end of file
+print(df_limpio[['nombre', 'edad', 'categoria_edad', 'salario', 'salario_mensual']]) """
+
+# Deduplicación difusa: tolera acentos, mayúsculas y espacios ("Ana García" vs "ana garcia")
+# y solo compara registros dentro del mismo bloque (email o dominio + clave fonética)
+df_dedup = deduplicar(df, columna_nombre='nombre', columna_email='email')
+print(f"\nDespués de deduplicación difusa: {len(df_dedup)} filas")
+print(df_dedup)
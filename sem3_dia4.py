@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from hash_join import DimensionHash, unir_hechos
 
 # Dataset de ventas
 ventas = pd.DataFrame({
@@ -50,18 +51,15 @@ stats_por_cliente= ventas.groupby('id_cliente').agg({
 })
 print(f"\nEstadísticas por cliente:\n{stats_por_cliente}")
 
-# Unir ventas con productos
-ventas_productos= pd.merge(ventas, productos, on='id_producto')
+# Tablas hash sobre las dimensiones (se construyen una vez, ya proyectadas y renombradas)
+dim_productos = DimensionHash(productos, 'id_producto', renombrar={'nombre': 'producto'})
+dim_clientes = DimensionHash(clientes, 'id_cliente', renombrar={'nombre': 'cliente'})
 
-# Calcular totales
-ventas_productos['total']= ventas_productos['cantidad']* ventas_productos['precio']
+# Unir ventas con productos y clientes en un solo paso
+analisis_completo = unir_hechos(ventas, [dim_productos, dim_clientes])
 
-# Unir con clientes
-analisis_completo= pd.merge(ventas_productos, clientes, on='id_cliente')
-analisis_completo = analisis_completo.rename(columns={
-    'nombre_x': 'producto',
-    'nombre_y': 'cliente'
-})
+# Calcular totales
+analisis_completo['total'] = analisis_completo['cantidad'] * analisis_completo['precio']
 
 print(f"\nAnálisis completo (primeras 5 filas):\n{analisis_completo.head()}")
 
@@ -2,6 +2,9 @@ import pandas as pd
 import numpy as np
 from scipy import stats
 
+from imputacion import ImputadorPorGrupo
+from perfilador import PerfilColumnas
+
 # Crear dataset con missing values y outliers
 np.random.seed(42)
 n=1000
@@ -27,28 +30,32 @@ outlier_indices= np.random.choice(n,20, replace=False)
 datos.loc[outlier_indices[:10],'salario']= datos.loc[outlier_indices[:10],'salario']*10# Salarios extremos altos
 datos.loc[outlier_indices[10:],'horas_trabajo']= np.random.choice([80,90,100],10)# Horas imposibles
 
+# Perfil en una sola pasada: nulos y porcentaje salen del mismo recorrido
+perfil= PerfilColumnas().actualizar(datos).tabla()
+
 print(f"Dataset creado:{datos.shape}")
-print(f"Valores faltantes por columna:\n{datos.isnull().sum()}")
+print(f"Valores faltantes por columna:\n{perfil['nulos']}")
 
 # Análisis detallado de missing values
 print("Porcentaje de datos faltantes:")
-print((datos.isnull().sum()/len(datos)*100).round(2))
+print(perfil['pct_nulos'].round(2))
 
 # Patrón de missing values
-import missingno as msno
+# import missingno as msno
 # msno.matrix(datos)  # Visualización (requiere instalar missingno)
 
-# Análisis por departamento
+# Ajuste en una pasada: nulos por departamento y estadísticos de imputación por grupo
+# (media para horas_trabajo, mediana para salario: más robusta a outliers)
+imputador= ImputadorPorGrupo({'horas_trabajo':'media','salario':'mediana'}, grupo='departamento')
+imputador.ajustar(datos)
+
 print("\nMissing values por departamento:")
-print(datos.isnull().groupby(datos['departamento']).sum())
+print(imputador.reporte_nulos())
 
-# Imputación por media para horas_trabajo
-media_horas= datos['horas_trabajo'].mean()
-datos['horas_trabajo']= datos['horas_trabajo'].fillna(media_horas)
+print("\nValores de imputación por departamento:")
+print(pd.DataFrame(imputador.estadisticos()).round(2))
 
-# Imputación por mediana para salario (más robusto a outliers)
-mediana_salario= datos['salario'].median()
-datos['salario']= datos['salario'].fillna(mediana_salario)
+datos= imputador.aplicar(datos)
 
 # Verificar que no queden missing values
 print(f"\nValores faltantes después de imputación:{datos.isnull().sum().sum()}")
@@ -2,6 +2,8 @@ import pandas as pd
 import sqlite3
 import json
 
+from etl_comun.lectura import leer_pandas
+
 # Crear CSV
 ventas_csv= pd.DataFrame({
 'id_venta':range(1,6),
@@ -59,7 +61,7 @@ print(df_json)
 
 # Desde SQLite
 conn= sqlite3.connect('ventas.db')
-df_sql= pd.read_sql('SELECT * FROM pedidos', conn)
+df_sql= leer_pandas(conn, 'SELECT * FROM pedidos')
 conn.close()
 print("\nDesde SQLite:")
 print(df_sql)
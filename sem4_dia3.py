@@ -1,6 +1,11 @@
 import pandas as pd
 import numpy as np
 
+from derivacion_features import DerivadorFeatures, reglas_clientes
+
+# Fecha fija: las antigüedades no cambian entre ejecuciones y el resultado es cacheable
+FECHA_REFERENCIA = '2025-01-01'
+
 # Crear datos con problemas realistas
 np.random.seed(42)
 n = 1000
@@ -12,9 +17,10 @@ df = pd.DataFrame({
     'gastos_mensuales': np.random.normal(2000, 500, n).clip(500, 10000),
     'categoria_cliente': np.random.choice(['A', 'B', 'C', 'D'], n),
     'fecha_registro': pd.date_range('2020-01-01', periods=n, freq='D')[:n],
-    'email': [f'cliente{i}@ejemplo.com' for i in range(1, n+1)],
-    'telefono': [f'({np.random.randint(100, 999)}){np.random.randint(100, 999)}-{np.random.randint(1000, 9999)}' for _ in range(n)]
+    'email': 'cliente' + pd.Series(range(1, n+1)).astype(str) + '@ejemplo.com',
 })
+telefono = np.random.randint([100, 100, 1000], [999, 999, 9999], size=(n, 3)).astype(str)
+df['telefono'] = '(' + pd.Series(telefono[:, 0]) + ')' + telefono[:, 1] + '-' + telefono[:, 2]
 
 # Introducir algunos errores intencionalmente
 error_indices = np.random.choice(n, 50, replace=False)
@@ -33,26 +39,9 @@ df.loc[df['ingresos'] < 0, 'ingresos'] = np.nan
 df['ratio_gasto_ingreso'] = df['gastos_mensuales'] / df['ingresos']
 df.loc[df['ratio_gasto_ingreso'] > 1, 'gastos_mensuales'] = df.loc[df['ratio_gasto_ingreso'] > 1, 'ingresos'] * 0.8
 
-# Categorizar por edad
-df['grupo_edad'] = pd.cut(df['edad'], 
-                        bins=[18, 25, 35, 50, 80], 
-                        labels=['Joven', 'Adulto_Joven', 'Adulto', 'Senior'])
-
-# Calcular capacidad de ahorro
-df['capacidad_ahorro'] = df['ingresos'] - df['gastos_mensuales']
-df['ratio_ahorro'] = df['capacidad_ahorro'] / df['ingresos']
-
-# Clasificar capacidad financiera
-df['clasificacion_financiera'] = np.where(df['ratio_ahorro'] > 0.3, 'Ahorra_Mucho',
-                                         np.where(df['ratio_ahorro'] > 0.1, 'Ahorra_Poco',
-                                                 np.where(df['ratio_ahorro'] > 0, 'Equilibra', 'Deficit')))
-
-# Extraer información del teléfono
-df['codigo_area'] = df['telefono'].str.extract(r'\((\d{3})\)')
-
-# Calcular antigüedad
-df['antiguedad_dias'] = (pd.Timestamp.now() - df['fecha_registro']).dt.days
-df['antiguedad_meses'] = df['antiguedad_dias'] // 30
+# Derivar grupo de edad, ahorro, clasificación financiera, código de área y antigüedad
+derivador = DerivadorFeatures(reglas_clientes(), fecha_referencia=FECHA_REFERENCIA)
+df = derivador.transformar(df, en_sitio=True)
 
 # Métricas por grupo de edad
 metricas_edad = df.groupby('grupo_edad').agg({
@@ -1,6 +1,8 @@
 import sqlite3
 import pandas as pd
 import numpy as np
+from cache_consultas import CacheResultados
+from etl_comun.lectura import leer_pandas, leer_tabla
 
 # Crear base de datos
 conn = sqlite3.connect('ventas_etl.db')
@@ -74,8 +76,7 @@ def cargar_con_validacion(df, tabla, conn, claves_foraneas=None):
         # Validar claves foráneas si se especifican
         if claves_foraneas:
             for columna, tabla_ref, columna_ref in claves_foraneas:
-                valores_validos = pd.read_sql(f'SELECT {columna_ref} FROM {tabla_ref}', conn)
-                valores_validos = valores_validos[columna_ref].tolist()
+                valores_validos = leer_pandas(conn, f'SELECT {columna_ref} FROM {tabla_ref}')[columna_ref]
                 
                 invalidos = ~df[columna].isin(valores_validos)
                 if invalidos.any():
@@ -107,20 +108,23 @@ if exito_clientes and exito_productos:
 
 # Verificar conteos
 for tabla in ['clientes', 'productos', 'ventas']:
-    count = pd.read_sql(f'SELECT COUNT(*) FROM {tabla}', conn).iloc[0,0]
+    count = leer_tabla(conn, f'SELECT COUNT(*) FROM {tabla}').column(0)[0].as_py()
     print(f"{tabla}: {count} registros")
 
-# Consulta de ejemplo: ventas por cliente
-query_result = pd.read_sql('''
+# Consulta de ejemplo: ventas por cliente (cacheada mientras no cambien las tablas)
+cache = CacheResultados()
+query_result = cache.consulta_sql(conn, '''
     SELECT c.nombre, COUNT(v.id_venta) as num_ventas, 
            SUM(v.cantidad * v.precio_unitario) as total_ventas
     FROM clientes c
     LEFT JOIN ventas v ON c.id_cliente = v.id_cliente
     GROUP BY c.id_cliente, c.nombre
     ORDER BY total_ventas DESC
-''', conn)
+''', tablas=['clientes', 'ventas'])
 
 print("\nVentas por cliente:")
 print(query_result)
+print(cache.reporte())
 
+cache.cerrar()
 conn.close()
\ No newline at end of file